@@ -31,6 +31,20 @@ TOPIC_NARRATIVE_GENERATED = "narrative.generated"
 TOPIC_GRAPH_ANALYSIS = "graph.analysis"
 TOPIC_INFERRED_RELATIONSHIP = "relationship.inferred"
 
+# Persistence events
+TOPIC_DATABASE_CONNECTION = "database.connection"
+
+
+def create_database_connection_event(
+    state: Literal["opened", "closing", "closed"],
+    db_path: str | None,
+) -> EventPayload:
+    """Create a database connection lifecycle event (project opened/closed)."""
+    return {
+        "state": state,
+        "db_path": db_path,
+    }
+
 
 def create_data_ingested_event(doc_id: str, content: str) -> EventPayload:
     """Create a data ingested event (document received for extraction)."""
@@ -72,12 +86,29 @@ def create_relationship_found_event(
     return event
 
 
-def create_graph_updated_event(doc_id: str, graph_stats: Dict[str, Any]) -> EventPayload:
-    """Create a graph updated event."""
-    return {
+def create_graph_updated_event(
+    doc_id: str,
+    graph_stats: Dict[str, Any],
+    graph_version: int | None = None,
+    is_complete: bool = True,
+) -> EventPayload:
+    """Create a graph updated event.
+    
+    Args:
+        doc_id: Document ID
+        graph_stats: Graph statistics; ``nodes``/``edges`` hold only the nodes and
+            edges added or changed by this update (the delta), not the full graph
+        graph_version: Monotonically increasing graph version after this update
+        is_complete: Whether the triggering relationship batch was the document's last
+    """
+    event: EventPayload = {
         "doc_id": doc_id,
         "graph_stats": graph_stats,
+        "is_complete": is_complete,
     }
+    if graph_version is not None:
+        event["graph_version"] = graph_version
+    return event
 
 
 def create_agui_event(
@@ -7,20 +7,34 @@ Provides graph analytics using NetworkX and relationship inference using LLM.
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, Any, List, Optional, Tuple
-from collections import defaultdict
+from collections import OrderedDict
 
 from forge.core.event_bus import EventBus, EventPayload
 from forge.core import events
 from forge.infrastructure.llm.base import LLMProvider, RateLimitError
 from forge.infrastructure.llm.rate_limiter import get_rate_limiter
 from forge.config.prompts import render_prompt
+from forge.domain.graph.analytics import EdgeArrays, compute_graph_metrics
+from forge.domain.graph.communities import CommunityTracker, louvain_partition
+from forge.domain.graph.link_prediction import predict_links
+from forge.domain.graph.snapshot import GraphSnapshot, get_graph_snapshot, graph_version
+from forge.infrastructure.persistence.graph_stats import entity_degrees
 
 logger = logging.getLogger(__name__)
 
 
+def _pair_key(source: str, target: str) -> Tuple[str, str]:
+    """Order-independent key of an entity pair."""
+    return (source, target) if source <= target else (target, source)
+
+
 class AdvancedGraphAnalysisService:
     """Service for advanced graph analytics and relationship inference."""
     
@@ -28,22 +42,57 @@ class AdvancedGraphAnalysisService:
         self,
         event_bus: EventBus,
         llm_provider: LLMProvider,
-        db_connection,  # DuckDB connection
+        db_connection,  # DuckDB connection manager
+        cache_size: int = 32,
+        analytics_workers: int = 1,
+        centrality_mode: str = "auto",
+        link_prediction_method: str = "adamic_adar",
+        inference_top_k: int = 5,
     ):
         """Initialize the advanced graph analysis service.
         
         Args:
             event_bus: Event bus for subscribing to events
             llm_provider: LLM provider for relationship inference
-            db_connection: DuckDB connection for querying graph data
+            db_connection: DuckDB connection manager for querying graph data
+            cache_size: Maximum number of cached analysis results (LRU)
+            analytics_workers: Worker processes for NetworkX analytics
+            centrality_mode: "auto" (exact or k-sample betweenness by graph size),
+                "exact" or "approximate"
+            link_prediction_method: "common_neighbors", "adamic_adar" or "jaccard"
+            inference_top_k: Best-ranked candidate pairs sent to the LLM per analysis
         """
         self.event_bus = event_bus
         self.llm_provider = llm_provider
         self.db_conn = db_connection
         self.service_name = "AdvancedGraphAnalysisService"
         
-        # Cache analysis results
-        self._analysis_cache: Dict[str, Dict[str, Any]] = {}
+        # Cache analysis results keyed by (scope, graph version), LRU-bounded
+        self._analysis_cache: "OrderedDict[Tuple[str, Tuple[Any, ...]], Dict[str, Any]]" = OrderedDict()
+        self._cache_size = max(1, cache_size)
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_invalidations = 0
+        
+        # Process pool for CPU-bound analytics (lazy, see _get_executor())
+        self._analytics_workers = max(1, analytics_workers)
+        self._executor: Optional[Executor] = None
+        
+        # Incremental centrality state: global degree counters maintained from
+        # graph.updated deltas, and the last PageRank vector per scope for warm starts
+        self._centrality_mode = centrality_mode
+        self._degree_counts: Optional[Dict[str, int]] = None
+        self._pagerank_vectors: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        
+        # Incremental communities with stable ids, one tracker per scope
+        self._community_trackers: "OrderedDict[str, CommunityTracker]" = OrderedDict()
+        self._community_lock = asyncio.Lock()
+        
+        # Link prediction feeding LLM relationship inference; pairs already sent
+        # to the LLM (sorted id tuples) are not scored again
+        self._link_prediction_method = link_prediction_method
+        self._inference_top_k = inference_top_k
+        self._evaluated_pairs: set[Tuple[str, str]] = set()
         
     async def start(self):
         """Start the service and subscribe to events."""
@@ -52,15 +101,153 @@ class AdvancedGraphAnalysisService:
         # Subscribe to graph updated events
         await self.event_bus.subscribe(events.TOPIC_GRAPH_UPDATED, self.handle_graph_updated)
         
+        # Subscribe to events that change the graph to invalidate cached analyses
+        await self.event_bus.subscribe(events.TOPIC_RELATIONSHIP_FOUND, self.handle_relationship_found)
+        await self.event_bus.subscribe(events.TOPIC_ENTITY_MERGED, self.handle_entity_merged)
+        await self.event_bus.subscribe(events.TOPIC_DATABASE_CONNECTION, self.handle_database_connection)
+        
         logger.info("AdvancedGraphAnalysisService started")
     
+    async def stop(self):
+        """Shut down the analytics worker pool (called on app shutdown, see ``main``)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _get_executor(self) -> Executor:
+        """Get or create the analytics process pool.
+        
+        Workers are spawned rather than forked: this process already runs the
+        DuckDB writer and event-loop threads, whose locks a forked child would
+        inherit in whatever state they were in.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._analytics_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+    
+    async def _run_analytics(self, func, *args, **kwargs):
+        """Run a CPU-bound analytics function in the worker process pool.
+        
+        Falls back to a worker thread if the process pool is unavailable
+        (e.g. broken after a worker crash), so analysis still stays off the loop.
+        """
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"{self.service_name}: Analytics process pool unavailable ({e}), using a thread")
+            self._executor = None
+            return await loop.run_in_executor(None, func, *args)
+    
     async def handle_graph_updated(self, payload: EventPayload):
         """Handle graph updated events by running analytics."""
         doc_id = payload.get("doc_id")
+        scope = doc_id if doc_id and doc_id != "unknown" else None
+        
+        # The graph changed: drop cached results for this document and the global view
+        self.invalidate_cache(scope)
+        self._update_degree_counts(payload.get("graph_stats") or {})
         
         # Run comprehensive analysis - if doc_id is None or "unknown", analyze all
         # Otherwise scope to the specific document
-        await self.analyze_graph(doc_id if doc_id and doc_id != "unknown" else None)
+        await self.analyze_graph(scope)
+    
+    async def handle_relationship_found(self, payload: EventPayload):
+        """Invalidate cached analyses affected by newly found relationships."""
+        doc_id = payload.get("doc_id")
+        self.invalidate_cache(doc_id if doc_id and doc_id != "unknown" else None)
+    
+    async def handle_entity_merged(self, payload: EventPayload):
+        """Invalidate all cached analyses (a merge can rewrite edges in any scope)."""
+        self.invalidate_cache()
+        # Merges rewrite edge endpoints; recount degrees from the database lazily
+        self._degree_counts = None
+    
+    async def handle_database_connection(self, payload: EventPayload):
+        """Drop all per-graph state when a different database is opened."""
+        if payload.get("state") != "opened":
+            return
+        self.invalidate_cache()
+        self._degree_counts = None
+        self._pagerank_vectors.clear()
+        self._evaluated_pairs.clear()
+        async with self._community_lock:
+            self._community_trackers.clear()
+    
+    def _update_degree_counts(self, graph_stats: Dict[str, Any]) -> None:
+        """Apply a graph.updated delta to the global degree counters."""
+        if self._degree_counts is None:
+            return
+        edges = graph_stats.get("edges")
+        if not graph_stats.get("is_delta") or edges is None:
+            # Not a delta (e.g. session restore): recount from the database lazily
+            self._degree_counts = None
+            return
+        counts = self._degree_counts
+        for edge in edges:
+            for node_id in (edge.get("source"), edge.get("target")):
+                if node_id:
+                    counts[node_id] = counts.get(node_id, 0) + 1
+    
+    def _get_degree_counts(self) -> Optional[Dict[str, int]]:
+        """Get global degree counters, rebuilding them from the database if needed.
+        
+        The rebuild reads the per-entity degrees maintained on write (see
+        ``graph_stats``) rather than scanning the relationships.
+        """
+        if self._degree_counts is None and self.db_conn:
+            try:
+                self._degree_counts = {
+                    node_id: out_degree + in_degree
+                    for node_id, (out_degree, in_degree) in entity_degrees(self.db_conn).items()
+                }
+            except Exception as e:
+                logger.debug(f"Could not rebuild degree counters: {e}")
+        return self._degree_counts
+    
+    def invalidate_cache(self, doc_id: Optional[str] = None) -> None:
+        """Invalidate cached analysis results.
+        
+        Args:
+            doc_id: Document whose results should be dropped along with the global
+                results. If None, the whole cache is cleared.
+        """
+        if doc_id is None:
+            removed = len(self._analysis_cache)
+            self._analysis_cache.clear()
+        else:
+            stale = [key for key in self._analysis_cache if key[0] in (doc_id, "global")]
+            for key in stale:
+                del self._analysis_cache[key]
+            removed = len(stale)
+        self._cache_invalidations += removed
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return analysis cache statistics.
+        
+        Returns:
+            Dictionary with hits, misses, hit rate, invalidations, and size
+        """
+        lookups = self._cache_hits + self._cache_misses
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+            "invalidations": self._cache_invalidations,
+            "size": len(self._analysis_cache),
+            "max_size": self._cache_size,
+        }
+    
+    def _cached_analysis(self, cache_key: Tuple[str, Tuple[Any, ...]]) -> Dict[str, Any]:
+        """Return a cached analysis, marking it most recently used."""
+        self._cache_hits += 1
+        self._analysis_cache.move_to_end(cache_key)
+        return self._analysis_cache[cache_key]
     
     async def analyze_graph(self, doc_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Run comprehensive graph analysis.
@@ -71,36 +258,69 @@ class AdvancedGraphAnalysisService:
         Returns:
             Analysis results dictionary
         """
-        cache_key = doc_id or "global"
-        
-        # Check cache
-        if cache_key in self._analysis_cache:
-            return self._analysis_cache[cache_key]
-        
-        # Get graph data
-        entities, relationships = self._get_graph_data(doc_id)
+        # The connection manager versions the graph by its writer's commit
+        # count, so a cached analysis is found without touching the tables
+        version = graph_version(self.db_conn, doc_id) if getattr(self.db_conn, "write_version", None) else None
+        if version and (doc_id or "global", version) in self._analysis_cache:
+            return self._cached_analysis((doc_id or "global", version))
+        
+        # Shared CSR snapshot for the current graph version (built once per
+        # version; versioned by content fingerprint without a manager)
+        snapshot = await self.db_conn.read(get_graph_snapshot, doc_id, version)
+        version = snapshot.version if snapshot else ()
+        cache_key = (doc_id or "global", version)
+        
+        # Check cache (an empty version means the graph could not be versioned)
+        if version and cache_key in self._analysis_cache:
+            return self._cached_analysis(cache_key)
+        self._cache_misses += 1
+        
+        if not snapshot or not snapshot.num_nodes or not snapshot.num_edges:
+            logger.warning(
+                f"Insufficient graph data for analysis (entities: {snapshot.num_nodes if snapshot else 0}, "
+                f"relationships: {snapshot.num_edges if snapshot else 0})"
+            )
+            return None
         
-        if not entities or not relationships:
-            logger.warning(f"Insufficient graph data for analysis (entities: {len(entities)}, relationships: {len(relationships)})")
+        # Compute metrics off the event loop on a compact edge-array encoding;
+        # degree counters only describe the global graph, so doc scopes recount
+        scope = doc_id or "global"
+        arrays = snapshot.edge_arrays()
+        analysis = await self._run_analytics(
+            compute_graph_metrics,
+            arrays,
+            self._centrality_mode,
+            self._pagerank_vectors.get(scope),
+            None if doc_id else self._get_degree_counts(),
+            False,
+        )
+        if analysis is None:
             return None
         
-        # Build NetworkX graph
-        graph = self._build_networkx_graph(entities, relationships)
+        # Communities: re-optimize only the region touched since the last version
+        communities, community_delta = await self._update_communities(scope, arrays)
+        analysis["communities"] = communities
+        analysis["community_delta"] = community_delta
         
-        # Compute metrics
-        analysis = {
-            "centrality": self._compute_centrality(graph),
-            "communities": self._detect_communities(graph),
-            "statistics": self._compute_statistics(graph),
-        }
+        # Keep the PageRank vector for the next warm start (not part of the published result)
+        pagerank_vector = analysis.get("centrality", {}).pop("pagerank_vector", None)
+        if pagerank_vector:
+            self._pagerank_vectors[scope] = pagerank_vector
+            self._pagerank_vectors.move_to_end(scope)
+            while len(self._pagerank_vectors) > self._cache_size:
+                self._pagerank_vectors.popitem(last=False)
         
         # Infer missing relationships
-        inferred = await self._infer_relationships(entities, relationships)
+        inferred = await self._infer_relationships(snapshot, arrays)
         if inferred:
             analysis["inferred_relationships"] = inferred
         
-        # Cache results
-        self._analysis_cache[cache_key] = analysis
+        # Cache results, evicting the least recently used entry when full
+        if version:
+            self._analysis_cache[cache_key] = analysis
+            self._analysis_cache.move_to_end(cache_key)
+            while len(self._analysis_cache) > self._cache_size:
+                self._analysis_cache.popitem(last=False)
         
         # Emit analysis event
         await self.event_bus.publish(
@@ -125,241 +345,91 @@ class AdvancedGraphAnalysisService:
         await self.event_bus.publish(
             events.TOPIC_AGUI_EVENT,
             events.create_agui_event(
-                f"📈 Completed graph analysis: {len(entities)} entities, {len(relationships)} relationships",
+                f"📈 Completed graph analysis: {snapshot.num_nodes} entities, {snapshot.num_edges} relationships",
                 level="info"
             )
         )
         
         return analysis
     
-    def _get_graph_data(self, doc_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Get entities and relationships from database."""
-        entities = []
-        relationships = []
-        
-        if not self.db_conn:
-            return entities, relationships
-        
-        try:
-            # Get entities
-            if doc_id:
-                # Get entities involved in relationships for this doc
-                entity_results = self.db_conn.execute("""
-                    SELECT DISTINCT e.id, e.type, e.label
-                    FROM entities e
-                    JOIN relationships r ON e.id = r.source OR e.id = r.target
-                    WHERE r.doc_id = ?
-                """, (doc_id,)).fetchall()
-            else:
-                entity_results = self.db_conn.execute("""
-                    SELECT id, type, label
-                    FROM entities
-                """).fetchall()
-            
-            for row in entity_results:
-                entities.append({
-                    "id": row[0],
-                    "type": row[1],
-                    "label": row[2],
-                })
-            
-            # Get relationships
-            if doc_id:
-                rel_results = self.db_conn.execute("""
-                    SELECT source, target, type, confidence
-                    FROM relationships
-                    WHERE doc_id = ?
-                """, (doc_id,)).fetchall()
-            else:
-                rel_results = self.db_conn.execute("""
-                    SELECT source, target, type, confidence
-                    FROM relationships
-                """).fetchall()
-            
-            for row in rel_results:
-                relationships.append({
-                    "source": row[0],
-                    "target": row[1],
-                    "type": row[2],
-                    "confidence": row[3],
-                })
-        
-        except Exception as e:
-            logger.error(f"Error fetching graph data: {e}")
-        
-        return entities, relationships
-    
-    def _build_networkx_graph(
+    async def _update_communities(
         self,
-        entities: List[Dict[str, Any]],
-        relationships: List[Dict[str, Any]]
-    ):
-        """Build a NetworkX graph from entities and relationships."""
-        try:
-            import networkx as nx
-        except ImportError:
-            logger.error("NetworkX not installed. Run: pip install networkx")
-            return None
-        
-        # Create directed graph
-        G = nx.DiGraph()
-        
-        # Add nodes
-        for entity in entities:
-            G.add_node(
-                entity["id"],
-                type=entity["type"],
-                label=entity["label"]
-            )
-        
-        # Add edges
-        for rel in relationships:
-            G.add_edge(
-                rel["source"],
-                rel["target"],
-                type=rel["type"],
-                confidence=rel["confidence"]
-            )
-        
-        return G
-    
-    def _compute_centrality(self, graph) -> Dict[str, Any]:
-        """Compute centrality metrics for the graph."""
-        if graph is None:
-            return {}
+        scope: str,
+        arrays: EdgeArrays,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Bring the scope's community tracker up to date with a graph version.
         
-        try:
-            import networkx as nx
-            
-            # Degree centrality
-            degree_centrality = nx.degree_centrality(graph)
-            most_connected = sorted(
-                [(node, score) for node, score in degree_centrality.items()],
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
-            
-            # Betweenness centrality (bridges)
-            betweenness = nx.betweenness_centrality(graph)
-            bridges = sorted(
-                [(node, score) for node, score in betweenness.items() if score > 0],
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
-            
-            # PageRank
-            pagerank = nx.pagerank(graph)
-            influential = sorted(
-                [(node, score) for node, score in pagerank.items()],
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
-            
-            return {
-                "most_connected": [{"entity": node, "degree": score} for node, score in most_connected],
-                "bridges": [{"entity": node, "betweenness": score} for node, score in bridges],
-                "influential": [{"entity": node, "pagerank": score} for node, score in influential],
-            }
-        
-        except Exception as e:
-            logger.error(f"Error computing centrality: {e}")
-            return {}
-    
-    def _detect_communities(self, graph) -> List[Dict[str, Any]]:
-        """Detect communities in the graph."""
-        if graph is None:
-            return []
-        
-        try:
-            import networkx as nx
-            
-            # Convert to undirected for community detection
-            undirected = graph.to_undirected()
-            
-            # Use Louvain community detection
-            try:
-                from networkx.algorithms import community
-                communities = community.louvain_communities(undirected)
-            except (ImportError, AttributeError):
-                # Fallback to simple connected components
-                communities = list(nx.connected_components(undirected))
-            
-            # Format results
-            result = []
-            for i, comm in enumerate(communities[:10]):  # Top 10 communities
-                if len(comm) >= 2:  # Only include communities with 2+ nodes
-                    result.append({
-                        "id": i,
-                        "entities": list(comm)[:20],  # Limit to 20 entities
-                        "size": len(comm),
-                    })
-            
-            return result
-        
-        except Exception as e:
-            logger.error(f"Error detecting communities: {e}")
-            return []
-    
-    def _compute_statistics(self, graph) -> Dict[str, Any]:
-        """Compute basic graph statistics."""
-        if graph is None:
-            return {}
-        
-        try:
-            import networkx as nx
+        Returns:
+            Tuple of (top communities with stable ids, membership delta)
+        """
+        async with self._community_lock:
+            tracker = self._community_trackers.get(scope)
+            if tracker is None:
+                tracker = self._community_trackers[scope] = CommunityTracker()
+            self._community_trackers.move_to_end(scope)
+            while len(self._community_trackers) > self._cache_size:
+                self._community_trackers.popitem(last=False)
             
-            return {
-                "num_nodes": graph.number_of_nodes(),
-                "num_edges": graph.number_of_edges(),
-                "density": nx.density(graph),
-                "is_connected": nx.is_weakly_connected(graph),
-                "num_components": nx.number_weakly_connected_components(graph),
-            }
-        
-        except Exception as e:
-            logger.error(f"Error computing statistics: {e}")
-            return {}
+            plan = tracker.plan(arrays)
+            partition = None
+            if plan.region is not None:
+                try:
+                    partition = (
+                        await self._run_analytics(louvain_partition, plan.region)
+                        if plan.region.num_nodes else []
+                    )
+                except ImportError:
+                    logger.error("NetworkX not installed. Run: pip install networkx")
+                    return [], {}
+            delta = tracker.apply(plan, partition)
+            return tracker.communities(), delta
     
     async def _infer_relationships(
         self,
-        entities: List[Dict[str, Any]],
-        relationships: List[Dict[str, Any]]
+        snapshot: GraphSnapshot,
+        arrays: Optional[EdgeArrays] = None,
     ) -> List[Dict[str, Any]]:
         """Infer missing relationships using LLM.
         
-        Looks for entities that are mentioned together but lack direct relationships.
+        Scores every non-adjacent entity pair with sparse link prediction
+        (off the event loop) and sends only the top-ranked candidates to the
+        LLM, concurrently under the shared rate limiter. Each pair is sent to
+        the LLM once per database; later analyses rank only the other pairs.
         """
-        # Build adjacency for quick lookup
-        adjacency = defaultdict(set)
-        for rel in relationships:
-            adjacency[rel["source"]].add(rel["target"])
-            adjacency[rel["target"]].add(rel["source"])
-        
-        # Find entity pairs that might be related but aren't connected
-        candidates = []
-        entity_ids = [e["id"] for e in entities]
-        
-        for i, entity1 in enumerate(entities[:20]):  # Limit to first 20 for performance
-            for entity2 in entities[i+1:20]:
-                # Skip if already connected
-                if entity2["id"] in adjacency[entity1["id"]]:
-                    continue
-                
-                # Check if they have common neighbors (potential transitive relationship)
-                neighbors1 = adjacency[entity1["id"]]
-                neighbors2 = adjacency[entity2["id"]]
-                common = neighbors1 & neighbors2
-                
-                if len(common) >= 2:  # At least 2 common neighbors
-                    candidates.append((entity1, entity2, list(common)))
+        if arrays is None:
+            arrays = snapshot.edge_arrays()
+        
+        candidates = await self._run_analytics(
+            predict_links,
+            arrays,
+            self._link_prediction_method,
+            self._inference_top_k,
+            exclude=frozenset(self._evaluated_pairs),
+        )
+        if not candidates:
+            return []
         
-        # Infer relationships for top candidates
-        inferred = []
-        for entity1, entity2, common_neighbors in candidates[:5]:  # Top 5 candidates
-            relationship = await self._infer_relationship_with_llm(
-                entity1, entity2, common_neighbors
+        candidates = [
+            c for c in candidates
+            if snapshot.node_index(c["source"]) is not None and snapshot.node_index(c["target"]) is not None
+            and _pair_key(c["source"], c["target"]) not in self._evaluated_pairs
+        ]
+        # Recorded before the LLM calls so overlapping analyses skip them too
+        self._evaluated_pairs.update(_pair_key(c["source"], c["target"]) for c in candidates)
+        
+        # Infer relationships for top candidates (rate limiter bounds concurrency)
+        results = await asyncio.gather(*(
+            self._infer_relationship_with_llm(
+                snapshot.entity(c["source"]), snapshot.entity(c["target"]), c["common_neighbors"]
             )
+            for c in candidates
+        ))
+        
+        inferred = []
+        for candidate, relationship in zip(candidates, results):
             if relationship:
+                relationship["link_score"] = candidate["score"]
+                relationship["link_method"] = self._link_prediction_method
                 inferred.append(relationship)
                 
                 # Emit inferred relationship event
@@ -0,0 +1,67 @@
+"""Benchmark harness for GraphAnalysisService.
+
+Feeds synthetic relationship batches through the graph stage and reports
+per-batch and overall relationships/sec.
+
+Usage:
+    python -m forge.domain.graph.bench_graph_service [batches] [batch_size] [entities]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from forge.core.event_bus import EventBus
+from forge.core import events
+from forge.domain.graph.service import GraphAnalysisService
+
+ENTITY_TYPES = ["PERSON", "ORGANIZATION", "LOCATION", "EVENT"]
+RELATION_TYPES = ["WORKS_AT", "LOCATED_IN", "KNOWS", "PARTICIPATED_IN"]
+
+
+def make_batch(rng: random.Random, batch_size: int, entity_count: int):
+    """Build one synthetic relationship batch."""
+    batch = []
+    for _ in range(batch_size):
+        source = rng.randrange(entity_count)
+        target = rng.randrange(entity_count)
+        batch.append({
+            "source": f"entity_{source}",
+            "target": f"entity_{target}",
+            "source_type": ENTITY_TYPES[source % len(ENTITY_TYPES)],
+            "target_type": ENTITY_TYPES[target % len(ENTITY_TYPES)],
+            "relation_type": rng.choice(RELATION_TYPES),
+            "confidence": rng.random(),
+        })
+    return batch
+
+
+async def main(batches: int = 2000, batch_size: int = 25, entity_count: int = 5000):
+    bus = EventBus()
+    graph_service = GraphAnalysisService(bus)
+    await graph_service.start()
+    rng = random.Random(42)
+
+    started = time.perf_counter()
+    for index in range(batches):
+        await graph_service.handle_relationship_found(
+            events.create_relationship_found_event(
+                doc_id=f"doc_{index % 50}",
+                relationships=make_batch(rng, batch_size, entity_count),
+                batch_index=index,
+            )
+        )
+    wall = time.perf_counter() - started
+
+    stats = graph_service.get_throughput()
+    print(f"[Bench] graph stage: {stats['batches']} batches, {stats['relationships']} relationships")
+    print(f"[Bench] stage time {stats['seconds']:.3f}s -> {stats['relationships_per_sec']:.0f} rel/s")
+    print(f"[Bench] wall time  {wall:.3f}s -> {stats['relationships'] / wall if wall > 0 else 0.0:.0f} rel/s (incl. publish)")
+    if stats["last_batch"]:
+        print(f"[Bench] last batch: {stats['last_batch']['relationships_per_sec']:.0f} rel/s")
+    print(f"[Bench] graph version {graph_service.version}, "
+          f"{graph_service.get_snapshot()['edge_count']} edges")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
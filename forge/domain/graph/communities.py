@@ -0,0 +1,306 @@
+"""Incremental community detection for PyScrAI Forge.
+
+``CommunityTracker`` keeps a community assignment across graph versions.
+On each update it diffs the new edge set against the previous one and
+re-optimizes only the communities touched by added/removed edges (plus new
+nodes). Untouched communities are contracted into weighted super-nodes, so
+Louvain still scores the touched region against the whole graph's
+modularity while working on a graph whose size is proportional to the
+change. Resulting communities are mapped back onto previous ids by member
+overlap; ids therefore stay stable between runs, and every update reports
+which communities were created, dissolved or changed membership.
+
+Louvain itself runs through ``louvain_partition``, a picklable function that
+the analyzer executes in its worker pool.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from forge.domain.graph.analytics import EdgeArrays
+
+logger = logging.getLogger(__name__)
+
+COMMUNITY_SEED = 42
+# Re-run Louvain on the whole graph when the touched region exceeds this share of nodes
+FULL_REBUILD_FRACTION = 0.5
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+# Prefix of contracted community node ids in a region graph
+_SUPER_NODE_PREFIX = "\x00community:"
+
+
+def louvain_partition(arrays: EdgeArrays, seed: int = COMMUNITY_SEED) -> List[List[str]]:
+    """Partition a weighted undirected graph into communities (worker side).
+
+    ``arrays`` is expected to hold each undirected edge once, with its
+    weight; self-loops carry the internal weight of contracted communities.
+    """
+    import networkx as nx
+
+    graph = nx.Graph()
+    node_ids = arrays.node_ids
+    graph.add_nodes_from(node_ids)
+    graph.add_weighted_edges_from(
+        (node_ids[s], node_ids[t], w)
+        for s, t, w in zip(arrays.sources.tolist(), arrays.targets.tolist(), arrays.weights.tolist())
+    )
+    try:
+        from networkx.algorithms import community
+        parts = community.louvain_communities(graph, weight="weight", seed=seed)
+    except (ImportError, AttributeError):
+        # Fallback to simple connected components
+        parts = nx.connected_components(graph)
+    return [sorted(part) for part in parts]
+
+
+def _node_hashes(node_ids: List[str]) -> np.ndarray:
+    return np.fromiter((hash(node_id) for node_id in node_ids), dtype=np.int64, count=len(node_ids)).view(np.uint64)
+
+
+def _per_edge_keys(arrays: EdgeArrays) -> np.ndarray:
+    """64-bit key of each edge, symmetric in its endpoints; 0 for self-loops.
+
+    Keys are derived from node id hashes, so they are comparable across
+    snapshots even though node indices are not.
+    """
+    hashes = _node_hashes(arrays.node_ids)
+    a, b = hashes[arrays.sources], hashes[arrays.targets]
+    low, high = np.minimum(a, b), np.maximum(a, b)
+    with np.errstate(over="ignore"):
+        keys = low ^ (high * _GOLDEN + (low << np.uint64(6)) + (low >> np.uint64(2)))
+    keys[a == b] = 0
+    return keys
+
+
+def _edge_keys(arrays: EdgeArrays) -> np.ndarray:
+    """Sorted unique keys of the undirected, loop-free edge set."""
+    keys = np.unique(_per_edge_keys(arrays))
+    return keys[keys != 0]
+
+
+def _endpoints_of(arrays: EdgeArrays, keys: np.ndarray) -> Set[str]:
+    """Node ids incident to any edge of ``arrays`` whose key is in ``keys``."""
+    hit = np.isin(_per_edge_keys(arrays), keys)
+    node_ids = arrays.node_ids
+    return {node_ids[i] for i in np.union1d(arrays.sources[hit], arrays.targets[hit]).tolist()}
+
+
+def _contract(arrays: EdgeArrays, groups: np.ndarray, group_ids: List[str]) -> EdgeArrays:
+    """Weighted graph over ``group_ids`` where node ``i`` of ``arrays`` maps to ``groups[i]``.
+
+    Each undirected edge of ``arrays`` counts once (parallel and reciprocal
+    edges collapse, self-loops are dropped); edges inside a group become a
+    self-loop carrying their total weight.
+    """
+    n = max(arrays.num_nodes, 1)
+    low = np.minimum(arrays.sources, arrays.targets).astype(np.int64)
+    high = np.maximum(arrays.sources, arrays.targets).astype(np.int64)
+    loop_free = low != high
+    pairs = np.unique(low[loop_free] * n + high[loop_free])
+    u, v = groups[pairs // n], groups[pairs % n]
+
+    g = max(len(group_ids), 1)
+    grouped, weights = np.unique(np.minimum(u, v) * g + np.maximum(u, v), return_counts=True)
+    return EdgeArrays(
+        node_ids=group_ids,
+        sources=(grouped // g).astype(np.int32),
+        targets=(grouped % g).astype(np.int32),
+        weights=weights.astype(np.float64),
+    )
+
+
+@dataclass
+class CommunityPlan:
+    """Work needed to bring a tracker up to date with a graph version."""
+    arrays: EdgeArrays
+    edge_keys: np.ndarray
+    full: bool
+    # Nodes whose community must be recomputed (all nodes when full)
+    region_nodes: List[str] = field(default_factory=list)
+    # Graph to partition: region nodes plus one super-node per untouched
+    # community; None when nothing changed
+    region: Optional[EdgeArrays] = None
+    # Super-node id -> frozen community id
+    super_nodes: Dict[str, int] = field(default_factory=dict)
+
+
+class CommunityTracker:
+    """Maintains communities with stable ids across graph versions."""
+
+    def __init__(self, full_rebuild_fraction: float = FULL_REBUILD_FRACTION):
+        self._full_rebuild_fraction = full_rebuild_fraction
+        self._assignment: Dict[str, int] = {}
+        self._members: Dict[int, Set[str]] = {}
+        self._edge_keys: Optional[np.ndarray] = None
+        self._arrays: Optional[EdgeArrays] = None
+        self._next_id = 0
+
+    @property
+    def initialized(self) -> bool:
+        return self._edge_keys is not None
+
+    def plan(self, arrays: EdgeArrays) -> CommunityPlan:
+        """Diff a graph version against the tracked one and pick the region to re-optimize."""
+        node_ids = list(arrays.node_ids)
+        edge_keys = _edge_keys(arrays)
+
+        if not self.initialized:
+            return self._full_plan(arrays, edge_keys)
+
+        changed = np.setxor1d(edge_keys, self._edge_keys, assume_unique=True)
+        current = set(node_ids)
+        new_nodes = current.difference(self._assignment)
+        removed_nodes = set(self._assignment).difference(current)
+        if changed.size == 0 and not new_nodes and not removed_nodes:
+            return CommunityPlan(arrays, edge_keys, full=False)
+
+        # Communities touched by added/removed edges (either endpoint) or lost nodes
+        touched: Set[int] = set()
+        if changed.size:
+            endpoints = _endpoints_of(arrays, changed)
+            if self._arrays is not None:
+                endpoints |= _endpoints_of(self._arrays, changed) & current
+            touched.update(self._assignment[n] for n in endpoints if n in self._assignment)
+        touched.update(self._assignment[n] for n in removed_nodes)
+
+        region_set = set(new_nodes)
+        for community_id in touched:
+            region_set.update(n for n in self._members[community_id] if n in current)
+
+        if len(region_set) > self._full_rebuild_fraction * len(node_ids):
+            return self._full_plan(arrays, edge_keys)
+
+        # Region nodes stay individual; every other node collapses into its community
+        region_nodes = sorted(region_set)
+        frozen = sorted(set(self._members) - touched)
+        super_nodes = {f"{_SUPER_NODE_PREFIX}{community_id}": community_id for community_id in frozen}
+        group_of = {node_id: i for i, node_id in enumerate(region_nodes)}
+        super_index = {community_id: len(region_nodes) + i for i, community_id in enumerate(frozen)}
+        groups = np.fromiter(
+            (
+                group_of[node_id] if node_id in group_of else super_index[self._assignment[node_id]]
+                for node_id in node_ids
+            ),
+            dtype=np.int64,
+            count=len(node_ids),
+        )
+        return CommunityPlan(
+            arrays, edge_keys, full=False,
+            region_nodes=region_nodes,
+            region=_contract(arrays, groups, region_nodes + list(super_nodes)),
+            super_nodes=super_nodes,
+        )
+
+    @staticmethod
+    def _full_plan(arrays: EdgeArrays, edge_keys: np.ndarray) -> CommunityPlan:
+        node_ids = list(arrays.node_ids)
+        return CommunityPlan(
+            arrays, edge_keys, full=True,
+            region_nodes=node_ids,
+            region=_contract(arrays, np.arange(len(node_ids), dtype=np.int64), node_ids),
+        )
+
+    def apply(self, plan: CommunityPlan, partition: Optional[List[List[str]]]) -> Dict[str, Any]:
+        """Merge a (re)computed partition of the plan's region into the tracked state.
+
+        Args:
+            plan: Plan returned by ``plan()``
+            partition: Communities of ``plan.region`` (ignored if the plan has no region)
+
+        Returns:
+            Membership delta with ``created`` and ``dissolved`` community ids,
+            ``changed`` ({id: {"joined": [...], "left": [...]}}), ``moved``
+            node count and ``method`` ("full", "incremental" or "unchanged")
+        """
+        previous = self._assignment
+
+        if plan.region is None or partition is None:
+            self._edge_keys = plan.edge_keys
+            self._arrays = plan.arrays
+            return {"method": "unchanged", "created": [], "dissolved": [], "changed": {}, "moved": 0}
+
+        current = set(plan.arrays.node_ids)
+        region = set(plan.region_nodes)
+        assignment = {n: c for n, c in previous.items() if n in current and n not in region}
+        # Frozen communities keep their ids
+        claimed = set(plan.super_nodes.values())
+
+        # Largest new communities pick first among the previous ids of their members
+        for part in sorted(partition, key=len, reverse=True):
+            frozen = [plan.super_nodes[n] for n in part if n in plan.super_nodes]
+            members = [n for n in part if n not in plan.super_nodes]
+            if frozen:
+                # Region nodes joined a frozen community; if Louvain merged several
+                # frozen communities, the largest one absorbs the others
+                community_id = max(frozen, key=lambda c: (len(self._members[c]), -c))
+                for other in frozen:
+                    if other != community_id:
+                        for node_id in self._members[other]:
+                            if node_id in assignment:
+                                assignment[node_id] = community_id
+            else:
+                overlap: Dict[int, int] = {}
+                for node_id in members:
+                    old_id = previous.get(node_id)
+                    if old_id is not None and old_id not in claimed:
+                        overlap[old_id] = overlap.get(old_id, 0) + 1
+                if overlap:
+                    community_id = max(overlap.items(), key=lambda item: (item[1], -item[0]))[0]
+                else:
+                    community_id = self._next_id
+                    self._next_id += 1
+            claimed.add(community_id)
+            for node_id in members:
+                assignment[node_id] = community_id
+
+        members_by_id: Dict[int, Set[str]] = {}
+        for node_id, community_id in assignment.items():
+            members_by_id.setdefault(community_id, set()).add(node_id)
+
+        delta = _membership_delta(self._members, members_by_id)
+        delta["method"] = "full" if plan.full else "incremental"
+        delta["moved"] = sum(
+            1 for node_id, community_id in assignment.items()
+            if previous.get(node_id) is not None and previous[node_id] != community_id
+        )
+
+        self._assignment = assignment
+        self._members = members_by_id
+        self._edge_keys = plan.edge_keys
+        self._arrays = plan.arrays
+        return delta
+
+    def community_of(self, node_id: str) -> Optional[int]:
+        """Stable community id of a node."""
+        return self._assignment.get(node_id)
+
+    def communities(self, top: int = 10, min_size: int = 2, max_listed: int = 20) -> List[Dict[str, Any]]:
+        """Largest communities, each with its stable ``id``, ``entities`` and ``size``."""
+        ranked = sorted(
+            (item for item in self._members.items() if len(item[1]) >= min_size),
+            key=lambda item: (-len(item[1]), item[0]),
+        )
+        return [
+            {"id": community_id, "entities": sorted(nodes)[:max_listed], "size": len(nodes)}
+            for community_id, nodes in ranked[:top]
+        ]
+
+
+def _membership_delta(before: Dict[int, Set[str]], after: Dict[int, Set[str]]) -> Dict[str, Any]:
+    """Created/dissolved ids and per-community joined/left members."""
+    changed: Dict[int, Dict[str, List[str]]] = {}
+    for community_id in set(before) | set(after):
+        old, new = before.get(community_id, set()), after.get(community_id, set())
+        if old != new:
+            changed[community_id] = {"joined": sorted(new - old), "left": sorted(old - new)}
+    return {
+        "created": sorted(set(after) - set(before)),
+        "dissolved": sorted(set(before) - set(after)),
+        "changed": changed,
+    }
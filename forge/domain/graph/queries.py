@@ -0,0 +1,310 @@
+"""Graph queries pushed down to DuckDB for PyScrAI Forge.
+
+Local-structure lookups (an entity's relationships, k-hop neighborhoods,
+shortest paths, ego networks) run as recursive CTEs over the
+``relationships`` table, with LIMIT/OFFSET applied in SQL, so callers fetch
+only the subgraph they need instead of loading the whole graph.
+
+All functions take a DuckDB connection and return plain dictionaries.
+``direction`` is one of ``"out"`` (follow source -> target), ``"in"``
+(target -> source) or ``"both"`` (treat edges as undirected).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ("out", "in", "both")
+
+
+def _edges_cte(direction: str) -> str:
+    """SQL for a traversable ``edges(src, dst)`` relation filtered by confidence.
+
+    The returned fragment takes one ``min_confidence`` parameter per branch;
+    see ``_edges_params``.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction '{direction}', expected one of {DIRECTIONS}")
+    out_edges = "SELECT source AS src, target AS dst FROM relationships WHERE confidence >= ?"
+    in_edges = "SELECT target AS src, source AS dst FROM relationships WHERE confidence >= ?"
+    if direction == "out":
+        return out_edges
+    if direction == "in":
+        return in_edges
+    return f"{out_edges} UNION ALL {in_edges}"
+
+
+def _edges_params(direction: str, min_confidence: float) -> Tuple[float, ...]:
+    return (min_confidence,) * (2 if direction == "both" else 1)
+
+
+def entity_relationships(
+    conn,
+    entity_id: str,
+    limit_per_direction: int = 20,
+) -> List[Dict[str, Any]]:
+    """Get an entity's strongest outgoing and incoming relationships in one query.
+
+    Args:
+        conn: DuckDB connection
+        entity_id: Entity to look up
+        limit_per_direction: Maximum relationships per direction, highest confidence first
+
+    Returns:
+        Outgoing relationships followed by incoming ones, each with ``source``,
+        ``target``, ``type``, ``confidence`` and ``direction``
+    """
+    rows = conn.execute("""
+        SELECT source, target, type, confidence, direction FROM (
+            SELECT * FROM (
+                SELECT source, target, type, confidence, 'outgoing' AS direction
+                FROM relationships
+                WHERE source = ?
+                ORDER BY confidence DESC
+                LIMIT ?
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT source, target, type, confidence, 'incoming' AS direction
+                FROM relationships
+                WHERE target = ?
+                ORDER BY confidence DESC
+                LIMIT ?
+            )
+        )
+        ORDER BY direction = 'incoming', confidence DESC
+    """, (entity_id, limit_per_direction, entity_id, limit_per_direction)).fetchall()
+
+    return [
+        {
+            "source": row[0],
+            "target": row[1],
+            "type": row[2],
+            "confidence": row[3],
+            "direction": row[4],
+        }
+        for row in rows
+    ]
+
+
+def k_hop_neighborhood(
+    conn,
+    entity_id: str,
+    k: int = 2,
+    direction: str = "both",
+    min_confidence: float = 0.0,
+    limit: int = 100,
+    offset: int = 0,
+    include_center: bool = False,
+) -> List[Dict[str, Any]]:
+    """Get the entities within ``k`` hops of an entity.
+
+    Breadth-first expansion runs as a recursive CTE; ``UNION`` de-duplicates
+    (node, depth) pairs so each level's frontier is bounded by the node count.
+
+    Args:
+        conn: DuckDB connection
+        entity_id: Center entity
+        k: Maximum number of hops
+        direction: Edge direction to follow (see module docstring)
+        min_confidence: Ignore relationships below this confidence
+        limit: Page size
+        offset: Page offset
+        include_center: Include the center entity (depth 0) in the results
+
+    Returns:
+        Page of entities ordered by (depth, id), each with ``id``, ``type``,
+        ``label`` and ``depth`` (hop distance from the center)
+    """
+    rows = conn.execute(f"""
+        WITH RECURSIVE
+            edges AS ({_edges_cte(direction)}),
+            hops(node, depth) AS (
+                SELECT ?::VARCHAR, 0
+                UNION
+                SELECT e.dst, h.depth + 1
+                FROM hops h
+                JOIN edges e ON e.src = h.node
+                WHERE h.depth < ?
+            ),
+            reached AS (
+                SELECT node, MIN(depth) AS depth
+                FROM hops
+                GROUP BY node
+            )
+        SELECT r.node, e.type, e.label, r.depth
+        FROM reached r
+        LEFT JOIN entities e ON e.id = r.node
+        WHERE r.depth > 0 OR ?
+        ORDER BY r.depth, r.node
+        LIMIT ? OFFSET ?
+    """, _edges_params(direction, min_confidence) + (entity_id, k, include_center, limit, offset)).fetchall()
+
+    return [
+        {"id": row[0], "type": row[1], "label": row[2] or row[0], "depth": row[3]}
+        for row in rows
+    ]
+
+
+def shortest_path(
+    conn,
+    source: str,
+    target: str,
+    max_depth: int = 6,
+    direction: str = "both",
+    min_confidence: float = 0.0,
+) -> Optional[Dict[str, Any]]:
+    """Find one shortest path between two entities.
+
+    Computes BFS distances from both endpoints (bounded by ``max_depth``),
+    then enumerates paths only along edges of the shortest-path DAG
+    (``d_source(u) + 1 + d_target(v) == distance``), so path expansion never
+    wanders off the shortest routes.
+
+    Args:
+        conn: DuckDB connection
+        source: Start entity
+        target: End entity
+        max_depth: Maximum path length in hops
+        direction: Edge direction to follow (see module docstring)
+        min_confidence: Ignore relationships below this confidence
+
+    Returns:
+        Dictionary with ``nodes`` (entity ids, source first), ``edges``
+        (relationship dicts along the path) and ``length``, or None if the
+        entities are not connected within ``max_depth`` hops
+    """
+    if source == target:
+        return {"nodes": [source], "edges": [], "length": 0}
+
+    edge_params = _edges_params(direction, min_confidence)
+    row = conn.execute(f"""
+        WITH RECURSIVE
+            edges AS ({_edges_cte(direction)}),
+            fwd(node, depth) AS (
+                SELECT ?::VARCHAR, 0
+                UNION
+                SELECT e.dst, f.depth + 1
+                FROM fwd f JOIN edges e ON e.src = f.node
+                WHERE f.depth < ?
+            ),
+            bwd(node, depth) AS (
+                SELECT ?::VARCHAR, 0
+                UNION
+                SELECT e.src, b.depth + 1
+                FROM bwd b JOIN edges e ON e.dst = b.node
+                WHERE b.depth < ?
+            ),
+            dist_s AS (SELECT node, MIN(depth) AS d FROM fwd GROUP BY node),
+            dist_t AS (SELECT node, MIN(depth) AS d FROM bwd GROUP BY node),
+            total AS (SELECT d FROM dist_s WHERE node = ?),
+            dag AS (
+                SELECT e.src, e.dst, s.d AS depth
+                FROM edges e
+                JOIN dist_s s ON s.node = e.src
+                JOIN dist_t t ON t.node = e.dst
+                WHERE s.d + 1 + t.d = (SELECT d FROM total)
+            ),
+            paths(node, path) AS (
+                SELECT ?::VARCHAR, [?::VARCHAR]
+                UNION ALL
+                SELECT dag.dst, list_append(p.path, dag.dst)
+                FROM paths p
+                JOIN dag ON dag.src = p.node AND dag.depth = len(p.path) - 1
+            )
+        SELECT path FROM paths WHERE node = ? LIMIT 1
+    """, edge_params + (source, max_depth, target, max_depth, target, source, source, target)).fetchone()
+
+    if not row:
+        return None
+
+    nodes = list(row[0])
+    return {
+        "nodes": nodes,
+        "edges": _path_edges(conn, nodes, direction, min_confidence),
+        "length": len(nodes) - 1,
+    }
+
+
+def _path_edges(
+    conn,
+    nodes: List[str],
+    direction: str,
+    min_confidence: float,
+) -> List[Dict[str, Any]]:
+    """Fetch the strongest relationship for each hop of a path."""
+    if len(nodes) < 2:
+        return []
+    hops = list(zip(nodes[:-1], nodes[1:]))
+    rows = conn.execute("""
+        SELECT hop, source, target, type, confidence FROM (
+            SELECT h.hop, r.source, r.target, r.type, r.confidence,
+                   row_number() OVER (PARTITION BY h.hop ORDER BY r.confidence DESC) AS rank
+            FROM (SELECT UNNEST(?) AS a, UNNEST(?) AS b, UNNEST(range(?)) AS hop) h
+            JOIN relationships r
+              ON ((r.source = h.a AND r.target = h.b AND ? IN ('out', 'both'))
+               OR (r.source = h.b AND r.target = h.a AND ? IN ('in', 'both')))
+            WHERE r.confidence >= ?
+        )
+        WHERE rank = 1
+        ORDER BY hop
+    """, (
+        [a for a, _ in hops], [b for _, b in hops], len(hops),
+        direction, direction, min_confidence,
+    )).fetchall()
+    return [
+        {"source": row[1], "target": row[2], "type": row[3], "confidence": row[4]}
+        for row in rows
+    ]
+
+
+def ego_network(
+    conn,
+    entity_id: str,
+    radius: int = 1,
+    direction: str = "both",
+    min_confidence: float = 0.0,
+    node_limit: int = 50,
+    edge_limit: int = 200,
+    edge_offset: int = 0,
+) -> Dict[str, Any]:
+    """Extract the ego network of an entity.
+
+    Nodes are the center plus the nearest ``node_limit`` entities within
+    ``radius`` hops; edges are the relationships among those nodes, strongest
+    first, paginated with ``edge_limit``/``edge_offset``.
+
+    Returns:
+        Dictionary with ``center``, ``nodes`` (as in ``k_hop_neighborhood``),
+        ``edges`` (relationship dicts) and ``truncated`` (True if more
+        neighbors exist than ``node_limit``)
+    """
+    neighbors = k_hop_neighborhood(
+        conn, entity_id, k=radius, direction=direction, min_confidence=min_confidence,
+        limit=node_limit + 2, include_center=True,
+    )
+    # The center occupies one slot; fetch one extra row to detect truncation
+    truncated = len(neighbors) > node_limit + 1
+    nodes = neighbors[:node_limit + 1]
+    node_ids = [node["id"] for node in nodes]
+
+    rows = conn.execute("""
+        SELECT source, target, type, confidence
+        FROM relationships
+        WHERE list_contains(?, source) AND list_contains(?, target) AND confidence >= ?
+        ORDER BY confidence DESC, id
+        LIMIT ? OFFSET ?
+    """, (node_ids, node_ids, min_confidence, edge_limit, edge_offset)).fetchall()
+
+    return {
+        "center": entity_id,
+        "nodes": nodes,
+        "edges": [
+            {"source": row[0], "target": row[1], "type": row[2], "confidence": row[3]}
+            for row in rows
+        ],
+        "truncated": truncated,
+    }
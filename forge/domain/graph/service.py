@@ -3,78 +3,202 @@
 Analyzes relationships and builds/updates the knowledge graph.
 """
 
-import asyncio
-from typing import Dict, List, Any
+import logging
+import time
+from typing import Dict, List, Any, Tuple
 from forge.core.event_bus import EventBus, EventPayload
 from forge.core import events
 
+logger = logging.getLogger(__name__)
+
+EdgeKey = Tuple[Any, Any, Any, Any]
+
 
 class GraphAnalysisService:
-    """Analyzes relationships and maintains the knowledge graph."""
-    
+    """Analyzes relationships and maintains the knowledge graph.
+
+    Each ``graph.updated`` event carries only the nodes and edges that were added
+    or changed by the triggering relationship batch, together with a monotonically
+    increasing graph version. Consumers that need the whole graph call
+    ``get_snapshot()``.
+    """
+
     def __init__(self, event_bus: EventBus):
         self.event_bus = event_bus
         # In-memory graph structure (replace with DuckDB later)
         self._nodes: Dict[str, Dict[str, Any]] = {}
         self._edges: List[Dict[str, Any]] = []
-    
+        # Natural edge keys (source, target, type, doc_id) for O(1) duplicate checks
+        self._edge_keys: set[EdgeKey] = set()
+        # Edges per document, so a document's subgraph is read without a full scan
+        self._doc_edges: Dict[Any, List[Dict[str, Any]]] = {}
+        self._version = 0
+        # Per-stage throughput counters (see get_throughput())
+        self._batches_processed = 0
+        self._relationships_processed = 0
+        self._processing_seconds = 0.0
+        self._last_batch: Dict[str, Any] = {}
+
+    @property
+    def version(self) -> int:
+        """Current graph version (incremented once per non-empty update)."""
+        return self._version
+
     async def start(self):
         """Start the service by subscribing to relationship events."""
         await self.event_bus.subscribe(
-            events.TOPIC_RELATIONSHIP_FOUND, 
+            events.TOPIC_RELATIONSHIP_FOUND,
             self.handle_relationship_found
         )
-    
-    async def handle_relationship_found(self, payload: EventPayload):
-        """Process discovered relationships and update the graph."""
-        doc_id = payload.get("doc_id", "unknown")
-        relationships = payload.get("relationships", [])
-        
-        # Simulate graph analysis (replace with real logic later)
-        await asyncio.sleep(0.2)
-        
-        # Add nodes and edges to the graph
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Return a point-in-time copy of the full graph.
+
+        Returns:
+            Dictionary with version, counts, and full node/edge lists
+        """
+        return {
+            "version": self._version,
+            "node_count": len(self._nodes),
+            "edge_count": len(self._edges),
+            "nodes": [dict(node) for node in self._nodes.values()],
+            "edges": [dict(edge) for edge in self._edges],
+        }
+
+    def get_document_subgraph(self, doc_id: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return copies of one document's edges and the nodes they connect.
+
+        Returns:
+            Tuple of (nodes, edges) for the document
+        """
+        edges = [dict(edge) for edge in self._doc_edges.get(doc_id, ())]
+        node_ids = dict.fromkeys(
+            node_id for edge in edges for node_id in (edge["source"], edge["target"]) if node_id
+        )
+        nodes = [dict(self._nodes[node_id]) for node_id in node_ids if node_id in self._nodes]
+        return nodes, edges
+
+    def get_throughput(self) -> Dict[str, Any]:
+        """Return throughput metrics for this pipeline stage.
+
+        Returns:
+            Dictionary with cumulative batch/relationship counts, total processing
+            time, overall relationships/sec, and the last batch's measurements
+        """
+        seconds = self._processing_seconds
+        return {
+            "stage": "graph",
+            "batches": self._batches_processed,
+            "relationships": self._relationships_processed,
+            "seconds": seconds,
+            "relationships_per_sec": (
+                self._relationships_processed / seconds if seconds > 0 else 0.0
+            ),
+            "last_batch": dict(self._last_batch),
+        }
+
+    def _record_batch(self, relationship_count: int, elapsed: float) -> None:
+        """Record timing for one processed relationship batch."""
+        self._batches_processed += 1
+        self._relationships_processed += relationship_count
+        self._processing_seconds += elapsed
+        self._last_batch = {
+            "relationships": relationship_count,
+            "seconds": elapsed,
+            "relationships_per_sec": relationship_count / elapsed if elapsed > 0 else 0.0,
+        }
+        logger.debug(
+            f"GraphAnalysisService: batch of {relationship_count} relationships in "
+            f"{elapsed * 1000:.2f}ms ({self._last_batch['relationships_per_sec']:.0f} rel/s)"
+        )
+
+    def apply_relationships(
+        self,
+        doc_id: str,
+        relationships: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Merge a relationship batch into the graph.
+
+        Args:
+            doc_id: Document ID the relationships came from
+            relationships: Relationship dictionaries from the resolution stage
+
+        Returns:
+            Tuple of (changed_nodes, added_edges) for this batch
+        """
+        changed_nodes: Dict[str, Dict[str, Any]] = {}
+        added_edges: List[Dict[str, Any]] = []
+
         for rel in relationships:
             source = rel.get("source")
             target = rel.get("target")
-            
-            # Add nodes if they don't exist
-            if source and source not in self._nodes:
-                self._nodes[source] = {
-                    "id": source,
-                    "type": rel.get("source_type"),
-                    "label": source,
-                }
-            
-            if target and target not in self._nodes:
-                self._nodes[target] = {
-                    "id": target,
-                    "type": rel.get("target_type"),
-                    "label": target,
-                }
-            
-            # Add edge
+
+            # Add nodes if they don't exist, or update their type if it changed
+            for node_id, node_type in (
+                (source, rel.get("source_type")),
+                (target, rel.get("target_type")),
+            ):
+                if not node_id:
+                    continue
+                node = self._nodes.get(node_id)
+                if node is None:
+                    node = {"id": node_id, "type": node_type, "label": node_id}
+                    self._nodes[node_id] = node
+                    changed_nodes[node_id] = node
+                elif node_type and node.get("type") != node_type:
+                    node["type"] = node_type
+                    changed_nodes[node_id] = node
+
+            # Add edge (skip exact duplicates within the same document)
+            rel_type = rel.get("relation_type")
+            key = (source, target, rel_type, doc_id)
+            if key in self._edge_keys:
+                continue
+            self._edge_keys.add(key)
             edge = {
                 "source": source,
                 "target": target,
-                "type": rel.get("relation_type"),
+                "type": rel_type,
                 "confidence": rel.get("confidence", 1.0),
                 "doc_id": doc_id,
             }
             self._edges.append(edge)
-        
-        # Emit graph update event
+            self._doc_edges.setdefault(doc_id, []).append(edge)
+            added_edges.append(edge)
+
+        return [dict(node) for node in changed_nodes.values()], added_edges
+
+    async def handle_relationship_found(self, payload: EventPayload):
+        """Process discovered relationships and update the graph."""
+        doc_id = payload.get("doc_id", "unknown")
+        relationships = payload.get("relationships", [])
+
+        started = time.perf_counter()
+        changed_nodes, added_edges = self.apply_relationships(doc_id, relationships)
+        self._record_batch(len(relationships), time.perf_counter() - started)
+
+        # Nothing new in this batch - no update to announce
+        if not changed_nodes and not added_edges:
+            return
+
+        self._version += 1
+
+        # Emit graph update event carrying only the delta
         graph_stats = {
+            "version": self._version,
+            "is_delta": True,
             "node_count": len(self._nodes),
             "edge_count": len(self._edges),
-            "nodes": list(self._nodes.values()),
-            "edges": self._edges,
+            "nodes": changed_nodes,
+            "edges": added_edges,
         }
-        
+
         await self.event_bus.publish(
             events.TOPIC_GRAPH_UPDATED,
             events.create_graph_updated_event(
                 doc_id=doc_id,
                 graph_stats=graph_stats,
+                graph_version=self._version,
+                is_complete=payload.get("is_complete", True),
             )
         )
@@ -0,0 +1,359 @@
+"""Immutable CSR graph snapshot for PyScrAI Forge.
+
+A ``GraphSnapshot`` is a compressed sparse row view of the knowledge graph
+built straight from the DuckDB ``entities``/``relationships`` tables: interned
+node ids, NumPy offset/target arrays, and typed attribute columns. Snapshots
+are cached per graph version and shared by analytics, layout and export;
+NetworkX graphs are materialized from them only when an algorithm needs one.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from forge.domain.graph.analytics import EdgeArrays
+
+logger = logging.getLogger(__name__)
+
+# Number of snapshots kept in the shared cache (global graph + a few doc scopes)
+SNAPSHOT_CACHE_SIZE = 4
+
+
+def _column(result: Dict[str, Any], name: str) -> np.ndarray:
+    """Get a fetchnumpy() column as a plain ndarray."""
+    return np.ma.getdata(result[name])
+
+
+def graph_fingerprint(conn, doc_id: Optional[str] = None) -> Tuple[Any, ...]:
+    """Compute a content fingerprint (graph version) of the database graph.
+
+    Aggregates over entity/relationship rows, so any insert, delete or rewrite
+    (e.g. a merge) changes the fingerprint. Includes the database path so
+    snapshots of different project files never collide.
+
+    Returns:
+        Fingerprint tuple, or an empty tuple if the graph cannot be read
+    """
+    if not conn:
+        return ()
+    try:
+        db_row = conn.execute(
+            "SELECT path FROM duckdb_databases() WHERE database_name = current_database()"
+        ).fetchone()
+        rel_filter = "WHERE doc_id = ?" if doc_id else ""
+        params = (doc_id,) if doc_id else ()
+        rel_row = conn.execute(f"""
+            SELECT COUNT(*), COALESCE(MAX(id), 0),
+                   COALESCE(BIT_XOR(hash(source, target, type, confidence)), 0)
+            FROM relationships
+            {rel_filter}
+        """, params).fetchone()
+        entity_row = conn.execute("""
+            SELECT COUNT(*), COALESCE(BIT_XOR(hash(id, type, label)), 0)
+            FROM entities
+        """).fetchone()
+        return (db_row[0] if db_row else None, doc_id) + tuple(rel_row or ()) + tuple(entity_row or ())
+    except Exception as e:
+        logger.debug(f"Could not fingerprint graph: {e}")
+        return ()
+
+
+def graph_version(conn, doc_id: Optional[str] = None) -> Tuple[Any, ...]:
+    """Get a cheap version of the database graph.
+
+    A connection manager reports its writer's commit count, which changes with
+    every write without reading any table. Plain connections (and databases
+    whose writes bypass the writer) fall back to ``graph_fingerprint``.
+
+    Returns:
+        Version tuple, or an empty tuple if the graph cannot be read
+    """
+    write_version = getattr(conn, "write_version", None)
+    if write_version:
+        return ("writes",) + tuple(write_version) + (doc_id,)
+    return graph_fingerprint(conn, doc_id)
+
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    """Compressed sparse row snapshot of the (optionally doc-scoped) graph.
+
+    Outgoing edges of node ``i`` are ``targets[offsets[i]:offsets[i + 1]]``;
+    the edge attribute columns are aligned with ``targets``. Categorical
+    attributes are stored as int32 codes into a vocabulary tuple.
+    """
+    version: Tuple[Any, ...]
+    node_ids: Tuple[str, ...]
+    node_labels: Tuple[str, ...]
+    node_type_codes: np.ndarray
+    node_type_vocab: Tuple[str, ...]
+    offsets: np.ndarray
+    targets: np.ndarray
+    edge_type_codes: np.ndarray
+    edge_type_vocab: Tuple[str, ...]
+    confidence: np.ndarray
+    _index: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_duckdb(
+        cls,
+        conn,
+        doc_id: Optional[str] = None,
+        version: Optional[Tuple[Any, ...]] = None,
+    ) -> "GraphSnapshot":
+        """Build a snapshot with two columnar queries.
+
+        Args:
+            conn: DuckDB connection
+            doc_id: Restrict to relationships of this document (and their endpoints)
+            version: Graph version to stamp on the snapshot (computed if None)
+        """
+        if version is None:
+            version = graph_fingerprint(conn, doc_id)
+
+        rel_filter = "WHERE r.doc_id = ?" if doc_id else ""
+        params = (doc_id,) if doc_id else ()
+        if doc_id:
+            node_query = f"""
+                SELECT e.id, COALESCE(e.type, 'UNKNOWN') AS type, COALESCE(e.label, e.id) AS label
+                FROM entities e
+                WHERE e.id IN (
+                    SELECT r.source FROM relationships r {rel_filter}
+                    UNION
+                    SELECT r.target FROM relationships r {rel_filter}
+                )
+                ORDER BY e.id
+            """
+            node_params = params + params
+        else:
+            node_query = """
+                SELECT id, COALESCE(type, 'UNKNOWN') AS type, COALESCE(label, id) AS label
+                FROM entities
+                ORDER BY id
+            """
+            node_params = ()
+        nodes = conn.execute(node_query, node_params).fetchnumpy()
+        node_ids = _column(nodes, "id")
+
+        # Edges as dense node indices, sorted by source for CSR layout
+        edges = conn.execute(f"""
+            WITH nodes AS (
+                SELECT id, (row_number() OVER (ORDER BY id) - 1)::INTEGER AS idx
+                FROM ({node_query})
+            )
+            SELECT s.idx AS src, t.idx AS dst,
+                   COALESCE(r.type, 'UNKNOWN') AS type, COALESCE(r.confidence, 0.0) AS confidence
+            FROM relationships r
+            JOIN nodes s ON r.source = s.id
+            JOIN nodes t ON r.target = t.id
+            {rel_filter}
+            ORDER BY src, dst
+        """, node_params + params).fetchnumpy()
+
+        sources = _column(edges, "src").astype(np.int64, copy=False)
+        offsets = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        if sources.size:
+            np.cumsum(np.bincount(sources, minlength=len(node_ids)), out=offsets[1:])
+
+        node_type_vocab, node_type_codes = np.unique(_column(nodes, "type"), return_inverse=True)
+        edge_type_vocab, edge_type_codes = np.unique(_column(edges, "type"), return_inverse=True)
+
+        return cls(
+            version=version,
+            node_ids=tuple(node_ids.tolist()),
+            node_labels=tuple(_column(nodes, "label").tolist()),
+            node_type_codes=node_type_codes.astype(np.int32),
+            node_type_vocab=tuple(node_type_vocab.tolist()),
+            offsets=offsets,
+            targets=_column(edges, "dst").astype(np.int32, copy=False),
+            edge_type_codes=edge_type_codes.astype(np.int32),
+            edge_type_vocab=tuple(edge_type_vocab.tolist()),
+            confidence=_column(edges, "confidence").astype(np.float64, copy=False),
+            _index={node_id: i for i, node_id in enumerate(node_ids.tolist())},
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.targets.shape[0])
+
+    def node_index(self, node_id: str) -> Optional[int]:
+        """Dense index of a node id, or None if absent."""
+        return self._index.get(node_id)
+
+    def sources(self) -> np.ndarray:
+        """Per-edge source indices (expanded from the CSR offsets)."""
+        return np.repeat(
+            np.arange(self.num_nodes, dtype=np.int32), np.diff(self.offsets)
+        )
+
+    def node_types(self) -> np.ndarray:
+        """Per-node type strings."""
+        return np.asarray(self.node_type_vocab, dtype=object)[self.node_type_codes]
+
+    def edge_types(self) -> np.ndarray:
+        """Per-edge relationship type strings."""
+        return np.asarray(self.edge_type_vocab, dtype=object)[self.edge_type_codes]
+
+    def degree(self) -> np.ndarray:
+        """Total (in + out) degree per node, counting parallel edges."""
+        out_degree = np.diff(self.offsets)
+        in_degree = np.bincount(self.targets, minlength=self.num_nodes)
+        return out_degree + in_degree
+
+    def type_counts(self) -> Dict[str, int]:
+        """Number of nodes per entity type."""
+        counts = np.bincount(self.node_type_codes, minlength=len(self.node_type_vocab))
+        return {t: int(c) for t, c in zip(self.node_type_vocab, counts.tolist())}
+
+    def entity(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Entity dict (id, type, label) for one node."""
+        i = self.node_index(node_id)
+        if i is None:
+            return None
+        return {
+            "id": node_id,
+            "type": self.node_type_vocab[self.node_type_codes[i]],
+            "label": self.node_labels[i],
+        }
+
+    def filter_edges(self, min_confidence: float) -> "GraphSnapshot":
+        """Return a snapshot keeping only edges with confidence >= min_confidence."""
+        keep = self.confidence >= min_confidence
+        if keep.all():
+            return self
+        kept_sources = self.sources()[keep]
+        offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(kept_sources, minlength=self.num_nodes), out=offsets[1:])
+        return GraphSnapshot(
+            version=self.version + (("min_confidence", min_confidence),),
+            node_ids=self.node_ids,
+            node_labels=self.node_labels,
+            node_type_codes=self.node_type_codes,
+            node_type_vocab=self.node_type_vocab,
+            offsets=offsets,
+            targets=self.targets[keep],
+            edge_type_codes=self.edge_type_codes[keep],
+            edge_type_vocab=self.edge_type_vocab,
+            confidence=self.confidence[keep],
+            _index=self._index,
+        )
+
+    def edge_arrays(self) -> EdgeArrays:
+        """Edge-array encoding for the analytics worker pool."""
+        return EdgeArrays(
+            node_ids=list(self.node_ids),
+            sources=self.sources(),
+            targets=self.targets,
+            weights=self.confidence,
+        )
+
+    def to_networkx(self, directed: bool = True, with_attributes: bool = False):
+        """Materialize a NetworkX graph (only when an algorithm needs one)."""
+        import networkx as nx
+
+        graph = nx.DiGraph() if directed else nx.Graph()
+        node_ids = self.node_ids
+        if with_attributes:
+            types = self.node_types()
+            graph.add_nodes_from(
+                (node_id, {"type": types[i], "label": self.node_labels[i]})
+                for i, node_id in enumerate(node_ids)
+            )
+        else:
+            graph.add_nodes_from(node_ids)
+        graph.add_edges_from(
+            (node_ids[s], node_ids[t])
+            for s, t in zip(self.sources().tolist(), self.targets.tolist())
+        )
+        return graph
+
+
+_snapshot_cache: "OrderedDict[Tuple[Any, ...], GraphSnapshot]" = OrderedDict()
+_snapshot_lock = threading.Lock()
+
+
+def get_graph_snapshot(
+    conn,
+    doc_id: Optional[str] = None,
+    version: Optional[Tuple[Any, ...]] = None,
+) -> Optional[GraphSnapshot]:
+    """Get the snapshot for the current graph version, building it once.
+
+    Snapshots are shared process-wide, keyed by graph version, so the
+    analytics service, graph views and export all reuse the same arrays until
+    the graph changes.
+
+    Args:
+        conn: Connection manager or DuckDB connection
+        doc_id: Restrict to relationships of this document
+        version: Graph version taken before reading, e.g. ``graph_version`` of
+            the connection manager when ``conn`` is one of its cursors
+            (computed from ``conn`` if None)
+
+    Returns:
+        GraphSnapshot, or None if the graph cannot be read
+    """
+    if not conn:
+        return None
+
+    if version is None:
+        version = graph_version(conn, doc_id)
+    if not version:
+        return None
+
+    with _snapshot_lock:
+        snapshot = _snapshot_cache.get(version)
+        if snapshot is not None:
+            _snapshot_cache.move_to_end(version)
+            return snapshot
+
+    try:
+        snapshot = GraphSnapshot.from_duckdb(conn, doc_id=doc_id, version=version)
+    except Exception as e:
+        logger.error(f"Error building graph snapshot: {e}")
+        return None
+
+    with _snapshot_lock:
+        _snapshot_cache[version] = snapshot
+        while len(_snapshot_cache) > SNAPSHOT_CACHE_SIZE:
+            _snapshot_cache.popitem(last=False)
+    return snapshot
+
+
+def clear_snapshot_cache() -> None:
+    """Drop all cached snapshots (e.g. when switching projects)."""
+    with _snapshot_lock:
+        _snapshot_cache.clear()
+
+
+def snapshot_to_dicts(snapshot: GraphSnapshot) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Expand a snapshot into entity/relationship dicts (for JSON export)."""
+    node_ids = snapshot.node_ids
+    types = snapshot.node_types()
+    entities = [
+        {"id": node_id, "type": types[i], "label": snapshot.node_labels[i]}
+        for i, node_id in enumerate(node_ids)
+    ]
+    edge_types = snapshot.edge_types()
+    relationships = [
+        {
+            "source": node_ids[s],
+            "target": node_ids[t],
+            "type": edge_types[i],
+            "confidence": c,
+        }
+        for i, (s, t, c) in enumerate(zip(
+            snapshot.sources().tolist(), snapshot.targets.tolist(), snapshot.confidence.tolist()
+        ))
+    ]
+    return entities, relationships
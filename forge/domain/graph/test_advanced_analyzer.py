@@ -0,0 +1,59 @@
+"""Tests for AdvancedGraphAnalysisService relationship inference."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+
+from forge.core.event_bus import EventBus
+from forge.core import events
+from forge.domain.graph.advanced_analyzer import AdvancedGraphAnalysisService
+from forge.domain.graph.snapshot import GraphSnapshot
+from forge.infrastructure.persistence import migrations
+
+
+def _snapshot():
+    # a, b and e each link to c and d: four non-adjacent pairs share two neighbors
+    conn = duckdb.connect(":memory:")
+    migrations.migrate(conn)
+    conn.execute("""
+        INSERT INTO entities (id, type, label)
+        SELECT id, 'PERSON', upper(id) FROM (VALUES ('a'), ('b'), ('c'), ('d'), ('e')) t(id)
+    """)
+    conn.execute("""
+        INSERT INTO relationships (source, target, type, confidence, doc_id)
+        SELECT s, t, 'KNOWS', 0.9, 'doc1'
+        FROM (VALUES ('a', 'c'), ('a', 'd'), ('b', 'c'), ('b', 'd'), ('e', 'c'), ('e', 'd')) p(s, t)
+    """)
+    return GraphSnapshot.from_duckdb(conn)
+
+
+async def _infer_three_times(snapshot):
+    bus = EventBus()
+    service = AdvancedGraphAnalysisService(bus, llm_provider=None, db_connection=None, inference_top_k=2)
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    asked = []
+
+    async def fake_llm(entity1, entity2, common_neighbors):
+        asked.append(tuple(sorted((entity1["id"], entity2["id"]))))
+        return {"source": entity1["id"], "target": entity2["id"], "type": "KNOWS", "confidence": 0.8}
+
+    service._infer_relationship_with_llm = fake_llm
+    published = []
+
+    async def capture(payload):
+        published.append(payload)
+
+    await bus.subscribe(events.TOPIC_INFERRED_RELATIONSHIP, capture)
+    rounds = [len(await service._infer_relationships(snapshot)) for _ in range(3)]
+    await asyncio.sleep(0)
+    await service.stop()
+    return rounds, asked, published
+
+
+def test_each_pair_is_sent_to_the_llm_once():
+    rounds, asked, published = asyncio.run(_infer_three_times(_snapshot()))
+
+    # Two new pairs per analysis until the four candidates are used up
+    assert rounds == [2, 2, 0]
+    assert sorted(asked) == [("a", "b"), ("a", "e"), ("b", "e"), ("c", "d")]
+    assert len(published) == 4
@@ -0,0 +1,92 @@
+"""Tests for incremental community tracking."""
+from itertools import combinations
+
+import numpy as np
+
+from forge.domain.graph.analytics import EdgeArrays
+from forge.domain.graph.communities import CommunityTracker, louvain_partition
+
+
+def _clique(name):
+    return [f"{name}{i}" for i in range(5)]
+
+
+def _clique_edges(nodes):
+    return list(combinations(nodes, 2))
+
+
+def _arrays(edges):
+    node_ids = sorted({node for edge in edges for node in edge})
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    return EdgeArrays(
+        node_ids=node_ids,
+        sources=np.array([index[s] for s, _ in edges], dtype=np.int32),
+        targets=np.array([index[t] for _, t in edges], dtype=np.int32),
+        weights=np.ones(len(edges), dtype=np.float64),
+    )
+
+
+def _update(tracker, edges):
+    plan = tracker.plan(_arrays(edges))
+    partition = louvain_partition(plan.region) if plan.region is not None else None
+    return tracker.apply(plan, partition)
+
+
+def _partition(tracker, arrays):
+    by_id = {}
+    for node_id in arrays.node_ids:
+        by_id.setdefault(tracker.community_of(node_id), set()).add(node_id)
+    return {frozenset(nodes) for nodes in by_id.values()}
+
+
+def _recomputed(edges):
+    arrays = _arrays(edges)
+    return arrays, {frozenset(part) for part in louvain_partition(CommunityTracker().plan(arrays).region)}
+
+
+def _ring_of_cliques(names):
+    """Five-node cliques, each bridged to the next one."""
+    edges = []
+    for name in names:
+        edges += _clique_edges(_clique(name))
+    for name, following in zip(names, names[1:]):
+        edges.append((f"{name}0", f"{following}0"))
+    return edges
+
+
+def test_edge_deltas_match_a_full_recompute():
+    tracker = CommunityTracker()
+    edges = _ring_of_cliques("abcd")
+    assert _update(tracker, edges)["method"] == "full"
+    ids = {name: tracker.community_of(f"{name}0") for name in "abcd"}
+
+    # A new clique hangs off d: only d's community and the new nodes are re-optimized
+    edges = edges + _clique_edges(_clique("e")) + [("d1", "e0")]
+    delta = _update(tracker, edges)
+    arrays, expected = _recomputed(edges)
+
+    assert delta["method"] == "incremental"
+    assert _partition(tracker, arrays) == expected
+    assert delta["created"] == [tracker.community_of("e0")]
+    assert {name: tracker.community_of(f"{name}0") for name in "abcd"} == ids
+
+
+def test_reports_the_community_delta():
+    tracker = CommunityTracker()
+    edges = _ring_of_cliques("abcde")
+    _update(tracker, edges)
+    a, b = tracker.community_of("a0"), tracker.community_of("b0")
+
+    # a4 loses its edges into a and joins b's clique instead
+    edges = [edge for edge in edges if "a4" not in edge] + [("a4", node) for node in _clique("b")]
+    delta = _update(tracker, edges)
+    arrays, expected = _recomputed(edges)
+
+    assert delta["method"] == "incremental"
+    assert _partition(tracker, arrays) == expected
+    assert delta["created"] == [] and delta["dissolved"] == []
+    assert delta["changed"] == {a: {"joined": [], "left": ["a4"]}, b: {"joined": ["a4"], "left": []}}
+    assert delta["moved"] == 1
+
+    # Re-applying the same graph changes nothing
+    assert _update(tracker, edges) == {"method": "unchanged", "created": [], "dissolved": [], "changed": {}, "moved": 0}
@@ -0,0 +1,47 @@
+"""Tests for the DuckDB graph queries."""
+import duckdb
+import pytest
+
+from forge.domain.graph import queries
+from forge.infrastructure.persistence import migrations
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect(":memory:")
+    migrations.migrate(conn)
+    nodes = ["center"] + [f"n{i}" for i in range(7)]
+    conn.executemany("INSERT INTO entities (id, type, label) VALUES (?, 'PERSON', ?)", [(n, n) for n in nodes])
+    # Every relationship has the same confidence, so only the tiebreaker orders them
+    edges = [("center", f"n{i}") for i in range(7)] + [(f"n{i}", f"n{i + 1}") for i in range(6)]
+    conn.executemany(
+        "INSERT INTO relationships (source, target, type, confidence) VALUES (?, ?, 'KNOWS', 0.5)", edges
+    )
+    yield conn
+    conn.close()
+
+
+def _pages(fetch, size):
+    rows, offset = [], 0
+    while True:
+        page = fetch(size, offset)
+        rows.extend(page)
+        if len(page) < size:
+            return rows
+        offset += size
+
+
+def test_neighborhood_pages_with_tied_depths_skip_and_repeat_nothing(conn):
+    nodes = _pages(lambda limit, offset: queries.k_hop_neighborhood(conn, "center", k=1, limit=limit, offset=offset), 3)
+
+    assert [node["id"] for node in nodes] == [f"n{i}" for i in range(7)]
+
+
+def test_ego_network_edge_pages_with_tied_confidence_skip_and_repeat_nothing(conn):
+    def fetch(limit, offset):
+        return queries.ego_network(conn, "center", edge_limit=limit, edge_offset=offset)["edges"]
+
+    edges = [(edge["source"], edge["target"]) for edge in _pages(fetch, 4)]
+
+    assert len(edges) == len(set(edges)) == 13
+    assert edges == [(edge["source"], edge["target"]) for edge in fetch(100, 0)]
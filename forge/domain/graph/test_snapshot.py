@@ -0,0 +1,40 @@
+"""Tests for graph snapshot versioning."""
+import asyncio
+
+from forge.core.event_bus import EventBus
+from forge.domain.graph import snapshot as snapshot_module
+from forge.domain.graph.snapshot import get_graph_snapshot
+from forge.infrastructure.persistence.duckdb_service import DuckDBPersistenceService
+
+
+def _add_edge(persistence, source, target):
+    nodes = [
+        {"id": source, "type": "PERSON", "label": source},
+        {"id": target, "type": "PERSON", "label": target},
+    ]
+    edges = [{"source": source, "target": target, "type": "KNOWS", "doc_id": "doc1"}]
+    asyncio.run(persistence.writer.execute(lambda conn: persistence._upsert_graph_delta(conn, nodes, edges)))
+
+
+def test_snapshots_are_versioned_by_writer_commits_without_scanning(tmp_path, monkeypatch):
+    def no_scan(conn, doc_id=None):
+        raise AssertionError("graph was fingerprinted")
+
+    monkeypatch.setattr(snapshot_module, "graph_fingerprint", no_scan)
+    persistence = DuckDBPersistenceService(EventBus(), db_path=str(tmp_path / "forge.duckdb"))
+    persistence.connect()
+    try:
+        _add_edge(persistence, "alice", "bob")
+        first = get_graph_snapshot(persistence.db)
+        again = get_graph_snapshot(persistence.db)
+        scoped = get_graph_snapshot(persistence.db, "doc1")
+        _add_edge(persistence, "bob", "carol")
+        second = get_graph_snapshot(persistence.db)
+    finally:
+        persistence.close()
+
+    assert again is first
+    assert scoped is not first and scoped.version != first.version
+    assert (first.num_nodes, first.num_edges) == (2, 1)
+    assert second.version != first.version
+    assert (second.num_nodes, second.num_edges) == (3, 2)
@@ -18,6 +18,10 @@ from forge.config.prompts import render_prompt
 
 logger = logging.getLogger(__name__)
 
+# Quiet period after a document's last non-final graph update before its
+# narrative is generated anyway (e.g. when the final batch changed nothing)
+NARRATIVE_DEBOUNCE_SECONDS = 5.0
+
 
 class NarrativeSynthesisService:
     """Service for generating narratives from knowledge graphs."""
@@ -26,22 +30,34 @@ class NarrativeSynthesisService:
         self,
         event_bus: EventBus,
         llm_provider: LLMProvider,
-        db_connection,  # DuckDB connection
+        db_connection,  # DuckDB connection manager
+        graph_service=None,  # Optional GraphAnalysisService for in-memory snapshots
+        debounce_seconds: float = NARRATIVE_DEBOUNCE_SECONDS,
     ):
         """Initialize the narrative synthesis service.
         
         Args:
             event_bus: Event bus for subscribing to events
             llm_provider: LLM provider for narrative generation
-            db_connection: DuckDB connection for querying graph data
+            db_connection: DuckDB connection manager for querying graph data
+            graph_service: Optional graph service whose per-document index is used
+                to load a document's full subgraph when ``graph.updated`` carries a delta
+            debounce_seconds: Quiet period after which a document still being
+                ingested gets its narrative
         """
         self.event_bus = event_bus
         self.llm_provider = llm_provider
         self.db_conn = db_connection
+        self.graph_service = graph_service
         self.service_name = "NarrativeSynthesisService"
         
-        # Cache narratives per document
+        # Cache narratives per document, with the relationship count each was built from
         self._narrative_cache: Dict[str, str] = {}
+        self._narrative_sizes: Dict[str, int] = {}
+        
+        # Delta updates are coalesced per document until its ingest completes
+        self._debounce_seconds = debounce_seconds
+        self._pending: Dict[str, asyncio.Task] = {}
         
     async def start(self):
         """Start the service and subscribe to events."""
@@ -62,9 +78,32 @@ class NarrativeSynthesisService:
             logger.debug("Skipping narrative generation for None doc_id (session restore)")
             return
         
+        # Delta payloads only carry this batch's nodes/edges: wait for the
+        # document's last batch (or a quiet period), then load its full subgraph
+        if graph_stats.get("is_delta"):
+            pending = self._pending.pop(doc_id, None)
+            if pending is not None:
+                pending.cancel()
+            if payload.get("is_complete", True):
+                await self._generate_from_graph(doc_id)
+            else:
+                self._pending[doc_id] = asyncio.create_task(self._generate_when_quiet(doc_id))
+            return
+        
         # Generate narrative for this document
         await self.generate_narrative(doc_id, graph_stats)
     
+    async def _generate_when_quiet(self, doc_id: str):
+        """Generate a document's narrative once no update arrived for the debounce period."""
+        await asyncio.sleep(self._debounce_seconds)
+        self._pending.pop(doc_id, None)
+        await self._generate_from_graph(doc_id)
+    
+    async def _generate_from_graph(self, doc_id: str):
+        """Generate a narrative from the document's full current subgraph."""
+        entities, relationships = self._get_doc_subgraph(doc_id)
+        await self.generate_narrative(doc_id, {"nodes": entities, "edges": relationships})
+    
     async def generate_narrative(
         self,
         doc_id: str,
@@ -79,10 +118,6 @@ class NarrativeSynthesisService:
         Returns:
             Generated narrative or None if error
         """
-        # Check cache
-        if doc_id in self._narrative_cache:
-            return self._narrative_cache[doc_id]
-        
         # Get entities and relationships from graph_stats or database
         if graph_stats:
             entities = graph_stats.get("nodes", [])
@@ -90,6 +125,13 @@ class NarrativeSynthesisService:
         else:
             entities, relationships = self._get_graph_data_from_db(doc_id)
         
+        # Check cache (regenerate once the document's subgraph has grown)
+        if (
+            doc_id in self._narrative_cache
+            and len(relationships) <= self._narrative_sizes.get(doc_id, 0)
+        ):
+            return self._narrative_cache[doc_id]
+        
         if not entities:
             logger.warning(f"No entities found for document {doc_id}")
             return None
@@ -103,6 +145,7 @@ class NarrativeSynthesisService:
         if narrative:
             # Cache the narrative
             self._narrative_cache[doc_id] = narrative
+            self._narrative_sizes[doc_id] = len(relationships)
             
             # Emit narrative generated event
             await self.event_bus.publish(
@@ -141,6 +184,17 @@ class NarrativeSynthesisService:
         
         return narrative
     
+    def _get_doc_subgraph(self, doc_id: str) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Get a document's full subgraph, preferring the in-memory graph.
+        
+        The graph service indexes edges per document and is always current,
+        whereas persistence may still be committing the latest batch; the
+        doc-scoped database query is used when no graph service was provided.
+        """
+        if self.graph_service is None:
+            return self._get_graph_data_from_db(doc_id)
+        return self.graph_service.get_document_subgraph(doc_id)
+    
     def _get_graph_data_from_db(self, doc_id: str) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """Get entities and relationships for a document from database."""
         entities = []
@@ -16,6 +16,8 @@ from forge.core import events
 from forge.infrastructure.llm.base import LLMProvider, RateLimitError
 from forge.infrastructure.llm.rate_limiter import get_rate_limiter
 from forge.config.prompts import render_prompt
+from forge.domain.graph.queries import entity_relationships
+from forge.infrastructure.persistence.profile_store import get_profile
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +29,14 @@ class SemanticProfilerService:
         self,
         event_bus: EventBus,
         llm_provider: LLMProvider,
-        db_connection,  # DuckDB connection
+        db_connection,  # DuckDB connection manager
     ):
         """Initialize the semantic profiler service.
         
         Args:
             event_bus: Event bus for subscribing to events
             llm_provider: LLM provider for profile generation
-            db_connection: DuckDB connection for querying entities/relationships
+            db_connection: DuckDB connection manager for querying entities/relationships
         """
         self.event_bus = event_bus
         self.llm_provider = llm_provider
@@ -126,15 +128,9 @@ class SemanticProfilerService:
         # Check database for existing profile (skip LLM generation if exists)
         if self.db_conn:
             try:
-                result = self.db_conn.execute("""
-                    SELECT profile_json
-                    FROM semantic_profiles
-                    WHERE entity_id = ?
-                """, (entity_id,)).fetchone()
+                profile = get_profile(self.db_conn, entity_id)
                 
-                if result:
-                    import json
-                    profile = json.loads(result[0])
+                if profile:
                     # Cache the loaded profile
                     self._profile_cache[entity_id] = profile
                     
@@ -247,46 +243,8 @@ class SemanticProfilerService:
             return []
         
         try:
-            # Get outgoing relationships
-            outgoing = self.db_conn.execute("""
-                SELECT source, target, type, confidence
-                FROM relationships
-                WHERE source = ?
-                ORDER BY confidence DESC
-                LIMIT 20
-            """, (entity_id,)).fetchall()
-            
-            # Get incoming relationships
-            incoming = self.db_conn.execute("""
-                SELECT source, target, type, confidence
-                FROM relationships
-                WHERE target = ?
-                ORDER BY confidence DESC
-                LIMIT 20
-            """, (entity_id,)).fetchall()
-            
-            relationships = []
-            
-            for row in outgoing:
-                relationships.append({
-                    "source": row[0],
-                    "target": row[1],
-                    "type": row[2],
-                    "confidence": row[3],
-                    "direction": "outgoing"
-                })
-            
-            for row in incoming:
-                relationships.append({
-                    "source": row[0],
-                    "target": row[1],
-                    "type": row[2],
-                    "confidence": row[3],
-                    "direction": "incoming"
-                })
-            
-            return relationships
-            
+            # Top outgoing and incoming relationships in a single query
+            return entity_relationships(self.db_conn, entity_id, limit_per_direction=20)
         except Exception as e:
             logger.error(f"Error fetching relationships for {entity_id}: {e}")
             return []
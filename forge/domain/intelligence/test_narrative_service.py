@@ -0,0 +1,88 @@
+"""Tests for NarrativeSynthesisService handling of delta graph.updated events."""
+import asyncio
+
+from forge.core.event_bus import EventBus
+from forge.core import events
+from forge.domain.graph.service import GraphAnalysisService
+from forge.domain.intelligence.narrative_service import NarrativeSynthesisService
+
+
+def _rel(source, target, relation_type):
+    return {
+        "source": source,
+        "target": target,
+        "source_type": "PERSON",
+        "target_type": "ORGANIZATION",
+        "relation_type": relation_type,
+        "confidence": 0.9,
+    }
+
+
+async def _ingest(batches, debounce_seconds=5.0):
+    """Feed relationship batches for doc1 through the graph and narrative services."""
+    bus = EventBus()
+    graph_service = GraphAnalysisService(bus)
+    service = NarrativeSynthesisService(bus, llm_provider=None, db_connection=None,
+                                        graph_service=graph_service, debounce_seconds=debounce_seconds)
+    contexts = []
+
+    async def fake_llm(doc_id, context):
+        contexts.append(context)
+        return f"narrative {len(contexts)}"
+
+    service._generate_narrative_with_llm = fake_llm
+    graph_updates = []
+
+    async def capture(payload):
+        graph_updates.append(payload)
+
+    await bus.subscribe(events.TOPIC_GRAPH_UPDATED, capture)
+
+    for index, relationships in enumerate(batches):
+        await graph_service.handle_relationship_found(
+            events.create_relationship_found_event(
+                doc_id="doc1",
+                relationships=relationships,
+                batch_index=index,
+                is_complete=index == len(batches) - 1,
+            )
+        )
+        await asyncio.sleep(0)
+        await service.handle_graph_updated(graph_updates[-1])
+    return graph_updates, contexts, service
+
+
+def test_delta_batches_coalesce_into_one_narrative_of_the_full_subgraph():
+    # Batch 1 introduces Alice and Acme; batch 2 only adds an edge between them
+    graph_updates, contexts, service = asyncio.run(_ingest([
+        [_rel("Alice", "Acme", "WORKS_AT")],
+        [_rel("Alice", "Acme", "FOUNDED")],
+    ]))
+
+    # The second payload is an edge-only delta
+    assert graph_updates[1]["graph_stats"]["nodes"] == []
+
+    # One narrative, generated after the last batch, sees both entities and both edges
+    assert len(contexts) == 1
+    assert "Alice" in contexts[0] and "Acme" in contexts[0]
+    assert "WORKS_AT" in contexts[0] and "FOUNDED" in contexts[0]
+    assert service._narrative_cache["doc1"] == "narrative 1"
+
+
+async def _ingest_without_final_update():
+    # The final batch repeats an edge, so it changes nothing and publishes no update
+    graph_updates, contexts, service = await _ingest(
+        [[_rel("Alice", "Acme", "WORKS_AT")], [_rel("Alice", "Acme", "WORKS_AT")]],
+        debounce_seconds=0.01,
+    )
+    before = len(contexts)
+    await asyncio.sleep(0.05)
+    return len(graph_updates), before, contexts
+
+
+def test_narrative_is_generated_after_a_quiet_period():
+    update_count, before, contexts = asyncio.run(_ingest_without_final_update())
+
+    assert update_count == 1
+    assert before == 0
+    assert len(contexts) == 1
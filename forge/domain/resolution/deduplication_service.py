@@ -8,13 +8,14 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from forge.core.event_bus import EventBus, EventPayload
 from forge.core import events
 from forge.infrastructure.vector.qdrant_service import QdrantService
 from forge.infrastructure.llm.base import LLMProvider, RateLimitError
 from forge.infrastructure.llm.rate_limiter import get_rate_limiter
+from forge.infrastructure.persistence import entity_aliases
 from forge.config.prompts import render_prompt
 
 logger = logging.getLogger(__name__)
@@ -28,7 +29,7 @@ class DeduplicationService:
         event_bus: EventBus,
         qdrant_service: QdrantService,
         llm_provider: LLMProvider,
-        db_connection,  # DuckDB connection
+        db_connection,  # DuckDB connection manager
         similarity_threshold: float = 0.85,
         auto_merge: bool = False,
     ):
@@ -38,7 +39,7 @@ class DeduplicationService:
             event_bus: Event bus for subscribing to events
             qdrant_service: Qdrant service for similarity search
             llm_provider: LLM provider for duplicate confirmation
-            db_connection: DuckDB connection for merging entities
+            db_connection: DuckDB connection manager (merges go through its writer)
             similarity_threshold: Minimum similarity to consider duplicates
             auto_merge: Automatically merge duplicates without confirmation
         """
@@ -82,8 +83,8 @@ class DeduplicationService:
         
         logger.info(f"Found {len(duplicates)} potential duplicate pairs")
         
-        # Process each duplicate pair
-        merged_count = 0
+        # Confirm each duplicate pair, then merge the confirmed ones as one batch
+        confirmed = []
         for entity1_id, entity2_id, score in duplicates:
             # Skip if already processed
             pair = tuple(sorted([entity1_id, entity2_id]))
@@ -99,11 +100,10 @@ class DeduplicationService:
                     self._processed_pairs.add(pair)
                     continue
             
-            # Merge entities
-            await self._merge_entities(entity1_id, entity2_id)
-            merged_count += 1
+            confirmed.append((entity1_id, entity2_id))
             self._processed_pairs.add(pair)
         
+        merged_count = len(await self.merge_entities(confirmed))
         if merged_count > 0:
             logger.info(f"Merged {merged_count} duplicate entities")
             
@@ -190,74 +190,65 @@ class DeduplicationService:
             # Default to not merging if LLM fails
             return False
     
-    async def _merge_entities(self, entity1_id: str, entity2_id: str):
-        """Merge two entities in the database.
+    async def merge_entities(self, merges: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Merge a batch of entity pairs in the database.
         
-        Keeps entity1, updates all relationships pointing to entity2 to point to entity1,
-        then deletes entity2.
+        Each pair keeps its first entity and folds the second into it
+        (relationships re-pointed, profile dropped, entity deleted). The whole
+        batch is applied with set-based statements and recorded in the merge
+        lineage, so later graph updates mentioning a merged entity resolve to
+        the kept one (see ``entity_aliases``).
         
         Args:
-            entity1_id: Entity to keep
-            entity2_id: Entity to merge into entity1
+            merges: ``(keep, merge)`` entity id pairs; chains are followed
+            
+        Returns:
+            ``(kept, merged)`` pairs actually applied
         """
+        if not merges:
+            return []
         if not self.db_conn:
             logger.error("No database connection available for merging")
-            return
+            return []
         
         try:
-            self.db_conn.execute("""
-                UPDATE relationships
-                SET source = ?
-                WHERE source = ?
-            """, (entity1_id, entity2_id))
-            
-            self.db_conn.execute("""
-                UPDATE relationships
-                SET target = ?
-                WHERE target = ?
-            """, (entity1_id, entity2_id))
-            
-            try:
-                self.db_conn.execute(
-                    "SELECT 1 FROM information_schema.tables WHERE table_name = 'semantic_profiles'"
-                ).fetchone()
-                self.db_conn.execute("""
-                    DELETE FROM semantic_profiles
-                    WHERE entity_id = ?
-                """, (entity2_id,))
-            except Exception:
-                pass
-            
-            self.db_conn.execute("""
-                DELETE FROM entities
-                WHERE id = ?
-            """, (entity2_id,))
-            
-            self.db_conn.execute("""
-                UPDATE entities
-                SET updated_at = NOW()
-                WHERE id = ?
-            """, (entity1_id,))
-            
-            self.db_conn.commit()
-            
-            logger.info(f"Merged entity {entity2_id} into {entity1_id}")
-            
+            # Isolated: the merge commits its own transactions (see entity_aliases)
+            applied = await self.db_conn.writer.execute(
+                lambda conn: entity_aliases.merge_entities(conn, merges), isolated=True
+            )
+        except Exception as e:
+            logger.error(f"Error merging {len(merges)} entity pairs: {e}")
+            return []
+        
+        merged_into: Dict[str, List[str]] = {}
+        for kept_entity, merged_entity in applied:
+            logger.info(f"Merged entity {merged_entity} into {kept_entity}")
+            merged_into.setdefault(kept_entity, []).append(merged_entity)
+        for kept_entity, merged_entities in merged_into.items():
             await self.event_bus.publish(
                 events.TOPIC_ENTITY_MERGED,
                 {
-                    "kept_entity": entity1_id,
-                    "merged_entity": entity2_id,
+                    "kept_entity": kept_entity,
+                    "merged_entity": merged_entities[0],
+                    "merged_entities": merged_entities,
                 }
             )
-            
-        except Exception as e:
-            logger.error(f"Error merging entities {entity1_id} and {entity2_id}: {e}")
-            if self.db_conn:
-                try:
-                    self.db_conn.rollback()
-                except Exception:
-                    pass
+        return applied
+    
+    async def _merge_entities(self, entity1_id: str, entity2_id: str):
+        """Merge entity2 into entity1 (see ``merge_entities``)."""
+        await self.merge_entities([(entity1_id, entity2_id)])
+    
+    async def replay_merges(self) -> int:
+        """Re-apply recorded merges whose merged entity exists again.
+        
+        Returns:
+            Number of merges applied
+        """
+        if not self.db_conn:
+            return 0
+        pending = entity_aliases.pending_merges(self.db_conn)
+        return len(await self.merge_entities(pending))
     
     async def run_deduplication_pass(self):
         """Manually trigger a deduplication pass."""
@@ -4,11 +4,11 @@ from __future__ import annotations
 
 import logging
 import asyncio
-import shutil
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from forge.core import events
+from forge.infrastructure.persistence import bundle, embedding_store
 
 if TYPE_CHECKING:
     from forge.core.app_controller import AppController
@@ -33,6 +33,40 @@ class SessionManager:
         self.persistence = persistence_service
         self.qdrant = qdrant_service
         self.embedding = embedding_service
+        # Session restore running in the background after a project was opened
+        self._restore_task: Optional[asyncio.Task] = None
+
+    @property
+    def restore_task(self) -> Optional[asyncio.Task]:
+        """Background restore started by the last ``open_project`` (None if none ran)."""
+        return self._restore_task
+
+    def _cancel_restore(self) -> None:
+        if self._restore_task is not None and not self._restore_task.done():
+            self._restore_task.cancel()
+        self._restore_task = None
+
+    def _restore_in_background(self) -> asyncio.Task:
+        """Start ``restore_session`` without waiting for it, replacing a running restore.
+        
+        Re-indexing streams every entity and relationship, so the project is
+        usable (views query the database directly) while the vector store and
+        workspace fill in.
+        """
+        self._cancel_restore()
+        
+        async def restore() -> None:
+            try:
+                await self.restore_session()
+            except asyncio.CancelledError:
+                logger.info("Session restore cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"Error restoring session: {e}")
+                await self.controller.push_agui_log(f"Error restoring session: {str(e)}", "error")
+        
+        self._restore_task = asyncio.create_task(restore())
+        return self._restore_task
 
     async def restore_session(self):
         """Reloads UI state and re-indexes vectors from the last manually-saved project.
@@ -63,140 +97,104 @@ class SessionManager:
         await self.controller.push_agui_log("Clearing vector store...", "info")
         await self.qdrant.clear_collections()
 
-        # 4. Re-index Entities
-        entities = self.persistence.get_all_entities()
-        if entities:
-            msg = f"Re-indexing {len(entities)} entities into Vector Store..."
-            logger.info(msg)
-            await self.controller.push_agui_log(msg, "info")
-            
-            # Convert database format to entity format for embedding
-            # Database has: id, type, label, created_at, updated_at
-            # Embedding format needs: text, type (for entity dict)
-            entity_list = [
-                {
-                    "text": entity["label"],
-                    "type": entity["type"]
-                }
-                for entity in entities
-            ]
-            
-            # Prepare texts for embedding (same format as EmbeddingService)
-            entity_texts = [
-                f"{entity['text']} ({entity['type']})"
-                for entity in entity_list
-            ]
-            
-            # Embed entities directly (bypass extraction pipeline)
-            embeddings = await self.embedding.embed_batch(entity_texts, use_long_context=False)
-            
-            # Publish embedded events directly (only QdrantService listens to these)
-            for entity, embedding_vec in zip(entity_list, embeddings):
-                await self.controller.publish(
-                    events.TOPIC_ENTITY_EMBEDDED,
-                    {
-                        "doc_id": "restore_session",
-                        "entity": entity,
-                        "text": f"{entity['text']} ({entity['type']})",
-                        "embedding": embedding_vec,
-                        "dimension": len(embedding_vec),
-                    }
-                )
-            
-            await self.controller.push_agui_log("Entity re-indexing complete.", "success")
+        # 4./5. Re-index Entities and Relationships
+        # Streamed in keyset-paginated pages joined with the stored embeddings:
+        # vectors of unchanged texts are loaded as-is, only new or changed rows
+        # (or rows embedded by another model version) are re-encoded
+        model, model_version = self.embedding.model_signature()
+        
+        entity_total, entity_encoded = await self._reindex_pages(
+            embedding_store.KIND_ENTITY,
+            self.persistence.iter_entity_embedding_pages(model, model_version),
+            lambda page: [
+                {"text": label, "type": entity_type}
+                for label, entity_type in zip(page.column("label").to_pylist(), page.column("type").to_pylist())
+            ],
+            events.TOPIC_ENTITY_EMBEDDED,
+            "entity",
+            lambda: f"{self.persistence.get_entity_count()} entities",
+            model,
+            model_version,
+        )
+        if entity_total:
+            await self.controller.push_agui_log(
+                f"Re-indexed {entity_total} entities ({entity_encoded} re-encoded, "
+                f"{entity_total - entity_encoded} loaded from database).",
+                "success"
+            )
         else:
             await self.controller.push_agui_log("No entities found to re-index.", "warning")
 
-        # 5. Re-index Relationships
-        relationships = self.persistence.get_all_relationships()
-        if relationships:
-            msg = f"Re-indexing {len(relationships)} relationships into Vector Store..."
-            logger.info(msg)
-            await self.controller.push_agui_log(msg, "info")
-            
-            # Convert database format to relationship format for embedding
-            # Database has: id, source, target, type, confidence, doc_id, created_at
-            # Embedding format needs: source, target, type
-            relationship_list = [
-                {
-                    "source": rel["source"],
-                    "target": rel["target"],
-                    "type": rel["type"]
-                }
-                for rel in relationships
-            ]
-            
-            # Prepare texts for embedding (same format as EmbeddingService)
-            relationship_texts = [
-                f"{rel['source']} {rel['type']} {rel['target']}"
-                for rel in relationship_list
-            ]
-            
-            # Embed relationships directly (bypass extraction pipeline)
-            embeddings = await self.embedding.embed_batch(relationship_texts, use_long_context=False)
-            
-            # Publish embedded events directly (only QdrantService listens to these)
-            for rel, embedding_vec in zip(relationship_list, embeddings):
-                await self.controller.publish(
-                    events.TOPIC_RELATIONSHIP_EMBEDDED,
-                    {
-                        "doc_id": "restore_session",
-                        "relationship": rel,
-                        "text": f"{rel['source']} {rel['type']} {rel['target']}",
-                        "embedding": embedding_vec,
-                        "dimension": len(embedding_vec),
-                    }
-                )
-            
-            await self.controller.push_agui_log("Relationship re-indexing complete.", "success")
+        relationship_total, relationship_encoded = await self._reindex_pages(
+            embedding_store.KIND_RELATIONSHIP,
+            self.persistence.iter_relationship_embedding_pages(model, model_version),
+            lambda page: page.select(["source", "target", "type"]).to_pylist(),
+            events.TOPIC_RELATIONSHIP_EMBEDDED,
+            "relationship",
+            lambda: f"{self.persistence.get_relationship_count()} relationships",
+            model,
+            model_version,
+        )
+        if relationship_total:
+            await self.controller.push_agui_log(
+                f"Re-indexed {relationship_total} relationships ({relationship_encoded} re-encoded, "
+                f"{relationship_total - relationship_encoded} loaded from database).",
+                "success"
+            )
         else:
             await self.controller.push_agui_log("No relationships found to re-index.", "warning")
         
+        # Drop vectors of texts that no longer exist (renamed or merged entities).
+        # Only needed when texts changed, which keeps restoring a bundle read-only
+        if entity_encoded or relationship_encoded:
+            try:
+                pruned = await self.persistence.prune_embeddings()
+                if pruned:
+                    logger.info(f"Pruned {pruned} stale embeddings")
+            except Exception as e:
+                logger.warning(f"Could not prune stale embeddings: {e}")
+        
         # 6. Load semantic profiles from database and publish to workspace
-        profiles = self.persistence.get_all_semantic_profiles()
-        if profiles:
-            logger.info(f"Loading {len(profiles)} semantic profiles from database...")
-            # Get all entities once (avoid O(n*m) complexity)
-            entities = self.persistence.get_all_entities()
-            entity_map = {e["id"]: e for e in entities}  # Create lookup map
-            
-            for profile in profiles:
-                entity_id = profile.get("entity_id")
-                if entity_id:
-                    # Get entity info for display
-                    entity_info = entity_map.get(entity_id)
-                    if entity_info:
-                        await self.controller.publish(
-                            events.TOPIC_WORKSPACE_SCHEMA,
-                            events.create_workspace_schema_event({
-                                "type": "semantic_profile",
-                                "title": f"Profile: {entity_info['label']}",
-                                "props": profile
-                            })
-                        )
-            await self.controller.push_agui_log(f"Loaded {len(profiles)} semantic profiles from database.", "info")
+        # Profiles carry their entity label from a join
+        profile_count = 0
+        async for label, profile in self.persistence.db.iterate(self.persistence.iter_semantic_profiles()):
+            if label is None:
+                continue
+            await self.controller.publish(
+                events.TOPIC_WORKSPACE_SCHEMA,
+                events.create_workspace_schema_event({
+                    "type": "semantic_profile",
+                    "title": f"Profile: {label}",
+                    "props": profile
+                })
+            )
+            profile_count += 1
+        if profile_count:
+            logger.info(f"Loaded {profile_count} semantic profiles from database")
+            await self.controller.push_agui_log(f"Loaded {profile_count} semantic profiles from database.", "info")
         else:
             await self.controller.push_agui_log("No semantic profiles found in database.", "info")
         
         # 7. Load narratives from database and publish to workspace
-        narratives = self.persistence.get_all_narratives()
-        if narratives:
-            logger.info(f"Loading {len(narratives)} narratives from database...")
-            for narrative_data in narratives:
-                await self.controller.publish(
-                    events.TOPIC_WORKSPACE_SCHEMA,
-                    events.create_workspace_schema_event({
-                        "type": "narrative",
-                        "title": f"Narrative: {narrative_data['doc_id']}",
-                        "props": {
-                            "doc_id": narrative_data["doc_id"],
-                            "narrative": narrative_data["narrative"],
-                            "entity_count": narrative_data["entity_count"],
-                            "relationship_count": narrative_data["relationship_count"],
-                        }
-                    })
-                )
-            await self.controller.push_agui_log(f"Loaded {len(narratives)} narratives from database.", "info")
+        narrative_count = 0
+        async for narrative_data in self.persistence.db.iterate(self.persistence.iter_narratives()):
+            await self.controller.publish(
+                events.TOPIC_WORKSPACE_SCHEMA,
+                events.create_workspace_schema_event({
+                    "type": "narrative",
+                    "title": f"Narrative: {narrative_data['doc_id']}",
+                    "props": {
+                        "doc_id": narrative_data["doc_id"],
+                        "narrative": narrative_data["narrative"],
+                        "entity_count": narrative_data["entity_count"],
+                        "relationship_count": narrative_data["relationship_count"],
+                    }
+                })
+            )
+            narrative_count += 1
+        if narrative_count:
+            logger.info(f"Loaded {narrative_count} narratives from database")
+            await self.controller.push_agui_log(f"Loaded {narrative_count} narratives from database.", "info")
         
         # 8. Trigger graph analysis to generate UI schemas from database data
         # This will cause AdvancedGraphAnalysisService to analyze the graph and publish schemas
@@ -214,6 +212,74 @@ class SessionManager:
             }
         )
 
+    async def _reindex_pages(
+        self,
+        kind: str,
+        pages,
+        items_of,
+        topic: str,
+        item_key: str,
+        describe_total,
+        model: str,
+        model_version: str,
+    ) -> Tuple[int, int]:
+        """Publish embeddings for pages of entities/relationships into the vector store.
+        
+        Args:
+            kind: Embedding kind (``embedding_store.KIND_*``)
+            pages: Page iterator from ``iter_*_embedding_pages``
+            items_of: Builds the event item dicts of a page
+            topic: Embedded-event topic to publish
+            item_key: Payload key of the item ("entity" or "relationship")
+            describe_total: Returns the progress description, e.g. "12 entities"
+            model: Embedding model name
+            model_version: Embedding model version
+        
+        Returns:
+            Tuple of (items published, items re-encoded)
+        """
+        total = encoded = 0
+        async for page in self.persistence.db.iterate(pages):
+            if not total:
+                msg = f"Re-indexing {describe_total()} into Vector Store..."
+                logger.info(msg)
+                await self.controller.push_agui_log(msg, "info")
+            
+            items = items_of(page)
+            texts = page.column("text").to_pylist()
+            vectors = embedding_store.page_vectors(page)
+            
+            # Encode only rows without a stored vector, and store the new ones
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            if missing:
+                missing_texts = [texts[i] for i in missing]
+                fresh = await self.embedding.embed_batch(missing_texts, use_long_context=False)
+                for i, vector in zip(missing, fresh):
+                    vectors[i] = vector
+                try:
+                    await self.persistence.store_embeddings(kind, missing_texts, fresh, model, model_version)
+                except Exception as e:
+                    logger.warning(f"Could not store {kind} embeddings: {e}")
+                encoded += len(missing)
+            
+            # Publish embedded events directly (only QdrantService listens to these)
+            for item, text, embedding_vec in zip(items, texts, vectors):
+                await self.controller.publish(
+                    topic,
+                    {
+                        "doc_id": "restore_session",
+                        item_key: item,
+                        "text": text,
+                        "embedding": embedding_vec,
+                        "dimension": len(embedding_vec),
+                        "model": model,
+                        "model_version": model_version,
+                        "restored": True,
+                    }
+                )
+            total += page.num_rows
+        return total, encoded
+
     async def clear_workspace_only(self):
         """Clears only the UI workspace for a new project (database untouched)."""
         logger.info("🎨 Clearing workspace UI only...")
@@ -227,7 +293,8 @@ class SessionManager:
         """Wipes the database and clears the UI (full reset)."""
         logger.info("🗑️ Clearing session...")
         
-        # 1. Clear UI
+        # 1. Stop a background restore and clear UI
+        self._cancel_restore()
         self.controller.clear_workspace()
         
         # 2. Clear Database
@@ -236,15 +303,17 @@ class SessionManager:
         # 3. Reset the database connection to ensure fresh state
         # This prevents cached state or pending transactions from interfering
         try:
+            # The cleared project (possibly an attached one) is reopened on its own
+            active_path = self.persistence.db.active_path
             if self.persistence.conn:
-                self.persistence.conn.close()
+                self.persistence.close()
                 logger.info("Closed database connection after clearing")
             
-            # Reconnect to get a fresh connection
-            import duckdb
-            self.persistence.conn = duckdb.connect(self.persistence.db_path)
-            # Recreate schema to ensure tables exist
-            self.persistence._create_schema()
+            # Reconnect to get a fresh connection (recreates schema and writer)
+            if active_path and Path(active_path).resolve() != Path(self.persistence.db_path).resolve():
+                self.persistence.connect(active_path)
+            else:
+                self.persistence.connect()
             logger.info("Reconnected to database with fresh state")
         except Exception as e:
             logger.error(f"Error resetting database connection: {e}")
@@ -259,114 +328,139 @@ class SessionManager:
         await self.controller.push_agui_log("Session and Database Cleared.", "success")
 
     async def save_project(self, file_path: str) -> None:
-        """Save the current project database to the specified file path."""
+        """Save a snapshot of the current project database to the specified file path.
+        
+        The database stays open: the snapshot is copied off the event loop inside
+        one read transaction, so autosave handlers keep writing while it runs.
+        Paths ending in ``.forge`` (or naming an existing bundle) are saved as a
+        Parquet project bundle instead of a ``.duckdb`` file.
+        """
         logger.info(f"💾 Saving project to {file_path}...")
         await self.controller.push_agui_log(f"Saving project to {file_path}...", "info")
         
         try:
-            # Ensure all transactions are committed and WAL is checkpointed
-            if self.persistence.conn:
-                # Force a checkpoint to write WAL data to the main database file
-                try:
-                    self.persistence.conn.execute("CHECKPOINT")
-                except Exception as e:
-                    logger.warning(f"Could not checkpoint database: {e}")
-                
-                # Commit any pending transactions
-                try:
-                    self.persistence.conn.commit()
-                except Exception:
-                    pass
-                
-                # Close the connection to ensure all data is flushed
-                self.persistence.conn.close()
-                self.persistence.conn = None
-            
-            # Copy the database file to the target location
-            db_path = Path(self.persistence.db_path)
-            target_path = Path(file_path)
+            if not self.persistence.db:
+                await self.controller.push_agui_log("No database is open to save.", "warning")
+                return
             
-            # Ensure target directory exists
-            target_path.parent.mkdir(parents=True, exist_ok=True)
+            bundle_dir = bundle.bundle_directory(file_path)
+            if bundle_dir is not None:
+                async for progress in self.persistence.db.iterate(self.persistence.export_bundle(str(bundle_dir))):
+                    if progress.table:
+                        await self.controller.push_agui_log(
+                            f"Saving project bundle: wrote {progress.table} ({progress.rows} rows) "
+                            f"[{progress.step}/{progress.total}]",
+                            "info"
+                        )
+                logger.info(f"Project bundle saved successfully to {bundle_dir}")
+                await self.controller.push_agui_log(f"Project saved successfully to {bundle_dir}", "success")
+                return
             
-            # Copy the database file
-            if db_path.exists():
-                shutil.copy2(db_path, target_path)
-                
-                # Also copy WAL file if it exists (for complete backup)
-                wal_path = db_path.with_suffix('.duckdb.wal')
-                if wal_path.exists():
-                    target_wal_path = target_path.with_suffix('.duckdb.wal')
-                    shutil.copy2(wal_path, target_wal_path)
-                
-                logger.info(f"Project saved successfully to {file_path}")
+            target_path = Path(file_path).resolve()
+            if target_path == Path(self.persistence.db.active_path).resolve():
+                # Saving onto the open database only needs the WAL flushed into the file
+                await asyncio.to_thread(self.persistence.checkpoint)
                 await self.controller.push_agui_log(f"Project saved successfully to {file_path}", "success")
-            else:
-                await self.controller.push_agui_log("No database file found to save.", "warning")
+                return
+            
+            async for progress in self.persistence.db.iterate(self.persistence.snapshot(str(target_path))):
+                if progress.table:
+                    await self.controller.push_agui_log(
+                        f"Saving project: copied {progress.table} ({progress.rows} rows) "
+                        f"[{progress.step}/{progress.total}]",
+                        "info"
+                    )
             
-            # Reconnect to the database
-            import duckdb
-            self.persistence.conn = duckdb.connect(self.persistence.db_path)
+            logger.info(f"Project saved successfully to {file_path}")
+            await self.controller.push_agui_log(f"Project saved successfully to {file_path}", "success")
                 
         except Exception as e:
             logger.error(f"Error saving project: {e}")
             await self.controller.push_agui_log(f"Error saving project: {str(e)}", "error")
-            # Try to reconnect on error
-            try:
-                import duckdb
-                self.persistence.conn = duckdb.connect(self.persistence.db_path)
-            except Exception:
-                pass
+
+    async def attach_project(self, file_path: str, read_only: bool = True) -> None:
+        """Attach another project database for cross-project queries without switching to it."""
+        try:
+            project = self.persistence.workspace.attach(str(Path(file_path).resolve()), read_only=read_only)
+        except Exception as e:
+            logger.error(f"Error attaching project: {e}")
+            await self.controller.push_agui_log(f"Error attaching project: {str(e)}", "error")
+            return
+        mode = "read-only" if project.read_only else "read-write"
+        logger.info(f"Project {file_path} attached as {project.alias} ({mode})")
+        await self.controller.push_agui_log(f"Project attached as {project.alias} ({mode}).", "success")
 
     async def open_project(self, file_path: str) -> None:
-        """Open a project database file and restore the session.
+        """Open a project database file and restore the session in the background.
+        
+        Returns once the project is open; the session restore (see
+        ``restore_task``) keeps running after that.
         
         SAFE APPROACH: Connects to the selected file without overwriting main database.
+        Database files are attached to the open workspace and switched to, so
+        projects opened before stay attached and switching back to them does
+        not reopen anything (see ``workspace``). Project bundles (their
+        directory or ``manifest.json``) are opened lazily through views over
+        their Parquet files.
         """
         logger.info(f"📂 Opening project from {file_path}...")
         await self.controller.push_agui_log(f"Opening project from {file_path}...", "info")
         
+        # Stop restoring the previous project before switching away from it
+        self._cancel_restore()
+        
         try:
+            bundle_dir = bundle.bundle_directory(file_path)
+            if bundle_dir is not None:
+                if bundle_dir != self.persistence.bundle_dir:
+                    # Opening only creates views, the data is read when queried
+                    self.persistence.open_bundle(str(bundle_dir))
+                logger.info(f"Project bundle opened from {bundle_dir}")
+                await self.controller.push_agui_log("Project bundle opened. Restoring session in the background...", "success")
+                self._restore_in_background()
+                return
+            
             source_path = Path(file_path).resolve()
             if not source_path.exists():
                 await self.controller.push_agui_log(f"Project file not found: {file_path}", "error")
                 return
             
             # Check if the source path is the same as the current database path
-            db_path = Path(self.persistence.db_path).resolve()
+            db_path = Path(self.persistence.db.active_path).resolve()
             if source_path == db_path:
                 # Same file, just restore the session
                 logger.info("Opening current database, restoring session...")
-                await self.controller.push_agui_log("Opening current database, restoring session...", "info")
-                await self.restore_session()
+                await self.controller.push_agui_log("Opening current database, restoring session in the background...", "info")
+                self._restore_in_background()
                 return
             
-            # SAFE APPROACH: Connect to the external file temporarily without overwriting main database
-            # Close the current database connection
-            if self.persistence.conn:
-                self.persistence.conn.close()
-            
-            # Connect directly to the selected file (DO NOT COPY/OVERWRITE)
-            import duckdb
-            self.persistence.conn = duckdb.connect(str(source_path))
-            # Update the db_path reference to track what file we're currently connected to
-            self.persistence.db_path = str(source_path)
-            
-            # Ensure the opened database has proper schema (tables may not exist)
-            self.persistence._create_schema()
+            if self.persistence.bundle_dir is not None or not self.persistence.db:
+                # Bundles are not attached: connect directly to the selected file
+                # (DO NOT COPY/OVERWRITE), migrating its schema if needed
+                self.persistence.close()
+                self.persistence.connect(str(source_path))
+            else:
+                # Attach the file next to the open projects (migrating its schema
+                # if needed) and make it the active one
+                workspace = self.persistence.workspace
+                project = workspace.project(str(source_path))
+                if project is not None and project.read_only:
+                    workspace.detach(project.alias)
+                project = workspace.attach(str(source_path))
+                workspace.switch(project.alias)
             
             logger.info(f"Project opened successfully from {file_path}")
-            await self.controller.push_agui_log(f"Project opened successfully. Restoring session...", "success")
+            await self.controller.push_agui_log(f"Project opened successfully. Restoring session in the background...", "success")
             
             # Restore the session from the new database
-            await self.restore_session()
+            self._restore_in_background()
             
         except Exception as e:
             logger.error(f"Error opening project: {e}")
             await self.controller.push_agui_log(f"Error opening project: {str(e)}", "error")
             # Try to reconnect on error
             try:
-                import duckdb
-                self.persistence.conn = duckdb.connect(self.persistence.db_path)
+                if not self.persistence.conn:
+                    self.persistence.connect()
             except Exception:
                 pass
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Tests for SessionManager project opening."""
+import asyncio
+import time
+
+from forge.core.event_bus import EventBus
+from forge.domain.session.session_manager import SessionManager
+from forge.infrastructure.persistence.duckdb_service import DuckDBPersistenceService
+
+ENTITY_COUNT = 5000
+
+
+class _Controller:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, payload):
+        self.published.append(topic)
+
+    async def push_agui_log(self, message, level="info"):
+        pass
+
+    def clear_workspace(self):
+        pass
+
+
+class _Qdrant:
+    async def clear_collections(self):
+        pass
+
+
+class _Embedding:
+    """Encodes only once released, so the test controls when restore can finish."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    def model_signature(self):
+        return "test-model", "1"
+
+    async def embed_batch(self, texts, use_long_context=False):
+        await self.release.wait()
+        return [[0.0, 1.0] for _ in texts]
+
+
+async def _write_bundle(tmp_path):
+    persistence = DuckDBPersistenceService(EventBus(), db_path=str(tmp_path / "source.duckdb"))
+    persistence.connect()
+    nodes = [{"id": f"e{i}", "type": "PERSON", "label": f"Entity {i}"} for i in range(ENTITY_COUNT)]
+    edges = [
+        {"source": f"e{i}", "target": f"e{i + 1}", "type": "KNOWS", "doc_id": "doc1"}
+        for i in range(ENTITY_COUNT - 1)
+    ]
+    await persistence.writer.execute(lambda conn: persistence._upsert_graph_delta(conn, nodes, edges))
+    directory = tmp_path / "case.forge"
+    for _ in persistence.export_bundle(str(directory)):
+        pass
+    persistence.close()
+    return directory
+
+
+async def _open_bundle(tmp_path):
+    directory = await _write_bundle(tmp_path)
+    persistence = DuckDBPersistenceService(EventBus(), db_path=str(tmp_path / "other.duckdb"))
+    persistence.connect()
+    embedding = _Embedding()
+    manager = SessionManager(_Controller(), persistence, _Qdrant(), embedding)
+    try:
+        started = time.perf_counter()
+        # Bounded: a restore awaited by open_project would never be released
+        await asyncio.wait_for(manager.open_project(str(directory)), timeout=30)
+        open_seconds = time.perf_counter() - started
+
+        # The project is open and queryable while the restore is still encoding
+        restore = manager.restore_task
+        assert restore is not None and not restore.done()
+        assert persistence.bundle_dir == directory.resolve()
+        assert persistence.get_entity_count() == ENTITY_COUNT
+
+        embedding.release.set()
+        await restore
+        return open_seconds, manager
+    finally:
+        persistence.close()
+
+
+def test_open_project_returns_before_session_restore(tmp_path):
+    open_seconds, manager = asyncio.run(_open_bundle(tmp_path))
+
+    assert manager.restore_task.done() and manager.restore_task.exception() is None
+    assert open_seconds < 2.0, f"open_project took {open_seconds * 1000:.1f}ms for {ENTITY_COUNT} entities"
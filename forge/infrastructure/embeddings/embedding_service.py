@@ -10,8 +10,9 @@ Uses two specialized models:
 from __future__ import annotations
 
 import asyncio
+import importlib.metadata
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
 from forge.core.event_bus import EventBus, EventPayload
@@ -124,6 +125,19 @@ class EmbeddingService:
                 raise
         return self._long_context_model
     
+    def model_signature(self, use_long_context: bool = False) -> Tuple[str, str]:
+        """Name and version of the model used for embeddings (without loading it).
+        
+        The version is the installed sentence-transformers release, so stored
+        vectors are re-encoded when either the model or the library changes.
+        """
+        name = self.long_context_model_name if use_long_context else self.general_model_name
+        try:
+            version = importlib.metadata.version("sentence-transformers")
+        except importlib.metadata.PackageNotFoundError:
+            version = "unknown"
+        return name, f"sentence-transformers/{version}"
+    
     async def start(self):
         """Start the service and subscribe to events."""
         logger.info("Starting EmbeddingService")
@@ -239,6 +253,7 @@ class EmbeddingService:
         
         # Batch embed
         embeddings = await self.embed_batch(texts, use_long_context=False)
+        model, model_version = self.model_signature()
         
         # Emit events for each embedded entity
         for data, embedding in zip(entity_data, embeddings):
@@ -250,6 +265,8 @@ class EmbeddingService:
                     "text": data["text"],
                     "embedding": embedding,
                     "dimension": len(embedding),
+                    "model": model,
+                    "model_version": model_version,
                 }
             )
         
@@ -284,6 +301,7 @@ class EmbeddingService:
         
         # Batch embed
         embeddings = await self.embed_batch(texts, use_long_context=False)
+        model, model_version = self.model_signature()
         
         # Emit events for each embedded relationship
         for data, embedding in zip(relationship_data, embeddings):
@@ -295,6 +313,8 @@ class EmbeddingService:
                     "text": data["text"],
                     "embedding": embedding,
                     "dimension": len(embedding),
+                    "model": model,
+                    "model_version": model_version,
                 }
             )
         
@@ -5,16 +5,52 @@ Provides data export capabilities in various formats.
 
 from __future__ import annotations
 
+import asyncio
 import json
-import csv
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Optional
 from datetime import datetime
 
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from forge.domain.graph.snapshot import get_graph_snapshot, snapshot_to_dicts
+from forge.infrastructure.persistence import graph_stats
+from forge.infrastructure.persistence.pagination import iter_entity_pages, iter_relationship_pages
+
 logger = logging.getLogger(__name__)
 
 
+def _write_json_export(
+    output_path: Path,
+    items_key: str,
+    count_key: str,
+    items: Iterable[Dict[str, Any]],
+) -> int:
+    """Stream an export document (header, item list, then item count) to a file.
+    
+    Items are written one per line as they are produced, so the export never
+    holds more than one page of rows in memory.
+    
+    Returns:
+        Number of items written
+    """
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f'  "export_timestamp": {json.dumps(datetime.now().isoformat())},\n')
+        f.write('  "format_version": "1.0",\n')
+        f.write(f"  {json.dumps(items_key)}: [")
+        for item in items:
+            f.write(",\n    " if count else "\n    ")
+            f.write(json.dumps(item, ensure_ascii=False))
+            count += 1
+        f.write("\n  ],\n" if count else "],\n")
+        f.write(f"  {json.dumps(count_key)}: {count}\n}}\n")
+    return count
+
+
 class ExportService:
     """Service for exporting data in various formats."""
     
@@ -22,7 +58,7 @@ class ExportService:
         """Initialize the export service.
         
         Args:
-            db_connection: DuckDB connection for querying data
+            db_connection: DuckDB connection manager for querying data
         """
         self.db_conn = db_connection
         self.service_name = "ExportService"
@@ -41,39 +77,27 @@ class ExportService:
         Returns:
             Path to exported file
         """
-        query = "SELECT id, type, label, metadata FROM entities WHERE 1=1"
-        params = []
-        
-        if filters:
-            if "entity_type" in filters:
-                query += " AND type = ?"
-                params.append(filters["entity_type"])
-            if "min_relationships" in filters:
-                # This would require a join, simplified for now
-                pass
-        
-        rows = self.db_conn.execute(query, params).fetchall()
-        
-        entities = []
-        for row in rows:
-            entities.append({
-                "id": row[0],
-                "type": row[1],
-                "label": row[2],
-                "metadata": json.loads(row[3]) if row[3] else {},
-            })
-        
-        export_data = {
-            "export_timestamp": datetime.now().isoformat(),
-            "format_version": "1.0",
-            "entity_count": len(entities),
-            "entities": entities,
-        }
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Exported {len(entities)} entities to {output_path}")
+        # Filters are pushed down into the paginated read, and entities are
+        # streamed to the file page by page (constant memory)
+        filters = filters or {}
+        # min_relationships would require a join, simplified for now
+        pages = iter_entity_pages(
+            self.db_conn,
+            columns=("id", "type", "label"),
+            types=[filters["entity_type"]] if "entity_type" in filters else None,
+        )
+        
+        def rows():
+            for page in pages:
+                for entity in page.to_pylist():
+                    entity["metadata"] = {}
+                    yield entity
+        
+        count = await asyncio.to_thread(
+            _write_json_export, output_path, "entities", "entity_count", rows()
+        )
+        
+        logger.info(f"Exported {count} entities to {output_path}")
         return output_path
     
     async def export_entities_csv(
@@ -90,25 +114,28 @@ class ExportService:
         Returns:
             Path to exported file
         """
-        query = "SELECT id, type, label, metadata FROM entities WHERE 1=1"
-        params = []
-        
-        if filters:
-            if "entity_type" in filters:
-                query += " AND type = ?"
-                params.append(filters["entity_type"])
-        
-        rows = self.db_conn.execute(query, params).fetchall()
-        
-        with open(output_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "type", "label", "metadata"])
-            
-            for row in rows:
-                metadata_str = json.dumps(row[3]) if row[3] else ""
-                writer.writerow([row[0], row[1], row[2], metadata_str])
-        
-        logger.info(f"Exported {len(rows)} entities to {output_path}")
+        filters = filters or {}
+        pages = iter_entity_pages(
+            self.db_conn,
+            columns=("id", "type", "label"),
+            types=[filters["entity_type"]] if "entity_type" in filters else None,
+        )
+        
+        def write() -> int:
+            # Written column-wise by Arrow, one page at a time
+            count = 0
+            schema = pa.schema([(name, pa.string()) for name in ("id", "type", "label", "metadata")])
+            with pa_csv.CSVWriter(output_path, schema, write_options=pa_csv.WriteOptions(quoting_style="needed")) as writer:
+                for page in pages:
+                    # Entities carry no metadata; keep the column for format compatibility
+                    page = page.append_column("metadata", pa.nulls(page.num_rows, pa.string()))
+                    writer.write_table(page.cast(schema))
+                    count += page.num_rows
+            return count
+        
+        count = await asyncio.to_thread(write)
+        
+        logger.info(f"Exported {count} entities to {output_path}")
         return output_path
     
     async def export_relationships_json(
@@ -125,40 +152,26 @@ class ExportService:
         Returns:
             Path to exported file
         """
-        query = "SELECT source, target, type, confidence, metadata FROM relationships WHERE 1=1"
-        params = []
-        
-        if filters:
-            if "relationship_type" in filters:
-                query += " AND type = ?"
-                params.append(filters["relationship_type"])
-            if "min_confidence" in filters:
-                query += " AND confidence >= ?"
-                params.append(filters["min_confidence"])
-        
-        rows = self.db_conn.execute(query, params).fetchall()
-        
-        relationships = []
-        for row in rows:
-            relationships.append({
-                "source": row[0],
-                "target": row[1],
-                "type": row[2],
-                "confidence": float(row[3]) if row[3] else 0.0,
-                "metadata": json.loads(row[4]) if row[4] else {},
-            })
-        
-        export_data = {
-            "export_timestamp": datetime.now().isoformat(),
-            "format_version": "1.0",
-            "relationship_count": len(relationships),
-            "relationships": relationships,
-        }
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Exported {len(relationships)} relationships to {output_path}")
+        filters = filters or {}
+        pages = iter_relationship_pages(
+            self.db_conn,
+            columns=("id", "source", "target", "type", "confidence"),
+            types=[filters["relationship_type"]] if "relationship_type" in filters else None,
+            min_confidence=filters.get("min_confidence"),
+        )
+        
+        def rows():
+            for page in pages:
+                for relationship in page.select(["source", "target", "type", "confidence"]).to_pylist():
+                    relationship["confidence"] = float(relationship["confidence"] or 0.0)
+                    relationship["metadata"] = {}
+                    yield relationship
+        
+        count = await asyncio.to_thread(
+            _write_json_export, output_path, "relationships", "relationship_count", rows()
+        )
+        
+        logger.info(f"Exported {count} relationships to {output_path}")
         return output_path
     
     async def export_graph_json(
@@ -175,32 +188,14 @@ class ExportService:
         Returns:
             Path to exported file
         """
-        # Export entities
-        entities_query = "SELECT id, type, label, metadata FROM entities"
-        entity_rows = self.db_conn.execute(entities_query).fetchall()
-        
-        entities = []
-        for row in entity_rows:
-            entities.append({
-                "id": row[0],
-                "type": row[1],
-                "label": row[2],
-                "metadata": json.loads(row[3]) if row[3] else {},
-            })
-        
-        # Export relationships
-        rel_query = "SELECT source, target, type, confidence, metadata FROM relationships"
-        rel_rows = self.db_conn.execute(rel_query).fetchall()
-        
-        relationships = []
-        for row in rel_rows:
-            relationships.append({
-                "source": row[0],
-                "target": row[1],
-                "type": row[2],
-                "confidence": float(row[3]) if row[3] else 0.0,
-                "metadata": json.loads(row[4]) if row[4] else {},
-            })
+        # Entities and relationships come from the shared graph snapshot
+        # (built once per graph version and reused by analytics and the UI)
+        snapshot = get_graph_snapshot(self.db_conn)
+        if snapshot is None:
+            raise RuntimeError("Graph data could not be read from the database")
+        entities, relationships = snapshot_to_dicts(snapshot)
+        for item in entities + relationships:
+            item["metadata"] = {}
         
         export_data = {
             "export_timestamp": datetime.now().isoformat(),
@@ -212,18 +207,14 @@ class ExportService:
         }
         
         if include_analytics:
-            # Add basic graph statistics
+            # Add basic graph statistics (pre-aggregated on write)
+            stats = graph_stats.get_graph_stats(self.db_conn)
             export_data["analytics"] = {
-                "total_nodes": len(entities),
-                "total_edges": len(relationships),
-                "entity_types": {},
+                "total_nodes": stats.entities,
+                "total_edges": stats.relationships,
+                "total_documents": stats.documents,
+                "entity_types": stats.entity_types,
             }
-            
-            # Count entity types
-            for entity in entities:
-                entity_type = entity["type"]
-                export_data["analytics"]["entity_types"][entity_type] = \
-                    export_data["analytics"]["entity_types"].get(entity_type, 0) + 1
         
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(export_data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,206 @@
+"""Capped store of UI artifacts for PyScrAI Forge.
+
+Workspace schemas (UI artifacts) are snapshots streamed to the UI during
+extraction; sessions are never restored from them. They are kept out of
+the project database, which holds only the knowledge graph, in a small
+DuckDB file of their own (``ui_artifacts.duckdb`` next to the initial
+project database) that works as a ring buffer:
+
+- artifacts older than ``UI_ARTIFACT_TTL_SECONDS`` are evicted
+- the store never holds more than ``UI_ARTIFACT_MAX_ROWS`` artifacts: the
+  oldest ones are evicted by the write that goes over the cap, and when the
+  file is opened
+- every ``UI_ARTIFACT_COMPACT_EVERY`` writes the table is evicted, rewritten
+  and checkpointed, so the file does not keep the space of evicted rows
+
+Artifacts are keyed by their content hash; storing one again only makes it
+the most recent. The store opens its file on first use; if that fails
+(e.g. another process holds it) artifacts are dropped with a warning.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE_NAME = "ui_artifacts.duckdb"
+# Artifacts kept at most
+UI_ARTIFACT_MAX_ROWS = 1000
+# Age after which an artifact is evicted
+UI_ARTIFACT_TTL_SECONDS = 7 * 24 * 3600
+# Writes between compactions
+UI_ARTIFACT_COMPACT_EVERY = 200
+
+_COLUMNS = """
+    id VARCHAR PRIMARY KEY,
+    schema TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+"""
+
+
+def artifact_id(schema_json: str) -> str:
+    """Content hash keying an artifact."""
+    return hashlib.md5(schema_json.encode()).hexdigest()
+
+
+class UIArtifactStore:
+    """Thread-safe capped, TTL-evicted UI artifact table in its own database file."""
+
+    def __init__(
+        self,
+        path: str,
+        max_rows: int = UI_ARTIFACT_MAX_ROWS,
+        ttl_seconds: int = UI_ARTIFACT_TTL_SECONDS,
+        compact_every: int = UI_ARTIFACT_COMPACT_EVERY,
+    ):
+        """
+        Args:
+            path: Database file of the store (created on first use)
+            max_rows: Artifacts kept at most
+            ttl_seconds: Age after which an artifact is evicted
+            compact_every: Writes between compactions
+        """
+        self.path = path
+        self.max_rows = max(1, max_rows)
+        self.ttl_seconds = ttl_seconds
+        self.compact_every = max(1, compact_every)
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Rows in the table, known once the file is open
+        self._rows = 0
+        # Opening failed; retried after ``close``
+        self._unavailable = False
+
+    def _connection(self) -> Optional[duckdb.DuckDBPyConnection]:
+        if self._conn is None and not self._unavailable:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = duckdb.connect(self.path)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS ui_artifacts ({_COLUMNS})")
+                # A file written with a larger cap (or left expired) is trimmed now
+                self._evict(conn)
+                self._rows = conn.execute("SELECT count(*) FROM ui_artifacts").fetchone()[0]
+            except Exception as e:
+                logger.warning(f"UI artifact store unavailable ({self.path}): {e}")
+                self._unavailable = True
+                return None
+            self._conn = conn
+        return self._conn
+
+    def add(self, schema: Dict[str, Any]) -> None:
+        """Store an artifact (or make an identical stored one the most recent)."""
+        schema_json = json.dumps(schema, sort_keys=True)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            key = artifact_id(schema_json)
+            stored = conn.execute("SELECT 1 FROM ui_artifacts WHERE id = ?", [key]).fetchone()
+            conn.execute("""
+                INSERT INTO ui_artifacts (id, schema) VALUES (?, ?)
+                ON CONFLICT (id) DO UPDATE SET created_at = now()
+            """, (key, schema_json))
+            if stored is None:
+                self._rows += 1
+                if self._rows > self.max_rows:
+                    self._evict(conn)
+            self._writes += 1
+            if self._writes % self.compact_every == 0:
+                self._compact(conn)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Live artifacts, oldest first (the ``limit`` most recent if given)."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return []
+            rows = conn.execute(f"""
+                SELECT schema FROM (
+                    SELECT schema, created_at FROM ui_artifacts
+                    WHERE created_at >= CURRENT_TIMESTAMP - to_seconds({int(self.ttl_seconds)})
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                )
+                ORDER BY created_at
+            """, [min(limit, self.max_rows) if limit is not None else self.max_rows]).fetchall()
+        artifacts = []
+        for (schema_json,) in rows:
+            try:
+                artifacts.append(json.loads(schema_json))
+            except json.JSONDecodeError:
+                # Skip malformed JSON
+                continue
+        return artifacts
+
+    def evict(self) -> int:
+        """Drop expired artifacts and those beyond the cap; returns how many."""
+        with self._lock:
+            conn = self._connection()
+            return self._evict(conn) if conn is not None else 0
+
+    def compact(self) -> None:
+        """Evict, rewrite the table and checkpoint the file."""
+        with self._lock:
+            conn = self._connection()
+            if conn is not None:
+                self._compact(conn)
+
+    def clear(self) -> None:
+        """Remove all artifacts (with ``clear_all_data``)."""
+        with self._lock:
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM ui_artifacts")
+                conn.execute("CHECKPOINT")
+                self._rows = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._unavailable = False
+
+    def _evict(self, conn: duckdb.DuckDBPyConnection) -> int:
+        rows = conn.execute(f"""
+            DELETE FROM ui_artifacts
+            WHERE created_at < CURRENT_TIMESTAMP - to_seconds({int(self.ttl_seconds)})
+               OR id NOT IN (
+                   SELECT id FROM ui_artifacts ORDER BY created_at DESC, id LIMIT {self.max_rows}
+               )
+            RETURNING id
+        """).fetchall()
+        self._rows -= len(rows)
+        return len(rows)
+
+    def _compact(self, conn: duckdb.DuckDBPyConnection) -> None:
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            evicted = self._evict(conn)
+            # Rewritten in age order, so the file keeps no space of evicted rows
+            conn.execute(f"CREATE TABLE ui_artifacts_compacted ({_COLUMNS})")
+            conn.execute("INSERT INTO ui_artifacts_compacted SELECT * FROM ui_artifacts ORDER BY created_at")
+            conn.execute("DROP TABLE ui_artifacts")
+            conn.execute("ALTER TABLE ui_artifacts_compacted RENAME TO ui_artifacts")
+            conn.execute("COMMIT")
+            conn.execute("CHECKPOINT")
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+                # The eviction was rolled back with the rest
+                self._rows = conn.execute("SELECT count(*) FROM ui_artifacts").fetchone()[0]
+            except duckdb.Error:
+                pass
+            logger.warning(f"UI artifact store compaction failed: {e}")
+            return
+        if evicted:
+            logger.debug(f"Evicted {evicted} UI artifacts")
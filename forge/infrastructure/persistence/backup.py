@@ -0,0 +1,146 @@
+"""Online snapshots of the PyScrAI Forge database.
+
+A snapshot copies the open database into another DuckDB file without closing
+it: the target is ATTACHed to the running instance, its schema is created
+with ``COPY FROM DATABASE ... (SCHEMA)`` and every table is copied inside one
+read transaction on a dedicated cursor. DuckDB's MVCC gives that transaction
+a consistent view of the database while the writer keeps committing, so
+handlers never see the connection disappear.
+
+``snapshot_database`` is a generator that yields a ``SnapshotProgress`` after
+each step; advance it with ``DuckDBConnectionManager.iterate`` to run the
+copy off the event loop and report progress as it goes. The snapshot is
+written to a temporary file and moved over the target only once complete.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SnapshotProgress:
+    """Progress of a snapshot; ``table`` is None for the schema and final steps."""
+
+    step: int
+    total: int
+    table: Optional[str] = None
+    rows: int = 0
+    done: bool = False
+
+
+def _tables_in_dependency_order(cursor, database: str) -> List[str]:
+    """Tables of ``database``, each after the tables its foreign keys reference."""
+    tables = [row[0] for row in cursor.execute("""
+        SELECT table_name FROM duckdb_tables()
+        WHERE database_name = ? AND schema_name = 'main' AND NOT temporary
+        ORDER BY table_name
+    """, [database]).fetchall()]
+    references: Dict[str, Set[str]] = {table: set() for table in tables}
+    for table, referenced in cursor.execute("""
+        SELECT table_name, referenced_table FROM duckdb_constraints()
+        WHERE database_name = ? AND constraint_type = 'FOREIGN KEY'
+    """, [database]).fetchall():
+        if table in references and referenced != table:
+            references[table].add(referenced)
+
+    ordered: List[str] = []
+    while references:
+        ready = [table for table, refs in references.items() if not refs - set(ordered)]
+        # A reference cycle cannot be ordered; copy the rest as-is
+        for table in ready or list(references):
+            ordered.append(table)
+            del references[table]
+    return ordered
+
+
+def _sql_path(path: Path) -> str:
+    return path.as_posix().replace("'", "''")
+
+
+def _identifier(name: str) -> str:
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def _remove_database_file(path: Path) -> None:
+    for candidate in (path, Path(f"{path}.wal")):
+        if candidate.exists():
+            candidate.unlink()
+
+
+def snapshot_database(cursor: duckdb.DuckDBPyConnection, target_path: str) -> Iterator[SnapshotProgress]:
+    """Copy the cursor's database to ``target_path``, yielding progress.
+
+    Args:
+        cursor: Dedicated connection to the database (closed when done); it
+            must not be used by anything else while the snapshot runs
+        target_path: DuckDB file to write; replaced atomically when complete
+
+    Raises:
+        ValueError: If ``target_path`` is the database being copied
+    """
+    target = Path(target_path).resolve()
+    temp = target.with_name(f"{target.name}.tmp")
+    alias = _identifier(f"snapshot_{uuid.uuid4().hex[:8]}")
+    attached = False
+    try:
+        source_name = cursor.execute("SELECT current_database()").fetchone()[0]
+        source_file = cursor.execute(
+            "SELECT path FROM duckdb_databases() WHERE database_name = ?", [source_name]
+        ).fetchone()[0]
+        # The database name comes from the file name ("my-case", "case 1", ...)
+        source = _identifier(source_name)
+        if source_file and Path(source_file).resolve() == target:
+            raise ValueError(f"Cannot snapshot the database onto itself: {target}")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _remove_database_file(temp)
+        cursor.execute(f"ATTACH '{_sql_path(temp)}' AS {alias}")
+        attached = True
+
+        # One transaction: every table is read from the same consistent state
+        cursor.execute("BEGIN TRANSACTION")
+        tables = _tables_in_dependency_order(cursor, source_name)
+        total = len(tables) + 2
+        cursor.execute(f"COPY FROM DATABASE {source} TO {alias} (SCHEMA)")
+        yield SnapshotProgress(step=1, total=total)
+
+        for step, table in enumerate(tables, start=2):
+            quoted = _identifier(table)
+            row = cursor.execute(f"INSERT INTO {alias}.{quoted} SELECT * FROM {source}.{quoted}").fetchone()
+            yield SnapshotProgress(step=step, total=total, table=table, rows=row[0] if row else 0)
+        cursor.execute("COMMIT")
+
+        cursor.execute(f"CHECKPOINT {alias}")
+        cursor.execute(f"DETACH {alias}")
+        attached = False
+        _remove_database_file(Path(f"{target}.wal"))
+        os.replace(temp, target)
+        logger.info(f"Database snapshot written to {target}")
+        yield SnapshotProgress(step=total, total=total, done=True)
+    except BaseException:
+        try:
+            cursor.execute("ROLLBACK")
+        except duckdb.Error:
+            pass
+        if attached:
+            try:
+                cursor.execute(f"DETACH {alias}")
+            except duckdb.Error:
+                pass
+        try:
+            _remove_database_file(temp)
+        except OSError:
+            pass
+        raise
+    finally:
+        cursor.close()
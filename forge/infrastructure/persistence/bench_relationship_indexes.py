@@ -0,0 +1,164 @@
+"""Benchmark harness for the relationship indexes.
+
+Builds a database with the real schema (see ``migrations``) holding a
+synthetic graph, then times the relationship queries the services run:
+an entity's strongest relationships (``queries.entity_relationships``,
+used by the semantic profiler), natural-key upserts of graph deltas, and
+deduplication merges. Each query set runs against three index layouts:
+
+- ``schema``: the indexes created by the migrations
+- ``+composite``: additional (source, confidence) / (target, confidence) indexes
+- ``no source/target``: without the single-column source/target indexes
+
+Usage:
+    python -m forge.infrastructure.persistence.bench_relationship_indexes [edges] [entities] [repeats]
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+
+from forge.core.event_bus import EventBus
+from forge.domain.graph import queries
+from forge.domain.resolution.deduplication_service import DeduplicationService
+from forge.infrastructure.persistence import migrations
+from forge.infrastructure.persistence.connection_manager import DuckDBConnectionManager
+
+RELATION_TYPES = ["WORKS_AT", "LOCATED_IN", "KNOWS", "PARTICIPATED_IN"]
+UPSERT_BATCH = 1000
+
+
+def load_graph(db: DuckDBConnectionManager, edge_count: int, entity_count: int) -> float:
+    """Fill the graph tables; returns the load time in seconds."""
+    started = time.perf_counter()
+    db.execute("""
+        INSERT INTO entities (id, type, label)
+        SELECT 'entity_' || i, 'PERSON', 'Entity ' || i FROM range(?) t(i)
+    """, [entity_count])
+    db.execute(f"""
+        INSERT INTO relationships (source, target, type, confidence, doc_id)
+        SELECT DISTINCT ON (source, target, type, doc_id) * FROM (
+            SELECT 'entity_' || (hash(i) % $entities) AS source,
+                   'entity_' || (hash(i * 7919) % $entities) AS target,
+                   list_extract({RELATION_TYPES!r}, (i % {len(RELATION_TYPES)}) + 1) AS type,
+                   random() AS confidence,
+                   'doc_' || (i % 50) AS doc_id
+            FROM range($edges) t(i)
+        )
+    """, {"entities": entity_count, "edges": edge_count})
+    return time.perf_counter() - started
+
+
+def upsert_command(rng: random.Random, entity_count: int):
+    """Writer command upserting a batch of edges on the natural key (as graph deltas are)."""
+    rows = [
+        {
+            "source": f"entity_{rng.randrange(entity_count)}",
+            "target": f"entity_{rng.randrange(entity_count)}",
+            "type": rng.choice(RELATION_TYPES),
+            "confidence": rng.random(),
+            "doc_id": f"doc_{rng.randrange(50)}",
+        }
+        for _ in range(UPSERT_BATCH)
+    ]
+    staged = pa.Table.from_pylist(rows)
+
+    def upsert(conn) -> None:
+        conn.register("staged_bench_edges", staged)
+        try:
+            conn.execute("""
+                INSERT INTO relationships (source, target, type, confidence, doc_id)
+                SELECT DISTINCT ON (source, target, type, doc_id) source, target, type, confidence, doc_id
+                FROM staged_bench_edges
+                ON CONFLICT (source, target, type, doc_id) DO UPDATE SET confidence = excluded.confidence
+            """)
+        finally:
+            conn.unregister("staged_bench_edges")
+
+    return upsert
+
+
+async def run_queries(db: DuckDBConnectionManager, dedup: DeduplicationService, rng: random.Random,
+                      entity_count: int, repeats: int, merge_pool) -> dict:
+    """Average milliseconds per operation.
+
+    Lookups and upserts use the lower half of the entities; merges fold
+    entities taken from ``merge_pool`` (the upper half) into them.
+    """
+    timings = {}
+    live = entity_count // 2
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        queries.entity_relationships(db, f"entity_{rng.randrange(live)}")
+    timings["entity_relationships"] = (time.perf_counter() - started) / repeats * 1000
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        db.execute("""
+            SELECT id FROM relationships WHERE source = ? AND target = ? AND type = ? AND doc_id = ?
+        """, [f"entity_{rng.randrange(live)}", f"entity_{rng.randrange(live)}",
+              rng.choice(RELATION_TYPES), f"doc_{rng.randrange(50)}"]).fetchall()
+    timings["natural_key_lookup"] = (time.perf_counter() - started) / repeats * 1000
+
+    batches = max(1, repeats // 10)
+    started = time.perf_counter()
+    for _ in range(batches):
+        await db.writer.execute(upsert_command(rng, live))
+    timings[f"upsert_{UPSERT_BATCH}"] = (time.perf_counter() - started) / batches * 1000
+
+    merges = max(1, repeats // 10)
+    started = time.perf_counter()
+    for _ in range(merges):
+        await dedup._merge_entities(f"entity_{rng.randrange(live)}", f"entity_{next(merge_pool)}")
+    timings["merge_entities"] = (time.perf_counter() - started) / merges * 1000
+    return timings
+
+
+async def main(edge_count: int = 1_000_000, entity_count: int = 100_000, repeats: int = 200):
+    with tempfile.TemporaryDirectory() as directory:
+        db = DuckDBConnectionManager()
+        db.open(str(Path(directory) / "bench.duckdb"), initialize=migrations.migrate)
+        dedup = DeduplicationService(EventBus(), None, None, db)
+        rng = random.Random(42)
+        merge_pool = iter(range(entity_count - 1, entity_count // 2, -1))
+
+        load = load_graph(db, edge_count, entity_count)
+        edges = db.execute("SELECT count(*) FROM relationships").fetchone()[0]
+        print(f"[Bench] loaded {edges} relationships / {entity_count} entities in {load:.1f}s")
+
+        layouts = [
+            ("schema", []),
+            ("+composite", [
+                "CREATE INDEX idx_bench_source_confidence ON relationships(source, confidence)",
+                "CREATE INDEX idx_bench_target_confidence ON relationships(target, confidence)",
+            ]),
+            ("no source/target", [
+                "DROP INDEX idx_bench_source_confidence",
+                "DROP INDEX idx_bench_target_confidence",
+                "DROP INDEX idx_relationships_source",
+                "DROP INDEX idx_relationships_target",
+            ]),
+        ]
+        results = {}
+        for name, statements in layouts:
+            started = time.perf_counter()
+            for statement in statements:
+                await db.writer.execute(lambda conn, sql=statement: conn.execute(sql), isolated=True)
+            if statements:
+                print(f"[Bench] {name}: index changes took {time.perf_counter() - started:.1f}s")
+            results[name] = await run_queries(db, dedup, rng, entity_count, repeats, merge_pool)
+        db.close()
+
+    operations = list(next(iter(results.values())))
+    print(f"{'operation (ms)':<24}" + "".join(f"{name:>18}" for name in results))
+    for operation in operations:
+        print(f"{operation:<24}" + "".join(f"{results[name][operation]:>18.2f}" for name in results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
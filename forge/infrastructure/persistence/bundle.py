@@ -0,0 +1,268 @@
+"""Columnar project bundles for PyScrAI Forge.
+
+A bundle is a directory (``<name>.forge``) with one zstd-compressed Parquet
+file per table, the stored embeddings in ``vectors.parquet`` and a
+``manifest.json`` describing them:
+
+    project.forge/
+        manifest.json
+        entities.parquet
+        relationships.parquet
+        semantic_profiles.parquet
+        narratives.parquet
+        vectors.parquet
+        working.duckdb      (created when the bundle is opened)
+
+Opening a bundle is lazy: its working database only gets views over the
+Parquet files, so opening costs the same for any project size and queries
+read just the row groups and columns they touch. The views are turned into
+regular tables (``materialize``) right before the first write, which the
+writer runs as its ``prepare`` step. Later edits live in the working
+database until the bundle is saved again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import duckdb
+
+from forge.infrastructure.persistence import migrations
+from forge.infrastructure.persistence.backup import (
+    SnapshotProgress,
+    _remove_database_file,
+    _tables_in_dependency_order,
+)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = "pyscrai-forge-bundle"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".forge"
+MANIFEST_NAME = "manifest.json"
+WORKING_DB_NAME = "working.duckdb"
+PARQUET_COMPRESSION = "zstd"
+
+# Comment marking the views of a lazily opened bundle
+_VIEW_COMMENT = BUNDLE_FORMAT
+# Files with a name other than "<table>.parquet"
+_TABLE_FILES = {"embeddings": "vectors.parquet"}
+# Schema version of bundles whose manifest predates the "schema_version" field
+_UNVERSIONED_SCHEMA = 4
+
+
+def _sql_path(path: Path) -> str:
+    return path.as_posix().replace("'", "''")
+
+
+def bundle_directory(path: str) -> Optional[Path]:
+    """Bundle directory referred to by ``path``, or None if it is not a bundle path.
+
+    Accepts the bundle directory itself, its manifest file, or (for saving)
+    a path ending in ``BUNDLE_SUFFIX``.
+    """
+    candidate = Path(path)
+    if candidate.name == MANIFEST_NAME:
+        candidate = candidate.parent
+    if candidate.suffix == BUNDLE_SUFFIX or (candidate / MANIFEST_NAME).is_file():
+        return candidate.resolve()
+    return None
+
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    """Load and validate a bundle manifest.
+
+    Raises:
+        ValueError: If the directory holds no readable bundle of a supported version
+    """
+    try:
+        manifest = json.loads((directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Not a project bundle: {directory} ({e})") from e
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Not a project bundle: {directory}")
+    if manifest.get("version", 0) > BUNDLE_VERSION:
+        raise ValueError(f"Bundle version {manifest.get('version')} is newer than supported ({BUNDLE_VERSION})")
+    return manifest
+
+
+def write_bundle(cursor: duckdb.DuckDBPyConnection, directory: str) -> Iterator[SnapshotProgress]:
+    """Write the cursor's database as a bundle, yielding progress after each table.
+
+    All tables are exported inside one read transaction, so the bundle is
+    consistent while the writer keeps committing. Files are written to a
+    staging directory and moved into place with the manifest last.
+
+    Args:
+        cursor: Dedicated connection to the database (closed when done)
+        directory: Bundle directory to create or overwrite
+    """
+    target = Path(directory).resolve()
+    staging = target / f".staging-{uuid.uuid4().hex[:8]}"
+    try:
+        source = cursor.execute("SELECT current_database()").fetchone()[0]
+        source_file = cursor.execute(
+            "SELECT path FROM duckdb_databases() WHERE database_name = ?", [source]
+        ).fetchone()[0]
+        staging.mkdir(parents=True)
+
+        cursor.execute("BEGIN TRANSACTION")
+        schema_version = migrations.current_version(cursor)
+        # The schema version is recorded in the manifest instead
+        tables = [
+            table for table in _tables_in_dependency_order(cursor, source)
+            if table != migrations.VERSION_TABLE
+        ]
+        # Lazily opened bundle tables are still views over the previous files
+        tables += [row[0] for row in cursor.execute("""
+            SELECT view_name FROM duckdb_views()
+            WHERE database_name = ? AND comment = ?
+        """, [source, _VIEW_COMMENT]).fetchall() if row[0] not in tables]
+        total = len(tables) + 1
+        entries: List[Dict[str, Any]] = []
+        for step, table in enumerate(tables, start=1):
+            file_name = _TABLE_FILES.get(table, f"{table}.parquet")
+            row = cursor.execute(f"""
+                COPY (SELECT * FROM {table})
+                TO '{_sql_path(staging / file_name)}' (FORMAT parquet, COMPRESSION {PARQUET_COMPRESSION})
+            """).fetchone()
+            rows = row[0] if row else 0
+            entries.append({"name": table, "file": file_name, "rows": rows})
+            yield SnapshotProgress(step=step, total=total, table=table, rows=rows)
+        sequences = {
+            name: next_value
+            for name, next_value in cursor.execute("""
+                SELECT sequence_name, coalesce(last_value + increment_by, start_value)
+                FROM duckdb_sequences() WHERE database_name = ?
+            """, [source]).fetchall()
+        }
+        cursor.execute("COMMIT")
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": BUNDLE_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "compression": PARQUET_COMPRESSION,
+            "schema_version": schema_version,
+            # In foreign-key order, the order they are materialized in
+            "tables": entries,
+            "sequences": sequences,
+        }
+        (staging / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        # The working database of another source no longer matches the bundle
+        working = target / WORKING_DB_NAME
+        if not source_file or Path(source_file).resolve() != working:
+            _remove_database_file(working)
+        for entry in entries:
+            os.replace(staging / entry["file"], target / entry["file"])
+        os.replace(staging / MANIFEST_NAME, target / MANIFEST_NAME)
+        logger.info(f"Project bundle written to {target}")
+        yield SnapshotProgress(step=total, total=total, done=True)
+    except BaseException:
+        try:
+            cursor.execute("ROLLBACK")
+        except duckdb.Error:
+            pass
+        raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        cursor.close()
+
+
+def _materialized(conn, manifest: Dict[str, Any]) -> bool:
+    names = [entry["name"] for entry in manifest["tables"]]
+    row = conn.execute("""
+        SELECT count(*) FROM duckdb_tables()
+        WHERE database_name = current_database() AND NOT temporary AND list_contains(?, table_name)
+    """, [names]).fetchone()
+    return bool(row and row[0])
+
+
+def open_views(
+    conn,
+    directory: Path,
+    manifest: Dict[str, Any],
+    create_schema: Callable[[Any], None],
+) -> None:
+    """Initialize a bundle's working database (``DuckDBConnectionManager.open`` hook).
+
+    A fresh working database gets views over the bundle files; one that has
+    already been written to just gets its schema ensured. Bundles of an older
+    schema version are materialized (and migrated) right away, since the
+    views would not match the current schema.
+    """
+    if _materialized(conn, manifest):
+        create_schema(conn)
+        return
+    for name, next_value in manifest.get("sequences", {}).items():
+        conn.execute(f"CREATE SEQUENCE IF NOT EXISTS {name} START {int(next_value)}")
+    for entry in manifest["tables"]:
+        # Re-created on every open, so a moved bundle still finds its files
+        conn.execute(f"""
+            CREATE OR REPLACE VIEW {entry['name']} AS
+            SELECT * FROM read_parquet('{_sql_path(directory / entry['file'])}')
+        """)
+        conn.execute(f"COMMENT ON VIEW {entry['name']} IS '{_VIEW_COMMENT}'")
+    if manifest.get("schema_version", _UNVERSIONED_SCHEMA) < migrations.SCHEMA_VERSION:
+        materialize(conn, directory)
+        return
+    logger.info(f"Opened project bundle lazily: {directory}")
+
+
+def _fill_tables(conn, names: List[str]) -> List[str]:
+    """Move the data of ``bundle_<name>`` views into existing tables; returns the names without a table."""
+    existing = {row[0] for row in conn.execute("""
+        SELECT table_name FROM duckdb_tables() WHERE database_name = current_database()
+    """).fetchall()}
+    for name in names:
+        if name in existing:
+            conn.execute(f"INSERT INTO {name} BY NAME SELECT * FROM bundle_{name}")
+            conn.execute(f"DROP VIEW bundle_{name}")
+    return [name for name in names if name not in existing]
+
+
+def materialize(conn, directory: Path) -> None:
+    """Replace a lazily opened bundle's views with tables holding their data.
+
+    The tables are created at the bundle's schema version, filled, and then
+    migrated to the current version. No-op if the working database has no
+    bundle views (left). Runs in one transaction, so an interrupted
+    materialization leaves the views intact.
+    """
+    views = {row[0] for row in conn.execute("""
+        SELECT view_name FROM duckdb_views()
+        WHERE database_name = current_database() AND comment = ?
+    """, [_VIEW_COMMENT]).fetchall()}
+    if not views:
+        return
+    manifest = read_manifest(directory)
+    ordered = [entry["name"] for entry in manifest["tables"] if entry["name"] in views]
+    ordered += sorted(views - set(ordered))
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        for name in ordered:
+            conn.execute(f"ALTER VIEW {name} RENAME TO bundle_{name}")
+        migrations.migrate(
+            conn, target=manifest.get("schema_version", _UNVERSIONED_SCHEMA), transactional=False
+        )
+        remaining = _fill_tables(conn, ordered)
+        migrations.migrate(conn, transactional=False)
+        _fill_tables(conn, remaining)
+        conn.execute("COMMIT")
+    except Exception:
+        try:
+            conn.execute("ROLLBACK")
+        except duckdb.Error:
+            # A failed COMMIT has already rolled back
+            pass
+        raise
+    logger.info(f"Materialized {len(ordered)} bundle tables from {directory}")
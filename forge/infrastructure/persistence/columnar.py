@@ -0,0 +1,119 @@
+"""Columnar bulk reads of the PyScrAI Forge graph tables.
+
+Entity and relationship loads are returned as Arrow tables (or NumPy column
+arrays) straight from DuckDB instead of per-row Python dicts. Only the
+requested columns are read and filters are evaluated in SQL, so bulk
+consumers (session restore, export) touch exactly the data they need.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+ENTITY_COLUMNS = ("id", "type", "label", "created_at", "updated_at")
+RELATIONSHIP_COLUMNS = ("id", "source", "target", "type", "confidence", "doc_id", "created_at")
+
+
+def fetch_table(result) -> pa.Table:
+    """Fetch a DuckDB result as an Arrow table (``to_arrow_table`` on DuckDB >= 1.4)."""
+    fetch = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+    return fetch()
+
+
+def _projection(columns: Optional[Sequence[str]], allowed: Tuple[str, ...]) -> str:
+    if not columns:
+        return ", ".join(allowed)
+    unknown = [column for column in columns if column not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown}, expected some of {allowed}")
+    return ", ".join(columns)
+
+
+def _in_filter(column: str, values: Optional[Sequence[Any]], clauses: List[str], params: List[Any]) -> None:
+    if values is not None:
+        clauses.append(f"list_contains(?, {column})")
+        params.append(list(values))
+
+
+def _where(clauses: List[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def entities_table(
+    conn,
+    columns: Optional[Sequence[str]] = None,
+    types: Optional[Sequence[str]] = None,
+    ids: Optional[Sequence[str]] = None,
+    order_by: Optional[str] = "id",
+) -> pa.Table:
+    """Read entities as an Arrow table.
+
+    Args:
+        conn: DuckDB connection (or connection manager)
+        columns: Columns to read (all of ``ENTITY_COLUMNS`` if None)
+        types: Keep only entities of these types
+        ids: Keep only these entity ids
+        order_by: Column to sort by, or None for storage order
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    _in_filter("type", types, clauses, params)
+    _in_filter("id", ids, clauses, params)
+    order = f"ORDER BY {_projection([order_by], ENTITY_COLUMNS)}" if order_by else ""
+    return fetch_table(conn.execute(f"""
+        SELECT {_projection(columns, ENTITY_COLUMNS)}
+        FROM entities
+        {_where(clauses)}
+        {order}
+    """, params))
+
+
+def relationships_table(
+    conn,
+    columns: Optional[Sequence[str]] = None,
+    types: Optional[Sequence[str]] = None,
+    min_confidence: Optional[float] = None,
+    doc_id: Optional[str] = None,
+    order_by: Optional[str] = "id",
+) -> pa.Table:
+    """Read relationships as an Arrow table.
+
+    Args:
+        conn: DuckDB connection (or connection manager)
+        columns: Columns to read (all of ``RELATIONSHIP_COLUMNS`` if None)
+        types: Keep only relationships of these types
+        min_confidence: Keep only relationships with at least this confidence
+        doc_id: Keep only relationships extracted from this document
+        order_by: Column to sort by, or None for storage order
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    _in_filter("type", types, clauses, params)
+    if min_confidence is not None:
+        clauses.append("confidence >= ?")
+        params.append(min_confidence)
+    if doc_id is not None:
+        clauses.append("doc_id = ?")
+        params.append(doc_id)
+    order = f"ORDER BY {_projection([order_by], RELATIONSHIP_COLUMNS)}" if order_by else ""
+    return fetch_table(conn.execute(f"""
+        SELECT {_projection(columns, RELATIONSHIP_COLUMNS)}
+        FROM relationships
+        {_where(clauses)}
+        {order}
+    """, params))
+
+
+def table_columns(table: pa.Table) -> Dict[str, np.ndarray]:
+    """NumPy arrays of an Arrow table's columns.
+
+    Single-chunk numeric columns without nulls are converted without
+    copying; string columns become object arrays.
+    """
+    return {
+        name: table.column(name).to_numpy()
+        for name in table.column_names
+    }
@@ -0,0 +1,298 @@
+"""Connection management for the PyScrAI Forge DuckDB database.
+
+``DuckDBConnectionManager`` owns the single database instance of the open
+project file, its ``DuckDBWriter``, and one read cursor per thread. Services
+hold the manager instead of a raw connection: it is connection-like
+(``execute`` runs on the calling thread's cursor), so their handles stay
+valid when a project is saved, opened or cleared and the underlying
+connection is replaced.
+
+Further project files can be attached to the same instance (``attach``) and
+made the default database of the writer and every cursor (``use``), which
+switches projects without reopening anything; see ``workspace``.
+
+Lifecycle listeners are called with ``(state, db_path)`` where ``state`` is
+``"opened"``, ``"closing"`` or ``"closed"``; switching to another attached
+database is announced as ``"opened"`` with its path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Tuple
+
+import duckdb
+
+from forge.infrastructure.persistence.writer import DuckDBWriter
+
+logger = logging.getLogger(__name__)
+
+ConnectionListener = Callable[[str, str], None]
+
+
+class DuckDBConnectionManager:
+    """Hands out per-thread cursors of one database instance, coordinated with its writer."""
+
+    def __init__(self):
+        self.db_path: Optional[str] = None
+        self._root: Optional[duckdb.DuckDBPyConnection] = None
+        self._writer: Optional[DuckDBWriter] = None
+        # Bumped on every open/close so threads drop cursors of a previous database
+        self._generation = 0
+        self._local = threading.local()
+        self._cursors: List[duckdb.DuckDBPyConnection] = []
+        self._lock = threading.RLock()
+        self._listeners: List[ConnectionListener] = []
+        # Attached database that cursors and the writer use (None: the opened file)
+        self._catalog: Optional[str] = None
+        self._catalog_path: Optional[str] = None
+        # Name of the opened file's database
+        self._home: Optional[str] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._root is not None
+
+    def __bool__(self) -> bool:
+        return self.is_open
+
+    @property
+    def catalog(self) -> Optional[str]:
+        """Attached database in use (None for the opened file)."""
+        return self._catalog
+
+    @property
+    def active_path(self) -> Optional[str]:
+        """File of the database in use."""
+        return self._catalog_path if self._catalog is not None else self.db_path
+
+    @property
+    def writer(self) -> Optional[DuckDBWriter]:
+        """Writer of the open database (None when closed)."""
+        return self._writer
+
+    @property
+    def write_version(self) -> Tuple[Any, ...]:
+        """Cheap version of the database in use (empty when closed).
+
+        Changes whenever the writer commits, or another database is opened or
+        put in use; writes that bypass the writer are not reflected.
+        """
+        writer = self._writer
+        if self._root is None or writer is None:
+            return ()
+        return (self.active_path, self._generation, writer.commits)
+
+    def add_listener(self, listener: ConnectionListener) -> None:
+        """Register a lifecycle callback ``listener(state, db_path)``."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ConnectionListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def open(
+        self,
+        db_path: str,
+        initialize: Optional[Callable[[duckdb.DuckDBPyConnection], None]] = None,
+        prepare_write: Optional[Callable[[duckdb.DuckDBPyConnection], None]] = None,
+    ) -> None:
+        """Open a database file, closing the current one first.
+
+        Args:
+            db_path: Database file to open (created if missing)
+            initialize: Called with the new connection before the writer starts (e.g. schema setup)
+            prepare_write: Run by the writer before its first write (see ``DuckDBWriter``)
+        """
+        with self._lock:
+            if self._root is not None:
+                self.close()
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            root = duckdb.connect(db_path)
+            try:
+                if initialize:
+                    initialize(root)
+                home = root.execute("SELECT current_database()").fetchall()[0][0]
+                writer = DuckDBWriter(root, prepare=prepare_write)
+                writer.start()
+            except Exception:
+                root.close()
+                raise
+            self._root = root
+            self._writer = writer
+            self.db_path = db_path
+            self._home = home
+            self._catalog = self._catalog_path = None
+            self._generation += 1
+        logger.info(f"Database opened: {db_path}")
+        self._notify("opened")
+
+    def close(self) -> None:
+        """Commit queued writes, then close the writer, all cursors and the database."""
+        with self._lock:
+            if self._root is None:
+                return
+            self._notify("closing")
+            if self._writer is not None:
+                self._writer.stop()
+                self._writer = None
+            for cursor in self._cursors:
+                try:
+                    cursor.close()
+                except duckdb.Error:
+                    pass
+            self._cursors.clear()
+            self._root.close()
+            self._root = None
+            self._catalog = self._catalog_path = None
+            self._generation += 1
+        logger.info(f"Database closed: {self.db_path}")
+        self._notify("closed")
+
+    def cursor(self) -> Optional[duckdb.DuckDBPyConnection]:
+        """Read cursor of the calling thread (None when no database is open).
+
+        Cursors share the database instance, so each thread reads
+        concurrently and sees everything the writer has committed.
+        """
+        local = self._local
+        if getattr(local, "generation", None) == self._generation and local.cursor is not None:
+            if local.catalog != self._catalog:
+                self._use_in(local.cursor)
+                local.catalog = self._catalog
+            return local.cursor
+        with self._lock:
+            if self._root is None:
+                return None
+            cursor = self._root.cursor()
+            self._cursors.append(cursor)
+            if self._catalog is not None:
+                self._use_in(cursor)
+            local.cursor = cursor
+            local.generation = self._generation
+            local.catalog = self._catalog
+        return cursor
+
+    def open_cursor(self) -> duckdb.DuckDBPyConnection:
+        """New cursor owned by the caller, e.g. for a long-running read transaction.
+
+        It is closed with the database if the caller has not closed it by then.
+        """
+        with self._lock:
+            if self._root is None:
+                raise RuntimeError("No database is open")
+            cursor = self._root.cursor()
+            self._cursors.append(cursor)
+            if self._catalog is not None:
+                self._use_in(cursor)
+        return cursor
+
+    def _use_in(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        cursor.execute(f'USE "{self._catalog or self._home}"')
+
+    def attach(
+        self,
+        path: str,
+        catalog: str,
+        read_only: bool = False,
+        initialize: Optional[Callable[[duckdb.DuckDBPyConnection], None]] = None,
+    ) -> None:
+        """Attach another database file to the open instance as ``catalog``.
+
+        Args:
+            path: Database file (created if missing, unless read-only)
+            catalog: Name to attach it under
+            read_only: Attach without write access
+            initialize: Called with a cursor using the attached database (e.g. schema setup)
+        """
+        with self._lock:
+            if self._root is None:
+                raise RuntimeError("No database is open")
+            if not read_only:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            escaped = Path(path).as_posix().replace("'", "''")
+            self._root.execute(f"ATTACH '{escaped}' AS \"{catalog}\"{' (READ_ONLY)' if read_only else ''}")
+            try:
+                if initialize:
+                    cursor = self._root.cursor()
+                    try:
+                        cursor.execute(f'USE "{catalog}"')
+                        initialize(cursor)
+                    finally:
+                        cursor.close()
+            except Exception:
+                self._root.execute(f'DETACH "{catalog}"')
+                raise
+        logger.info(f"Database attached as {catalog}: {path}")
+
+    def detach(self, catalog: str) -> None:
+        """Detach a database attached with ``attach`` (not the one in use)."""
+        with self._lock:
+            if self._root is None:
+                return
+            if catalog == self._catalog:
+                raise ValueError(f"Database {catalog} is in use; switch to another one first")
+            self._root.execute(f'DETACH "{catalog}"')
+        logger.info(f"Database detached: {catalog}")
+
+    def use(self, catalog: Optional[str], path: Optional[str] = None) -> None:
+        """Make an attached database the one cursors and the writer use.
+
+        Writes queued before the switch still go to the previous database.
+        Each thread's cursor switches on its next ``cursor()`` call.
+
+        Args:
+            catalog: Attached database, or None for the opened file
+            path: File of ``catalog`` (reported to listeners)
+        """
+        with self._lock:
+            if self._root is None:
+                raise RuntimeError("No database is open")
+            if catalog == self._catalog:
+                return
+            if self._writer is not None:
+                self._writer.use(catalog).result()
+            self._catalog = catalog
+            self._catalog_path = path if catalog is not None else None
+        logger.info(f"Database in use: {self.active_path}")
+        self._notify("opened")
+
+    def execute(self, query: str, parameters: Any = None) -> duckdb.DuckDBPyConnection:
+        """Run a read query on the calling thread's cursor."""
+        cursor = self.cursor()
+        if cursor is None:
+            raise RuntimeError("No database is open")
+        return cursor.execute(query, parameters)
+
+    async def read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(cursor, *args)`` on a worker thread with that thread's cursor.
+
+        Lets reads proceed in parallel with each other and with the writer
+        without blocking the event loop.
+        """
+        return await asyncio.to_thread(lambda: fn(self.cursor(), *args))
+
+    async def iterate(self, iterable: Iterable[Any]) -> AsyncIterator[Any]:
+        """Advance a (blocking) reader generator on worker threads.
+
+        Each step, e.g. fetching the next page of a keyset-paginated reader,
+        runs off the event loop; only one item is held at a time.
+        """
+        iterator = iter(iterable)
+        done = object()
+        while True:
+            item = await asyncio.to_thread(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def _notify(self, state: str) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(state, self.active_path)
+            except Exception as e:
+                logger.error(f"Database {state} listener failed: {e}")
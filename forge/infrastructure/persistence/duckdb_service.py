@@ -2,17 +2,30 @@
 
 Stores entities and relationships for analytics and queries.
 
-All autosave and event handlers use forge_data.duckdb (self.conn) for both writing and reading.
+All autosave and event handlers use forge_data.duckdb through a
+``DuckDBConnectionManager`` (self.db): reads go through the calling thread's
+cursor (self.conn), writes are queued to its ``DuckDBWriter`` that
+group-commits them on its own thread.
 """
 
 import asyncio
-import json
 import logging
 import duckdb
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import Future
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 from forge.core.event_bus import EventBus, EventPayload
 from forge.core import events
+from forge.domain.graph.snapshot import clear_snapshot_cache
+from forge.infrastructure.persistence import (
+    backup, bundle, columnar, embedding_store, entity_aliases, graph_stats, migrations, pagination, profile_store, search_index,
+)
+from forge.infrastructure.persistence.artifact_store import STORE_FILE_NAME, UIArtifactStore
+from forge.infrastructure.persistence.connection_manager import DuckDBConnectionManager
+from forge.infrastructure.persistence.workspace import ProjectWorkspace
+from forge.infrastructure.persistence.writer import DuckDBWriter
 
 logger = logging.getLogger(__name__)
 
@@ -32,17 +45,34 @@ class DuckDBPersistenceService:
             self.db_path = str(db_dir / "forge_data.duckdb")
         else:
             self.db_path = db_path
-        self.conn: Optional[duckdb.DuckDBPyConnection] = None
+        # Directory of the open project bundle (None for plain .duckdb files)
+        self.bundle_dir: Optional[Path] = None
+        # Online migrations left for the writer by the last schema upgrade
+        self._online_migrations: List[migrations.Migration] = []
+        # Pending search index / graph statistics compaction (see _compact_if_due)
+        self._compaction: Optional[Future] = None
+        # Shared by every service reading the database (see main.init_services)
+        self.db = DuckDBConnectionManager()
+        self.db.add_listener(self._on_connection_event)
+        # Further projects attached to the same instance (see workspace)
+        self.workspace = ProjectWorkspace(self.db)
+        # UI artifacts live in a capped file of their own, next to the first
+        # database and shared by every project opened later (see artifact_store)
+        self.ui_artifacts = UIArtifactStore(str(Path(self.db_path).parent / STORE_FILE_NAME))
+    
+    @property
+    def conn(self) -> Optional[duckdb.DuckDBPyConnection]:
+        """Read cursor of the calling thread (None when no database is open)."""
+        return self.db.cursor()
+    
+    @property
+    def writer(self) -> Optional[DuckDBWriter]:
+        return self.db.writer
     
     async def start(self):
         """Initialize main database and subscribe to autosave events."""
-        # Ensure directory exists
-        db_path_obj = Path(self.db_path)
-        db_path_obj.parent.mkdir(parents=True, exist_ok=True)
         # Initialize main database connection (manual save/load and autosave)
-        self.conn = duckdb.connect(self.db_path)
-        self._create_schema()
-        logger = __import__("logging").getLogger(__name__)
+        self.connect()
         logger.info(f"Database initialized: {self.db_path}")
         # Subscribe to graph updates - AUTO-SAVE to main database
         await self.event_bus.subscribe(
@@ -64,183 +94,174 @@ class DuckDBPersistenceService:
             events.TOPIC_NARRATIVE_GENERATED,
             self.handle_narrative_generated
         )
+        # Subscribe to embedding events - AUTO-SAVE vectors so restore can reuse them
+        await self.event_bus.subscribe(
+            events.TOPIC_ENTITY_EMBEDDED,
+            self.handle_entity_embedded
+        )
+        await self.event_bus.subscribe(
+            events.TOPIC_RELATIONSHIP_EMBEDDED,
+            self.handle_relationship_embedded
+        )
+    
+    def connect(self, db_path: Optional[str] = None) -> None:
+        """Open the database (switching to ``db_path`` if given) and start its writer.
+        
+        Without ``db_path`` the current database is reopened, including the
+        working database of an open project bundle.
+        """
+        if db_path is not None:
+            self.db_path = db_path
+            self.bundle_dir = None
+        if self.bundle_dir is None:
+            self.db.open(self.db_path, initialize=self._create_schema_in)
+        else:
+            directory = self.bundle_dir
+            manifest = bundle.read_manifest(directory)
+            self.db.open(
+                self.db_path,
+                initialize=lambda conn: bundle.open_views(conn, directory, manifest, self._create_schema_in),
+                prepare_write=lambda conn: bundle.materialize(conn, directory),
+            )
+        self._start_online_migrations()
+    
+    def open_bundle(self, directory: str) -> None:
+        """Open a project bundle lazily through its working database (see ``bundle``).
+        
+        Raises:
+            ValueError: If ``directory`` is not a readable project bundle
+        """
+        bundle_dir = Path(directory).resolve()
+        bundle.read_manifest(bundle_dir)
+        self.bundle_dir = bundle_dir
+        self.db_path = str(bundle_dir / bundle.WORKING_DB_NAME)
+        self.connect()
+    
+    def _on_connection_event(self, state: str, db_path: str) -> None:
+        """Drop state tied to the previous database and announce the change."""
+        if state != "closing":
+            clear_snapshot_cache()
+        if state == "opened":
+            self._complete_pending_merges()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self.event_bus.publish(
+            events.TOPIC_DATABASE_CONNECTION,
+            events.create_database_connection_event(state, db_path),
+        ))
     
     def _create_schema(self):
         """Create tables for entities and relationships in main database."""
         self._create_schema_in(self.conn)
     
     def _create_schema_in(self, conn: Optional[duckdb.DuckDBPyConnection]):
-        """Create tables for entities and relationships in the specified connection."""
+        """Create or upgrade the schema in the specified connection (see ``migrations``).
+        
+        Online migrations are left to the writer (``_start_online_migrations``).
+        """
         if not conn:
             return
+        self._online_migrations = migrations.migrate(conn, defer_online=True)
+    
+    def _start_online_migrations(self) -> None:
+        """Apply deferred online migrations on the writer while the database is in use."""
+        pending, self._online_migrations = self._online_migrations, []
+        if not pending or not self.writer:
+            return
         
-        # Create sequence for relationship IDs first
-        conn.execute("""
-            CREATE SEQUENCE IF NOT EXISTS rel_seq START 1
-        """)
-        
-        # Entities table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS entities (
-                id VARCHAR PRIMARY KEY,
-                type VARCHAR NOT NULL,
-                label VARCHAR NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Relationships table
-        # Note: DuckDB doesn't support ON DELETE CASCADE in FOREIGN KEY constraints
-        # The deduplication service manually updates relationships before deleting entities
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS relationships (
-                id INTEGER PRIMARY KEY DEFAULT nextval('rel_seq'),
-                source VARCHAR NOT NULL,
-                target VARCHAR NOT NULL,
-                type VARCHAR NOT NULL,
-                confidence DOUBLE NOT NULL,
-                doc_id VARCHAR,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (source) REFERENCES entities(id),
-                FOREIGN KEY (target) REFERENCES entities(id)
-            )
-        """)
-        
-        # Create indexes for performance
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(type)
-        """)
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source)
-        """)
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target)
-        """)
-        
-        # UI Artifacts table for storing workspace schemas
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS ui_artifacts (
-                id VARCHAR PRIMARY KEY,
-                schema TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        def done(future) -> None:
+            if future.exception() is not None:
+                logger.error(f"Online schema migration failed: {future.exception()}")
         
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_ui_artifacts_created ON ui_artifacts(created_at)
-        """)
+        self.writer.submit(lambda conn: migrations.apply_migrations(conn, pending), isolated=True).add_done_callback(done)
+    
+    def _complete_pending_merges(self) -> None:
+        """Queue recorded merges whose merged entities still exist (see ``entity_aliases``).
         
-        # Semantic Profiles table for storing entity profiles
-        # Note: DuckDB doesn't support ON DELETE CASCADE in FOREIGN KEY constraints
-        # The deduplication service should manually delete profiles when entities are deleted/merged
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS semantic_profiles (
-                entity_id VARCHAR PRIMARY KEY,
-                summary TEXT NOT NULL,
-                key_attributes TEXT,
-                related_entities TEXT,
-                significance_score DOUBLE,
-                profile_json TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (entity_id) REFERENCES entities(id)
-            )
-        """)
+        A merge batch commits in two transactions; this finishes batches that
+        were interrupted between them when the database is opened again.
+        """
+        if not self.writer:
+            return
+        try:
+            active = self.workspace.active
+            if active is not None and active.read_only:
+                return
+            pending = entity_aliases.pending_merges(self.conn)
+        except Exception as e:
+            logger.debug(f"Could not check for pending merges: {e}")
+            return
+        if not pending:
+            return
+        logger.info(f"Completing {len(pending)} recorded entity merges")
         
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_profiles_significance ON semantic_profiles(significance_score)
-        """)
+        def done(future) -> None:
+            if future.exception() is not None:
+                logger.error(f"Completing recorded entity merges failed: {future.exception()}")
         
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_profiles_entity ON semantic_profiles(entity_id)
-        """)
+        self.writer.submit(lambda conn: entity_aliases.merge_entities(conn, pending), isolated=True).add_done_callback(done)
+    
+    def _compact_if_due(self) -> None:
+        """Queue a compaction of the search index and/or graph statistics on the writer.
+        
+        Both append deltas on every write (see ``search_index`` and
+        ``graph_stats``). Compaction rewrites their tables, so it runs as an
+        isolated command and at most one is queued at a time.
+        """
+        if not self.writer or (self._compaction is not None and not self._compaction.done()):
+            return
+        try:
+            due = [
+                module for module in (search_index, graph_stats)
+                if module.compaction_due(self.db)
+            ]
+        except Exception as e:
+            logger.debug(f"Could not check for pending compactions: {e}")
+            return
+        if not due:
+            return
         
-        # Narratives table for storing document narratives
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS narratives (
-                doc_id VARCHAR PRIMARY KEY,
-                narrative TEXT NOT NULL,
-                entity_count INTEGER,
-                relationship_count INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        def compact(conn: duckdb.DuckDBPyConnection) -> None:
+            for module in due:
+                module.compact(conn, transactional=True)
         
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_narratives_created ON narratives(created_at)
-        """)
+        def done(future) -> None:
+            if future.exception() is not None:
+                logger.error(f"Compaction failed: {future.exception()}")
         
-        conn.commit()
-    
+        self._compaction = self.writer.submit(compact, isolated=True)
+        self._compaction.add_done_callback(done)
+
     async def handle_graph_updated(self, payload: EventPayload):
-        """Persist graph updates to main database (auto-save during extraction)."""
+        """Persist graph updates to main database (auto-save during extraction).
+        
+        The payload's ``graph_stats`` carries only the nodes and edges added or
+        changed by the update (see ``GraphAnalysisService``), so the work here
+        scales with the delta rather than with the size of the graph.
+        """
         if not self.conn:
             return
         
-        # Skip persistence if graph_stats is empty (e.g., during session restore)
-        graph_stats = payload.get("graph_stats", {})
-        if not graph_stats:
+        # Skip persistence if the delta is empty (e.g., during session restore)
+        delta = payload.get("graph_stats", {})
+        if not delta:
             return
         
-        nodes = graph_stats.get("nodes", [])
-        edges = graph_stats.get("edges", [])
+        nodes = delta.get("nodes", [])
+        edges = delta.get("edges", [])
         
-        # Only persist if there are actual nodes/edges to save
+        # Only persist if the delta has actual nodes/edges to save
         if not nodes and not edges:
             return
         
-        # Upsert entities (insert if new, update if exists)
-        for node in nodes:
-            node_id = node.get("id")
-            node_type = node.get("type")
-            label = node.get("label")
-            if node_id and node_type and label:
-                # Check if entity already exists
-                result = self.conn.execute(
-                    "SELECT id FROM entities WHERE id = ?",
-                    (node_id,)
-                ).fetchone()
-                if result:
-                    # Entity exists, update it (only if values changed to avoid unnecessary updates)
-                    try:
-                        self.conn.execute("""
-                            UPDATE entities
-                            SET type = ?, label = ?, updated_at = CURRENT_TIMESTAMP
-                            WHERE id = ? AND (type != ? OR label != ?)
-                        """, (node_type, label, node_id, node_type, label))
-                    except Exception as e:
-                        # Log constraint violations but don't fail - entity already exists
-                        logger.debug(f"Could not update entity {node_id}: {e}")
-                else:
-                    # Entity doesn't exist, insert it
-                    self.conn.execute("""
-                        INSERT INTO entities (id, type, label)
-                        VALUES (?, ?, ?)
-                    """, (node_id, node_type, label))
-        
-        # Insert relationships (use INSERT OR IGNORE to avoid duplicates)
-        for edge in edges:
-            source = edge.get("source")
-            target = edge.get("target")
-            rel_type = edge.get("type")
-            confidence = edge.get("confidence", 1.0)
-            doc_id = edge.get("doc_id")
-            if source and target and rel_type:
-                # Check if relationship already exists to avoid duplicates
-                existing = self.conn.execute("""
-                    SELECT id FROM relationships 
-                    WHERE source = ? AND target = ? AND type = ? AND doc_id = ?
-                """, (source, target, rel_type, doc_id)).fetchone()
-                
-                if not existing:
-                    self.conn.execute("""
-                        INSERT INTO relationships (source, target, type, confidence, doc_id)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (source, target, rel_type, confidence, doc_id))
-        
-        self.conn.commit()
+        try:
+            await self.writer.execute(lambda conn: self._upsert_graph_delta(conn, nodes, edges))
+        except Exception as e:
+            logger.error(f"Error persisting graph update: {e}")
+            return
+        self._compact_if_due()
         
         # Emit AG-UI event with persistence confirmation
         entity_count = self.get_entity_count()
@@ -254,72 +275,214 @@ class DuckDBPersistenceService:
             )
         )
     
+    def _upsert_graph_delta(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+    ) -> None:
+        """Apply a batch of nodes and edges with set-based statements (writer command).
+        
+        The batch is staged as Arrow tables. New entities and relationships are
+        inserted with ``INSERT ... ON CONFLICT DO NOTHING`` against the entity
+        primary key and the relationship natural key; changed entity
+        types/labels are then applied with ``UPDATE ... FROM``. Ids of merged
+        entities are resolved through ``entity_aliases``: their relationships
+        land on the entity they were merged into, whose type and label they do
+        not change. Runs inside the writer's transaction.
+        """
+        entity_rows = [
+            (node.get("id"), node.get("type"), node.get("label"))
+            for node in nodes
+            if node.get("id") and node.get("type") and node.get("label")
+        ]
+        edge_rows = [
+            (edge.get("source"), edge.get("target"), edge.get("type"),
+             edge.get("confidence", 1.0), edge.get("doc_id"))
+            for edge in edges
+            if edge.get("source") and edge.get("target") and edge.get("type")
+        ]
+        if not entity_rows and not edge_rows:
+            return
+        
+        staged = []
+        if entity_rows:
+            ids, types, labels = zip(*entity_rows)
+            # Last occurrence of an id in the batch wins
+            conn.register("staged_entities_raw", pa.table({
+                "id": pa.array(ids, pa.string()),
+                "type": pa.array(types, pa.string()),
+                "label": pa.array(labels, pa.string()),
+                "ord": pa.array(range(len(ids)), pa.int64()),
+            }))
+            staged.append("staged_entities_raw")
+        if edge_rows:
+            sources, targets, rel_types, confidences, doc_ids = zip(*edge_rows)
+            conn.register("staged_relationships", pa.table({
+                "source": pa.array(sources, pa.string()),
+                "target": pa.array(targets, pa.string()),
+                "type": pa.array(rel_types, pa.string()),
+                "confidence": pa.array(confidences, pa.float64()),
+                "doc_id": pa.array(doc_ids, pa.string()),
+                "ord": pa.array(range(len(sources)), pa.int64()),
+            }))
+            staged.append("staged_relationships")
+        
+        try:
+            if entity_rows:
+                conn.execute("""
+                    CREATE OR REPLACE TEMP TABLE staged_entities AS
+                    SELECT DISTINCT ON (id) id, type, label, aliased
+                    FROM (
+                        SELECT coalesce(a.canonical_id, r.id) AS id, r.type, r.label,
+                               a.alias_id IS NOT NULL AS aliased, r.ord
+                        FROM staged_entities_raw r
+                        LEFT JOIN entity_aliases a ON a.alias_id = r.id
+                    )
+                    ORDER BY id, aliased, ord DESC
+                """)
+                self._update_changed_entities(conn)
+                inserted = columnar.fetch_table(conn.execute("""
+                    INSERT INTO entities (id, type, label)
+                    SELECT id, type, label FROM staged_entities
+                    ON CONFLICT (id) DO NOTHING
+                    RETURNING id, type
+                """))
+                self._record_inserted(conn, inserted, graph_stats.record_entities)
+                staged_ids = [row[0] for row in conn.execute("SELECT id FROM staged_entities").fetchall()]
+                search_index.sync_documents(conn, search_index.KIND_ENTITY, staged_ids)
+            if edge_rows:
+                # First occurrence in the batch wins and existing relationships are
+                # kept; edges whose endpoints were never persisted are skipped
+                # (key joins probe the entities primary key per staged edge)
+                inserted = conn.execute("""
+                    INSERT INTO relationships (source, target, type, confidence, doc_id)
+                    SELECT DISTINCT ON (s.source, s.target, s.type, s.doc_id)
+                        s.source, s.target, s.type, s.confidence, s.doc_id
+                    FROM (
+                        SELECT coalesce(sa.canonical_id, r.source) AS source,
+                               coalesce(ta.canonical_id, r.target) AS target,
+                               r.type, r.confidence, r.doc_id, r.ord
+                        FROM staged_relationships r
+                        LEFT JOIN entity_aliases sa ON sa.alias_id = r.source
+                        LEFT JOIN entity_aliases ta ON ta.alias_id = r.target
+                    ) s
+                    JOIN entities es ON es.id = s.source
+                    JOIN entities et ON et.id = s.target
+                    ORDER BY s.source, s.target, s.type, s.doc_id, s.ord
+                    ON CONFLICT (source, target, type, doc_id) DO NOTHING
+                    RETURNING source, target, doc_id
+                """)
+                self._record_inserted(conn, columnar.fetch_table(inserted), graph_stats.record_relationships)
+            graph_stats.compact_counters(conn)
+        finally:
+            for name in staged:
+                conn.unregister(name)
+    
+    @staticmethod
+    def _record_inserted(conn: duckdb.DuckDBPyConnection, rows: pa.Table, record) -> None:
+        """Count rows returned by an INSERT in the graph statistics (see ``graph_stats``)."""
+        if not rows.num_rows:
+            return
+        conn.register("inserted_graph_rows", rows)
+        try:
+            record(conn, "inserted_graph_rows")
+        finally:
+            conn.unregister("inserted_graph_rows")
+    
+    @staticmethod
+    def _update_changed_entities(conn: duckdb.DuckDBPyConnection) -> List[Tuple[str, str, str]]:
+        """Apply type/label changes from ``staged_entities`` to existing entities.
+        
+        DuckDB rejects updates of indexed columns (``type``) on rows referenced
+        by a foreign key, and a rejected statement would abort the writer's
+        whole batch; types are therefore only changed on unreferenced entities
+        while labels are always updated. Only the staged entities whose type
+        differs are looked up in the relationship indexes, so the cost scales
+        with the batch. Type changes are moved between the per-type counts of
+        ``graph_stats``.
+        
+        Returns:
+            ``(id, old_type, new_type)`` of the type changes that were skipped
+            because the entity is referenced by relationships
+        """
+        conn.execute("""
+            UPDATE entities SET
+                label = s.label,
+                updated_at = CURRENT_TIMESTAMP
+            FROM staged_entities s
+            WHERE entities.id = s.id
+              AND NOT s.aliased
+              AND entities.label != s.label
+        """)
+        candidates = conn.execute("""
+            SELECT e.id, e.type AS old_type, s.type
+            FROM entities e
+            JOIN staged_entities s ON s.id = e.id
+            WHERE e.type != s.type
+              AND NOT s.aliased
+        """).fetchall()
+        if not candidates:
+            return []
+        
+        # Point lookups on idx_relationships_source/target for the few retyped ids
+        retypes: List[Tuple[str, str, str]] = []
+        skipped: List[Tuple[str, str, str]] = []
+        for candidate in candidates:
+            referenced = (
+                conn.execute("SELECT 1 FROM relationships WHERE source = ? LIMIT 1", [candidate[0]]).fetchone()
+                or conn.execute("SELECT 1 FROM relationships WHERE target = ? LIMIT 1", [candidate[0]]).fetchone()
+            )
+            (skipped if referenced else retypes).append(candidate)
+        if skipped:
+            logger.warning(
+                f"Kept the type of {len(skipped)} entities referenced by relationships: "
+                + ", ".join(f"{entity_id} ({old} -> {new})" for entity_id, old, new in skipped[:10])
+                + (" ..." if len(skipped) > 10 else "")
+            )
+        if not retypes:
+            return skipped
+        
+        ids, old_types, new_types = zip(*retypes)
+        retyped = pa.table({
+            "id": pa.array(ids, pa.string()),
+            "old_type": pa.array(old_types, pa.string()),
+            "type": pa.array(new_types, pa.string()),
+        })
+        conn.register("retyped_entities", retyped)
+        try:
+            conn.execute("""
+                UPDATE entities SET
+                    type = r.type,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM retyped_entities r
+                WHERE entities.id = r.id
+            """)
+            graph_stats.record_entities(conn, "(SELECT id, old_type AS type FROM retyped_entities)", sign=-1)
+            graph_stats.record_entities(conn, "retyped_entities")
+        finally:
+            conn.unregister("retyped_entities")
+        return skipped
+    
     async def handle_workspace_schema(self, payload: EventPayload):
-        """Persist workspace schema (UI artifact) to main database (auto-save)."""
+        """Persist workspace schema (UI artifact) to the artifact store (auto-save)."""
         schema = payload.get("schema")
-        if not schema or not self.conn:
+        if not schema:
             return
-        # Generate a unique ID for this schema artifact
-        # Use a hash of the schema content or timestamp-based ID
-        import hashlib
-        schema_json = json.dumps(schema, sort_keys=True)
-        artifact_id = hashlib.md5(schema_json.encode()).hexdigest()
-        # Check if this artifact already exists
-        result = self.conn.execute(
-            "SELECT id FROM ui_artifacts WHERE id = ?",
-            (artifact_id,)
-        ).fetchone()
-        if not result:
-            # Insert new artifact to main database
-            self.conn.execute("""
-                INSERT INTO ui_artifacts (id, schema)
-                VALUES (?, ?)
-            """, (artifact_id, schema_json))
-            self.conn.commit()
+        try:
+            await asyncio.to_thread(self.ui_artifacts.add, schema)
+        except Exception as e:
+            logger.error(f"Error persisting UI artifact: {e}")
     
     def store_ui_artifact(self, schema: Dict[str, Any]) -> None:
         """Manually store a UI artifact schema."""
-        if not schema or not self.conn:
+        if not schema:
             return
-        
-        import hashlib
-        schema_json = json.dumps(schema, sort_keys=True)
-        artifact_id = hashlib.md5(schema_json.encode()).hexdigest()
-        
-        # Check if this artifact already exists
-        result = self.conn.execute(
-            "SELECT id FROM ui_artifacts WHERE id = ?",
-            (artifact_id,)
-        ).fetchone()
-        
-        if not result:
-            self.conn.execute("""
-                INSERT INTO ui_artifacts (id, schema)
-                VALUES (?, ?)
-            """, (artifact_id, schema_json))
-            self.conn.commit()
+        self.ui_artifacts.add(schema)
     
     def get_stored_ui_artifacts(self) -> List[Dict[str, Any]]:
-        """Retrieve all stored UI artifacts."""
-        if not self.conn:
-            return []
-        
-        result = self.conn.execute("""
-            SELECT id, schema, created_at
-            FROM ui_artifacts
-            ORDER BY created_at ASC
-        """).fetchall()
-        
-        artifacts = []
-        for row in result:
-            try:
-                schema_dict = json.loads(row[1])
-                artifacts.append(schema_dict)
-            except json.JSONDecodeError:
-                # Skip malformed JSON
-                continue
-        
-        return artifacts
+        """Retrieve the stored UI artifacts that are not evicted yet, oldest first."""
+        return self.ui_artifacts.recent()
     
     async def handle_semantic_profile(self, payload: EventPayload):
         """Persist semantic profile to main database (auto-save)."""
@@ -332,49 +495,16 @@ class DuckDBPersistenceService:
         if not entity_id or not profile:
             return
         
+        def upsert(conn: duckdb.DuckDBPyConnection) -> None:
+            profile_store.upsert_profile(conn, entity_id, profile)
+            search_index.sync_documents(conn, search_index.KIND_PROFILE, [entity_id])
+        
         try:
-            # Serialize profile to JSON
-            profile_json = json.dumps(profile, sort_keys=True)
-            
-            # Extract key fields from profile for structured storage
-            summary = profile.get("summary", "")
-            key_attributes = json.dumps(profile.get("key_attributes", []))
-            related_entities = json.dumps(profile.get("related_entities", []))
-            significance_score = profile.get("significance_score", 0.0)
-            
-            # Upsert profile (insert if new, update if exists)
-            # Check if profile exists
-            existing = self.conn.execute(
-                "SELECT entity_id FROM semantic_profiles WHERE entity_id = ?",
-                (entity_id,)
-            ).fetchone()
-            
-            if existing:
-                # Update existing profile
-                self.conn.execute("""
-                    UPDATE semantic_profiles SET
-                        summary = ?,
-                        key_attributes = ?,
-                        related_entities = ?,
-                        significance_score = ?,
-                        profile_json = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE entity_id = ?
-                """, (summary, key_attributes, related_entities, significance_score, profile_json, entity_id))
-            else:
-                # Insert new profile
-                self.conn.execute("""
-                    INSERT INTO semantic_profiles 
-                        (entity_id, summary, key_attributes, related_entities, significance_score, profile_json)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (entity_id, summary, key_attributes, related_entities, significance_score, profile_json))
-            
-            self.conn.commit()
-            
+            await self.writer.execute(upsert)
         except Exception as e:
             logger.error(f"Error persisting semantic profile for {entity_id}: {e}")
-            if self.conn:
-                self.conn.rollback()
+            return
+        self._compact_if_due()
     
     async def handle_narrative_generated(self, payload: EventPayload):
         """Persist narrative to main database (auto-save)."""
@@ -389,38 +519,87 @@ class DuckDBPersistenceService:
         if not doc_id or not narrative:
             return
         
+        def upsert(conn: duckdb.DuckDBPyConnection) -> None:
+            conn.execute("""
+                INSERT INTO narratives 
+                    (doc_id, narrative, entity_count, relationship_count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (doc_id) DO UPDATE SET
+                    narrative = excluded.narrative,
+                    entity_count = excluded.entity_count,
+                    relationship_count = excluded.relationship_count,
+                    updated_at = now()
+            """, (doc_id, narrative, entity_count, relationship_count))
+            search_index.sync_documents(conn, search_index.KIND_NARRATIVE, [doc_id])
+        
         try:
-            # Upsert narrative (insert if new, update if exists)
-            # Check if narrative exists
-            existing = self.conn.execute(
-                "SELECT doc_id FROM narratives WHERE doc_id = ?",
-                (doc_id,)
-            ).fetchone()
-            
-            if existing:
-                # Update existing narrative
-                self.conn.execute("""
-                    UPDATE narratives SET
-                        narrative = ?,
-                        entity_count = ?,
-                        relationship_count = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE doc_id = ?
-                """, (narrative, entity_count, relationship_count, doc_id))
-            else:
-                # Insert new narrative
-                self.conn.execute("""
-                    INSERT INTO narratives 
-                        (doc_id, narrative, entity_count, relationship_count)
-                    VALUES (?, ?, ?, ?)
-                """, (doc_id, narrative, entity_count, relationship_count))
-            
-            self.conn.commit()
-            
+            await self.writer.execute(upsert)
         except Exception as e:
             logger.error(f"Error persisting narrative for {doc_id}: {e}")
-            if self.conn:
-                self.conn.rollback()
+            return
+        self._compact_if_due()
+    
+    async def handle_entity_embedded(self, payload: EventPayload):
+        """Persist an entity embedding (auto-save)."""
+        await self._persist_embedding(embedding_store.KIND_ENTITY, payload)
+    
+    async def handle_relationship_embedded(self, payload: EventPayload):
+        """Persist a relationship embedding (auto-save)."""
+        await self._persist_embedding(embedding_store.KIND_RELATIONSHIP, payload)
+    
+    async def _persist_embedding(self, kind: str, payload: EventPayload):
+        # Restored vectors were either loaded from or already stored by the restore
+        if not self.conn or payload.get("restored"):
+            return
+        text = payload.get("text")
+        embedding = payload.get("embedding")
+        model = payload.get("model")
+        if not text or not embedding or not model:
+            return
+        try:
+            await self.store_embeddings(kind, [text], [embedding], model, payload.get("model_version", ""))
+        except Exception as e:
+            logger.warning(f"Could not persist {kind} embedding: {e}")
+    
+    async def store_embeddings(
+        self,
+        kind: str,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        model: str,
+        model_version: str,
+    ) -> None:
+        """Store embeddings (see ``embedding_store.store_embeddings``) and await the commit."""
+        await self.writer.execute(
+            lambda conn: embedding_store.store_embeddings(conn, kind, texts, vectors, model, model_version)
+        )
+    
+    async def prune_embeddings(self) -> int:
+        """Delete stored embeddings of texts that no longer exist in the graph."""
+        row = await self.writer.execute(embedding_store.prune_embeddings)
+        return row[0] if row else 0
+    
+    def iter_entity_embedding_pages(
+        self,
+        model: str,
+        model_version: str,
+        batch_size: int = pagination.READ_BATCH_SIZE,
+    ) -> Iterator[pa.Table]:
+        """Stream entity pages joined with their stored embeddings (see ``embedding_store``)."""
+        if not self.db:
+            return iter(())
+        return embedding_store.iter_entity_embedding_pages(self.db, model, model_version, batch_size)
+    
+    def iter_relationship_embedding_pages(
+        self,
+        model: str,
+        model_version: str,
+        batch_size: int = pagination.READ_BATCH_SIZE,
+    ) -> Iterator[pa.Table]:
+        """Stream relationship pages joined with their stored embeddings (see ``embedding_store``)."""
+        if not self.db:
+            return iter(())
+        return embedding_store.iter_relationship_embedding_pages(self.db, model, model_version, batch_size)
     
     def get_semantic_profile(self, entity_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a semantic profile for an entity."""
@@ -428,43 +607,32 @@ class DuckDBPersistenceService:
             return None
         
         try:
-            result = self.conn.execute("""
-                SELECT profile_json
-                FROM semantic_profiles
-                WHERE entity_id = ?
-            """, (entity_id,)).fetchone()
-            
-            if result:
-                return json.loads(result[0])
+            return profile_store.get_profile(self.db, entity_id)
         except Exception as e:
             logger.error(f"Error retrieving semantic profile for {entity_id}: {e}")
         
         return None
     
-    def get_all_semantic_profiles(self) -> List[Dict[str, Any]]:
-        """Retrieve all semantic profiles."""
+    def get_all_semantic_profiles(
+        self,
+        entity_types: Optional[Sequence[str]] = None,
+        min_importance: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve semantic profiles, most important first (see ``profile_store.query_profiles``).
+        
+        E.g. ``get_all_semantic_profiles(["PERSON"], limit=10)`` for the ten
+        most important people; filtering and sorting run in SQL.
+        """
         if not self.conn:
             return []
         
-        profiles = []
         try:
-            results = self.conn.execute("""
-                SELECT entity_id, profile_json
-                FROM semantic_profiles
-                ORDER BY significance_score DESC
-            """).fetchall()
-            
-            for row in results:
-                try:
-                    profile = json.loads(row[1])
-                    profile["entity_id"] = row[0]  # Add entity_id to profile
-                    profiles.append(profile)
-                except json.JSONDecodeError:
-                    continue
+            return profile_store.query_profiles(self.db, entity_types, min_importance, limit)
         except Exception as e:
             logger.error(f"Error retrieving semantic profiles: {e}")
         
-        return profiles
+        return []
     
     def get_narrative(self, doc_id: str) -> Optional[str]:
         """Retrieve a narrative for a document."""
@@ -511,19 +679,125 @@ class DuckDBPersistenceService:
         
         return narratives
     
+    def search(
+        self,
+        query: str,
+        kinds: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> search_index.SearchPage:
+        """Full-text search over entity labels, profile summaries and narratives.
+        
+        Hits are ranked by BM25 (see ``search_index``); request the next page
+        with ``offset + limit``.
+        
+        Args:
+            query: Free text
+            kinds: Any of ``search_index.KIND_ENTITY``, ``KIND_PROFILE``, ``KIND_NARRATIVE`` (default: all)
+            limit: Hits per page
+            offset: Hits to skip
+        """
+        if not self.conn:
+            return search_index.SearchPage(hits=[], total=0, offset=offset)
+        
+        try:
+            return search_index.search(self.db, query, kinds, limit, offset)
+        except Exception as e:
+            logger.error(f"Error searching for {query!r}: {e}")
+        
+        return search_index.SearchPage(hits=[], total=0, offset=offset)
+    
+    def get_graph_stats(self) -> graph_stats.GraphStats:
+        """Entity/relationship totals and entities per type, without scanning the graph.
+        
+        The counters are maintained by the write paths (see ``graph_stats``).
+        """
+        if not self.conn:
+            return graph_stats.GraphStats()
+        
+        try:
+            return graph_stats.get_graph_stats(self.conn)
+        except Exception as e:
+            logger.error(f"Error reading graph statistics: {e}")
+        
+        return graph_stats.GraphStats()
+    
     def get_entity_count(self) -> int:
         """Get total number of entities in the database."""
-        if not self.conn:
-            return 0
-        result = self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()
-        return result[0] if result else 0
+        return self.get_graph_stats().entities
     
     def get_relationship_count(self) -> int:
         """Get total number of relationships in the database."""
+        return self.get_graph_stats().relationships
+    
+    def entities_table(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        types: Optional[Sequence[str]] = None,
+        ids: Optional[Sequence[str]] = None,
+    ) -> Optional[pa.Table]:
+        """Read entities as an Arrow table (see ``columnar.entities_table``)."""
         if not self.conn:
-            return 0
-        result = self.conn.execute("SELECT COUNT(*) FROM relationships").fetchone()
-        return result[0] if result else 0
+            return None
+        return columnar.entities_table(self.conn, columns=columns, types=types, ids=ids)
+    
+    def relationships_table(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        types: Optional[Sequence[str]] = None,
+        min_confidence: Optional[float] = None,
+        doc_id: Optional[str] = None,
+    ) -> Optional[pa.Table]:
+        """Read relationships as an Arrow table (see ``columnar.relationships_table``)."""
+        if not self.conn:
+            return None
+        return columnar.relationships_table(
+            self.conn, columns=columns, types=types, min_confidence=min_confidence, doc_id=doc_id
+        )
+    
+    def entity_columns(self, columns: Optional[Sequence[str]] = None, **filters: Any) -> Dict[str, np.ndarray]:
+        """Read entity columns as NumPy arrays (empty dict if no database is open)."""
+        table = self.entities_table(columns, **filters)
+        return columnar.table_columns(table) if table is not None else {}
+    
+    def relationship_columns(self, columns: Optional[Sequence[str]] = None, **filters: Any) -> Dict[str, np.ndarray]:
+        """Read relationship columns as NumPy arrays (empty dict if no database is open)."""
+        table = self.relationships_table(columns, **filters)
+        return columnar.table_columns(table) if table is not None else {}
+    
+    def iter_entity_pages(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = pagination.READ_BATCH_SIZE,
+        **filters: Any,
+    ) -> Iterator[pa.Table]:
+        """Stream entities as Arrow pages (keyset-paginated, see ``pagination``)."""
+        if not self.db:
+            return iter(())
+        return pagination.iter_entity_pages(self.db, columns, batch_size=batch_size, **filters)
+    
+    def iter_relationship_pages(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = pagination.READ_BATCH_SIZE,
+        **filters: Any,
+    ) -> Iterator[pa.Table]:
+        """Stream relationships as Arrow pages (keyset-paginated, see ``pagination``)."""
+        if not self.db:
+            return iter(())
+        return pagination.iter_relationship_pages(self.db, columns, batch_size=batch_size, **filters)
+    
+    def iter_semantic_profiles(self, batch_size: int = pagination.READ_BATCH_SIZE) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+        """Stream ``(entity label, profile)`` pairs."""
+        if not self.db:
+            return iter(())
+        return profile_store.iter_semantic_profiles(self.db, batch_size=batch_size)
+    
+    def iter_narratives(self, batch_size: int = pagination.READ_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream stored narratives."""
+        if not self.db:
+            return iter(())
+        return pagination.iter_narratives(self.db, batch_size=batch_size)
     
     def get_all_entities(self) -> List[Dict[str, Any]]:
         """Retrieve all entities."""
@@ -574,45 +848,80 @@ class DuckDBPersistenceService:
         if not self.conn:
             return
         
-        logger = __import__("logging").getLogger(__name__)
-        try:
+        def clear(conn: duckdb.DuckDBPyConnection) -> None:
             # Delete in order to respect foreign key constraints:
             # 1. Delete semantic_profiles first (has foreign key to entities)
-            self.conn.execute("DELETE FROM semantic_profiles")
+            conn.execute("DELETE FROM semantic_profiles")
             # 2. Delete narratives (no foreign keys, but clear it)
-            self.conn.execute("DELETE FROM narratives")
+            conn.execute("DELETE FROM narratives")
             # 3. Delete relationships (has foreign keys to entities)
-            self.conn.execute("DELETE FROM relationships")
+            conn.execute("DELETE FROM relationships")
             # 4. Delete entities (now safe since nothing references them)
-            self.conn.execute("DELETE FROM entities")
-            # 5. Delete UI artifacts (no foreign keys)
-            self.conn.execute("DELETE FROM ui_artifacts")
+            conn.execute("DELETE FROM entities")
+            # 5. Delete stored embeddings (no foreign keys)
+            conn.execute("DELETE FROM embeddings")
+            # 6. Delete the search index
+            search_index.clear_index(conn)
+            # 7. Reset the graph statistics
+            graph_stats.clear_stats(conn)
+            # 8. Forget entity merges
+            entity_aliases.clear_aliases(conn)
             # Note: DuckDB doesn't support ALTER SEQUENCE RESTART yet
             # The sequence will continue from its current value, which is fine
             # for our use case since we're using it for relationship IDs
-            self.conn.commit()
-            
-            # CRITICAL: Force a checkpoint to ensure WAL is flushed to main database file
-            # This prevents the cleared state from being lost if the connection closes unexpectedly
-            try:
-                self.conn.execute("CHECKPOINT")
-                logger.info("Database checkpoint completed after clearing data")
-            except Exception as e:
-                logger.warning(f"Could not checkpoint database after clearing: {e}")
-            
-            logger.info("Database cleared: all entities, relationships, profiles, narratives, and UI artifacts removed")
+        
+        try:
+            # Isolated: each DELETE autocommits, since DuckDB only sees deleted
+            # referencing rows in foreign key checks once they are committed
+            self.writer.submit(clear, isolated=True).result()
         except Exception as e:
             logger.error(f"Error clearing database: {e}")
-            # DuckDB doesn't require explicit rollback for most operations
-            # Only rollback if there's an active transaction
-            try:
-                self.conn.rollback()
-            except Exception:
-                # If rollback fails, just continue - the transaction may not be active
-                pass
+            return
+        self.ui_artifacts.clear()
+        
+        # CRITICAL: Force a checkpoint to ensure WAL is flushed to main database file
+        # This prevents the cleared state from being lost if the connection closes unexpectedly
+        try:
+            self.checkpoint()
+            logger.info("Database checkpoint completed after clearing data")
+        except Exception as e:
+            logger.warning(f"Could not checkpoint database after clearing: {e}")
+        
+        logger.info("Database cleared: all entities, relationships, profiles, narratives, UI artifacts and embeddings removed")
+    
+    def checkpoint(self) -> None:
+        """Commit queued writes and flush the WAL into the database file."""
+        if not self.conn:
+            return
+        self.writer.submit(lambda conn: conn.execute("CHECKPOINT"), isolated=True).result()
+    
+    def snapshot(self, target_path: str) -> Iterator[backup.SnapshotProgress]:
+        """Copy the open database to ``target_path`` while it stays open for writes.
+        
+        Yields the progress of ``backup.snapshot_database``; advance it with
+        ``db.iterate`` to run the copy off the event loop. Writes committed
+        after the snapshot starts are not part of it.
+        
+        Raises:
+            RuntimeError: If no database is open
+        """
+        if self.bundle_dir is not None:
+            # Views of a lazily opened bundle would be copied as views; let the
+            # writer turn them into tables first
+            self.writer.flush()
+        yield from backup.snapshot_database(self.db.open_cursor(), target_path)
+    
+    def export_bundle(self, directory: str) -> Iterator[backup.SnapshotProgress]:
+        """Write the open database as a project bundle (see ``bundle.write_bundle``).
+        
+        Advance the returned generator with ``db.iterate``.
+        
+        Raises:
+            RuntimeError: If no database is open
+        """
+        return bundle.write_bundle(self.db.open_cursor(), directory)
     
     def close(self):
-        """Close database connection."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Commit queued writes, stop the writer and close the database and artifact store."""
+        self.db.close()
+        self.ui_artifacts.close()
@@ -0,0 +1,149 @@
+"""Persisted embeddings for PyScrAI Forge.
+
+Vectors produced by the ``EmbeddingService`` are stored in the ``embeddings``
+sidecar table, keyed by what was embedded (``kind`` and the embedding
+``text``) and the model, and stamped with the model version. A vector is
+therefore reusable exactly as long as its entity/relationship text and the
+model stay the same; restore joins the graph tables against the sidecar,
+bulk-loads the hits and only re-encodes the misses.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+
+from forge.infrastructure.persistence.pagination import READ_BATCH_SIZE, iter_pages
+
+# Must match the vector size of the embedding models and Qdrant collections
+EMBEDDING_DIMENSION = 768
+
+KIND_ENTITY = "entity"
+KIND_RELATIONSHIP = "relationship"
+
+# Embedding texts, as built by EmbeddingService and SessionManager.restore_session
+ENTITY_TEXT_SQL = "e.label || ' (' || e.type || ')'"
+RELATIONSHIP_TEXT_SQL = "r.source || ' ' || r.type || ' ' || r.target"
+
+
+def create_embeddings_table(conn) -> None:
+    """Create the embeddings sidecar table."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS embeddings (
+            kind VARCHAR NOT NULL,
+            text VARCHAR NOT NULL,
+            model VARCHAR NOT NULL,
+            model_version VARCHAR NOT NULL,
+            vector FLOAT[{EMBEDDING_DIMENSION}] NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (kind, text, model)
+        )
+    """)
+
+
+def _cached_join(text_sql: str, kind: str) -> str:
+    return f"""
+        LEFT JOIN embeddings v
+          ON v.kind = '{kind}' AND v.text = {text_sql}
+         AND v.model = ? AND v.model_version = ?
+    """
+
+
+def iter_entity_embedding_pages(
+    conn,
+    model: str,
+    model_version: str,
+    batch_size: int = READ_BATCH_SIZE,
+) -> Iterator[pa.Table]:
+    """Yield entity pages with ``id``, ``label``, ``type``, ``text`` and cached ``vector``.
+
+    ``vector`` is null where no embedding of the current text by this model
+    version is stored.
+    """
+    yield from iter_pages(
+        conn,
+        "entities e",
+        "e.id",
+        f"e.id AS id, e.label AS label, e.type AS type, {ENTITY_TEXT_SQL} AS text, v.vector AS vector",
+        batch_size=batch_size,
+        joins=_cached_join(ENTITY_TEXT_SQL, KIND_ENTITY),
+        join_params=[model, model_version],
+    )
+
+
+def iter_relationship_embedding_pages(
+    conn,
+    model: str,
+    model_version: str,
+    batch_size: int = READ_BATCH_SIZE,
+) -> Iterator[pa.Table]:
+    """Yield relationship pages with ``id``, ``source``, ``target``, ``type``, ``text`` and cached ``vector``."""
+    yield from iter_pages(
+        conn,
+        "relationships r",
+        "r.id",
+        f"r.id AS id, r.source AS source, r.target AS target, r.type AS type, "
+        f"{RELATIONSHIP_TEXT_SQL} AS text, v.vector AS vector",
+        batch_size=batch_size,
+        joins=_cached_join(RELATIONSHIP_TEXT_SQL, KIND_RELATIONSHIP),
+        join_params=[model, model_version],
+    )
+
+
+def page_vectors(page: pa.Table) -> List[Optional[List[float]]]:
+    """Cached vectors of a page as lists (None for rows that need encoding)."""
+    column = page.column("vector").combine_chunks()
+    valid = column.is_valid().to_numpy(zero_copy_only=False)
+    vectors: List[Optional[List[float]]] = [None] * len(column)
+    if valid.any():
+        hits = column.filter(pa.array(valid)).flatten().to_numpy().reshape(-1, EMBEDDING_DIMENSION)
+        for i, vector in zip(np.flatnonzero(valid).tolist(), hits.tolist()):
+            vectors[i] = vector
+    return vectors
+
+
+def store_embeddings(
+    conn,
+    kind: str,
+    texts: Sequence[str],
+    vectors: Sequence[Sequence[float]],
+    model: str,
+    model_version: str,
+) -> None:
+    """Upsert embeddings in one statement (writer command).
+
+    Raises:
+        ValueError: If the vectors do not have ``EMBEDDING_DIMENSION`` components
+    """
+    if not texts:
+        return
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[1] != EMBEDDING_DIMENSION:
+        raise ValueError(f"Expected {EMBEDDING_DIMENSION}-dimensional embeddings, got shape {matrix.shape}")
+    conn.register("staged_embeddings", pa.table({
+        "text": pa.array(texts, pa.string()),
+        "vector": pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), EMBEDDING_DIMENSION),
+    }))
+    try:
+        conn.execute("""
+            INSERT INTO embeddings (kind, text, model, model_version, vector)
+            SELECT DISTINCT ON (text) ?, text, ?, ?, vector
+            FROM staged_embeddings
+            ON CONFLICT (kind, text, model) DO UPDATE SET
+                model_version = excluded.model_version,
+                vector = excluded.vector,
+                created_at = now()
+        """, (kind, model, model_version))
+    finally:
+        conn.unregister("staged_embeddings")
+
+
+def prune_embeddings(conn) -> Any:
+    """Delete embeddings whose text no longer belongs to any entity/relationship (writer command)."""
+    return conn.execute(f"""
+        DELETE FROM embeddings
+        WHERE (kind = '{KIND_ENTITY}' AND text NOT IN (SELECT {ENTITY_TEXT_SQL} FROM entities e))
+           OR (kind = '{KIND_RELATIONSHIP}' AND text NOT IN (SELECT {RELATIONSHIP_TEXT_SQL} FROM relationships r))
+    """).fetchone()
@@ -0,0 +1,294 @@
+"""Entity merge lineage for PyScrAI Forge.
+
+Every entity merged into another is recorded in ``entity_aliases``:
+
+    alias_id        id of the merged (deleted) entity
+    canonical_id    entity that now stands for it
+    merged_into     entity it was directly merged into (its lineage parent)
+    merged_at       time of the merge
+
+Aliases are kept one hop deep: when a canonical entity is itself merged,
+the aliases pointing at it are re-pointed to the new canonical entity, so
+resolving an id is a single key lookup. ``merged_into`` is never re-pointed;
+``merge_lineage`` follows it to list the merges an id went through. The
+graph write path resolves incoming ids through this table (a re-extracted
+duplicate lands on the entity it was merged into instead of reappearing),
+and ``merge_entities`` applies a whole batch of merges with set-based
+statements.
+
+A batch commits in two transactions (see ``merge_entities``). If the
+process stops between them, the aliases are recorded while the merged
+entity rows still exist; ``pending_merges`` lists exactly those, and
+``DuckDBPersistenceService`` replays them whenever a database is opened.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import duckdb
+import pyarrow as pa
+
+from forge.infrastructure.persistence import graph_stats, search_index
+from forge.infrastructure.persistence.columnar import fetch_table
+
+logger = logging.getLogger(__name__)
+
+
+def create_aliases_table(conn) -> None:
+    """Create the merge lineage table."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entity_aliases (
+            alias_id VARCHAR PRIMARY KEY,
+            canonical_id VARCHAR NOT NULL,
+            merged_into VARCHAR NOT NULL,
+            merged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def clear_aliases(conn) -> None:
+    """Forget all merges (with ``clear_all_data``)."""
+    conn.execute("DELETE FROM entity_aliases")
+
+
+def resolve(conn, ids: Sequence[str]) -> Dict[str, str]:
+    """Canonical id of each id in ``ids`` that is an alias of a merged entity.
+
+    Ids that exist as entities stand for themselves, even if they were once
+    merged (see ``pending_merges``).
+    """
+    if not ids:
+        return {}
+    conn.register("alias_lookup", pa.table({"id": pa.array(list(dict.fromkeys(ids)), pa.string())}))
+    try:
+        rows = conn.execute("""
+            SELECT a.alias_id, a.canonical_id
+            FROM alias_lookup l
+            JOIN entity_aliases a ON a.alias_id = l.id
+            WHERE l.id NOT IN (SELECT id FROM entities)
+        """).fetchall()
+    finally:
+        conn.unregister("alias_lookup")
+    return dict(rows)
+
+
+def plan_merges(
+    merges: Iterable[Tuple[str, str]],
+    aliases: Dict[str, str],
+) -> List[Tuple[str, str, str]]:
+    """Fold ``(keep, merged)`` pairs into ``(alias, canonical, merged_into)`` rows.
+
+    Pairs may chain (``a <- b``, then ``b <- c``) or refer to entities that
+    were merged earlier (resolved through ``aliases``); every alias ends up
+    on the entity that survives the whole batch, while ``merged_into`` keeps
+    the entity named by its pair (``c`` was merged into ``b``). Pairs whose
+    entities are already one are skipped.
+    """
+    parent: Dict[str, str] = {}
+
+    def find(entity_id: str) -> str:
+        entity_id = aliases.get(entity_id, entity_id)
+        while entity_id in parent:
+            entity_id = parent[entity_id]
+        return entity_id
+
+    lineage: List[Tuple[str, str]] = []
+    for keep, merged in merges:
+        kept, absorbed = find(keep), find(merged)
+        if kept == absorbed:
+            continue
+        parent[absorbed] = kept
+        lineage.append((absorbed, keep))
+    return [(alias, find(alias), merged_into) for alias, merged_into in lineage]
+
+
+def merge_entities(conn, merges: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Merge each ``(keep, merged)`` pair of entities (isolated writer command body).
+
+    The relationships of the merged entities are re-pointed onto the kept
+    ones through the natural key (a relationship the kept entity already
+    has absorbs the merged one, keeping the higher confidence), their
+    profiles are dropped and the merges are recorded in ``entity_aliases``,
+    all in one transaction with one statement per step for the whole batch.
+    The merged entity rows are deleted in a second transaction: DuckDB's
+    foreign key check only sees the removed relationships once they are
+    committed, so the two cannot be one transaction. Replaying
+    ``pending_merges`` through this function completes a batch interrupted
+    between them (the first transaction finds nothing left to move).
+
+    Returns:
+        ``(canonical, alias)`` pairs of the merges applied; pairs whose kept
+        entity does not exist are skipped
+    """
+    if not merges:
+        return []
+    ids = [entity_id for pair in merges for entity_id in pair]
+    plan = plan_merges(merges, resolve(conn, ids))
+    if not plan:
+        return []
+    aliases, canonicals, merged_into = zip(*plan)
+    conn.register("merge_plan", pa.table({
+        "alias_id": pa.array(aliases, pa.string()),
+        "canonical_id": pa.array(canonicals, pa.string()),
+        "merged_into": pa.array(merged_into, pa.string()),
+    }))
+    try:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            applied = _merge_relationships(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            _rollback(conn)
+            raise
+        if applied:
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                _delete_merged_entities(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                _rollback(conn)
+                raise
+    finally:
+        conn.unregister("merge_plan")
+        conn.execute("DROP TABLE IF EXISTS temp.merge_map")
+        conn.execute("DROP TABLE IF EXISTS temp.merge_touching")
+    return applied
+
+
+def _rollback(conn) -> None:
+    try:
+        conn.execute("ROLLBACK")
+    except duckdb.Error:
+        pass
+
+
+def _merge_relationships(conn) -> List[Tuple[str, str]]:
+    """First transaction of ``merge_entities``; returns the applied merges."""
+    conn.execute("""
+        CREATE OR REPLACE TEMP TABLE merge_map AS
+        SELECT * FROM merge_plan
+        WHERE canonical_id IN (SELECT id FROM entities)
+    """)
+    applied = conn.execute("SELECT canonical_id, alias_id FROM merge_map ORDER BY canonical_id, alias_id").fetchall()
+    if not applied:
+        return []
+    # Every relationship of the entities involved, read once
+    conn.execute("""
+        CREATE OR REPLACE TEMP TABLE merge_touching AS
+        SELECT * FROM relationships
+        WHERE source IN (SELECT alias_id FROM merge_map UNION SELECT canonical_id FROM merge_map)
+        UNION
+        SELECT * FROM relationships
+        WHERE target IN (SELECT alias_id FROM merge_map UNION SELECT canonical_id FROM merge_map)
+    """)
+    # They leave the graph statistics here; the survivors are counted again below
+    graph_stats.record_relationships(conn, "merge_touching", -1)
+    conn.execute("""
+        INSERT INTO relationships (source, target, type, confidence, doc_id, created_at)
+        SELECT DISTINCT ON (source, target, type, doc_id)
+               source, target, type, confidence, doc_id, created_at
+        FROM (
+            SELECT
+                coalesce(s.canonical_id, t.source) AS source,
+                coalesce(g.canonical_id, t.target) AS target,
+                t.type, t.confidence, t.doc_id, t.created_at
+            FROM merge_touching t
+            LEFT JOIN merge_map s ON s.alias_id = t.source
+            LEFT JOIN merge_map g ON g.alias_id = t.target
+            WHERE s.alias_id IS NOT NULL OR g.alias_id IS NOT NULL
+        )
+        ORDER BY source, target, type, doc_id, confidence DESC
+        ON CONFLICT (source, target, type, doc_id) DO UPDATE SET
+            confidence = greatest(relationships.confidence, excluded.confidence)
+    """)
+    conn.execute("""
+        DELETE FROM relationships
+        WHERE id IN (
+            SELECT id FROM merge_touching
+            WHERE source IN (SELECT alias_id FROM merge_map)
+               OR target IN (SELECT alias_id FROM merge_map)
+        )
+    """)
+    graph_stats.record_relationships(conn, """(
+        SELECT id, source, target, doc_id FROM relationships
+        WHERE source IN (SELECT canonical_id FROM merge_map)
+        UNION
+        SELECT id, source, target, doc_id FROM relationships
+        WHERE target IN (SELECT canonical_id FROM merge_map)
+    )""")
+    conn.execute("DELETE FROM semantic_profiles WHERE entity_id IN (SELECT alias_id FROM merge_map)")
+    conn.execute("""
+        UPDATE entities SET updated_at = now()
+        WHERE id IN (SELECT canonical_id FROM merge_map)
+    """)
+    # Keep aliases one hop deep: aliases of entities merged now move on
+    conn.execute("""
+        UPDATE entity_aliases SET canonical_id = m.canonical_id
+        FROM merge_map m
+        WHERE entity_aliases.canonical_id = m.alias_id
+    """)
+    conn.execute("""
+        INSERT INTO entity_aliases (alias_id, canonical_id, merged_into)
+        SELECT alias_id, canonical_id, merged_into FROM merge_map
+        ON CONFLICT (alias_id) DO UPDATE SET
+            canonical_id = excluded.canonical_id,
+            -- A replayed merge keeps its recorded lineage
+            merged_into = CASE WHEN entity_aliases.canonical_id = excluded.canonical_id
+                               THEN entity_aliases.merged_into ELSE excluded.merged_into END,
+            merged_at = CASE WHEN entity_aliases.canonical_id = excluded.canonical_id
+                             THEN entity_aliases.merged_at ELSE now() END
+    """)
+    alias_ids = [alias_id for _, alias_id in applied]
+    search_index.sync_documents(conn, search_index.KIND_PROFILE, alias_ids)
+    return applied
+
+
+def _delete_merged_entities(conn) -> None:
+    """Second transaction of ``merge_entities``."""
+    deleted = fetch_table(conn.execute("""
+        DELETE FROM entities
+        WHERE id IN (SELECT alias_id FROM merge_map)
+        RETURNING id, type
+    """))
+    if deleted.num_rows:
+        conn.register("merged_entities", deleted)
+        try:
+            graph_stats.record_entities(conn, "merged_entities", -1)
+        finally:
+            conn.unregister("merged_entities")
+    search_index.sync_documents(conn, search_index.KIND_ENTITY, deleted.column("id").to_pylist())
+    graph_stats.compact_counters(conn)
+
+
+def merge_lineage(conn, entity_id: str) -> List[str]:
+    """Entities ``entity_id`` was merged into, nearest first.
+
+    Follows ``merged_into`` from parent to parent; the last id is the one
+    the entity resolves to today.
+    """
+    lineage: List[str] = []
+    seen = {entity_id}
+    while True:
+        row = conn.execute("SELECT merged_into FROM entity_aliases WHERE alias_id = ?", [entity_id]).fetchone()
+        if not row or row[0] in seen:
+            return lineage
+        entity_id = row[0]
+        lineage.append(entity_id)
+        seen.add(entity_id)
+
+
+def pending_merges(conn) -> List[Tuple[str, str]]:
+    """``(canonical, alias)`` pairs of recorded merges whose alias exists again as an entity.
+
+    These are merges interrupted before their entity rows were deleted, or
+    entities recreated by means other than the graph write path (which
+    never recreates them); ``merge_entities`` replays these pairs.
+    """
+    return conn.execute("""
+        SELECT a.canonical_id, a.alias_id
+        FROM entity_aliases a
+        WHERE a.alias_id IN (SELECT id FROM entities)
+        ORDER BY a.canonical_id, a.alias_id
+    """).fetchall()
@@ -0,0 +1,286 @@
+"""Pre-aggregated graph statistics for PyScrAI Forge.
+
+Counts that the dashboard, exports and analytics need are kept in two
+tables maintained by the writer commands that change the graph, so reading
+them never scans ``entities`` or ``relationships``:
+
+    entity_stats    out/in degree of each entity
+    graph_stats     (scope, key) counters: entity and relationship totals
+                    (scope "graph"), entities per type ("type") and
+                    relationships per document ("document")
+
+Both tables hold signed deltas rather than one row per counter: a write
+appends the contribution of the rows it added (+1) or removed (-1), and
+reads sum them. Updating a hot counter row on every write would instead
+leave versions that block ``CHECKPOINT`` for as long as any reader still
+holds an older transaction. ``compact`` folds the deltas into one row per
+counter (sorted by entity id, so single-entity lookups are pruned by the
+zone maps) once they grow (see ``compaction_due``). The ``graph_stats``
+counters are summed by every read, so the writer commands that record
+them also fold that small table on its own (``compact_counters``) long
+before then.
+
+``recount`` rebuilds both tables from the graph, which repairs any drift.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+SCOPE_GRAPH = "graph"
+SCOPE_TYPE = "type"
+SCOPE_DOCUMENT = "document"
+KEY_ENTITIES = "entities"
+KEY_RELATIONSHIPS = "relationships"
+
+# Delta rows tolerated before compacting: this many, or (for entity_stats)
+# twice the number of entities if that is more
+COMPACT_MIN_ROWS = 50_000
+# graph_stats rows tolerated before ``compact_counters`` folds them: this
+# many, or twice the number of counters if that is more
+COMPACT_COUNTER_ROWS = 1_000
+
+
+@dataclass(frozen=True)
+class GraphStats:
+    """Graph totals; ``documents`` counts documents that have relationships."""
+
+    entities: int = 0
+    relationships: int = 0
+    documents: int = 0
+    entity_types: Dict[str, int] = field(default_factory=dict)
+
+
+_ENTITY_STATS_COLUMNS = """
+    entity_id VARCHAR NOT NULL,
+    out_degree BIGINT NOT NULL,
+    in_degree BIGINT NOT NULL
+"""
+
+
+def create_stats_tables(conn) -> None:
+    """Create the statistics tables and count the existing graph."""
+    conn.execute(f"CREATE TABLE IF NOT EXISTS entity_stats ({_ENTITY_STATS_COLUMNS})")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS graph_stats (
+            scope VARCHAR NOT NULL,
+            key VARCHAR NOT NULL,
+            value BIGINT NOT NULL
+        )
+    """)
+    recount(conn)
+
+
+def recount(conn) -> None:
+    """Rebuild both tables from ``entities`` and ``relationships``."""
+    clear_stats(conn)
+    conn.execute("""
+        INSERT INTO entity_stats (entity_id, out_degree, in_degree)
+        SELECT entity_id, sum(out_degree), sum(in_degree) FROM (
+            SELECT source AS entity_id, count(*) AS out_degree, 0 AS in_degree
+            FROM relationships GROUP BY source
+            UNION ALL
+            SELECT target, 0, count(*) FROM relationships GROUP BY target
+        )
+        GROUP BY entity_id
+        ORDER BY entity_id
+    """)
+    conn.execute(f"""
+        INSERT INTO graph_stats (scope, key, value)
+        SELECT '{SCOPE_GRAPH}', '{KEY_ENTITIES}', count(*) FROM entities
+        UNION ALL
+        SELECT '{SCOPE_GRAPH}', '{KEY_RELATIONSHIPS}', count(*) FROM relationships
+        UNION ALL
+        SELECT '{SCOPE_TYPE}', type, count(*) FROM entities GROUP BY type
+        UNION ALL
+        SELECT '{SCOPE_DOCUMENT}', doc_id, count(*) FROM relationships
+        WHERE doc_id IS NOT NULL GROUP BY doc_id
+    """)
+
+
+def clear_stats(conn) -> None:
+    """Remove all statistics (with ``clear_all_data``)."""
+    conn.execute("DELETE FROM entity_stats")
+    conn.execute("DELETE FROM graph_stats")
+
+
+def record_entities(conn, relation: str, sign: int = 1, params: Any = None) -> None:
+    """Count the entity rows of ``relation`` (with ``type``).
+
+    Args:
+        relation: Table, view or parenthesized query over entity rows
+        sign: +1 for added rows, -1 for removed ones
+        params: Parameters of ``relation``
+    """
+    conn.execute(f"""
+        INSERT INTO graph_stats (scope, key, value)
+        SELECT '{SCOPE_GRAPH}', '{KEY_ENTITIES}', {int(sign)} * count(*) FROM {relation} HAVING count(*) > 0
+        UNION ALL
+        SELECT '{SCOPE_TYPE}', type, {int(sign)} * count(*) FROM {relation} GROUP BY type
+    """, params)
+
+
+def record_relationships(conn, relation: str, sign: int = 1, params: Any = None) -> None:
+    """Count the relationship rows of ``relation`` (with ``source``, ``target``, ``doc_id``).
+
+    Args:
+        relation: Table, view or parenthesized query over relationship rows
+        sign: +1 for added rows, -1 for removed ones
+        params: Parameters of ``relation``
+    """
+    sign = int(sign)
+    conn.execute(f"""
+        INSERT INTO graph_stats (scope, key, value)
+        SELECT '{SCOPE_GRAPH}', '{KEY_RELATIONSHIPS}', {sign} * count(*) FROM {relation} HAVING count(*) > 0
+        UNION ALL
+        SELECT '{SCOPE_DOCUMENT}', doc_id, {sign} * count(*) FROM {relation}
+        WHERE doc_id IS NOT NULL GROUP BY doc_id
+    """, params)
+    conn.execute(f"""
+        INSERT INTO entity_stats (entity_id, out_degree, in_degree)
+        SELECT entity_id, {sign} * sum(out_degree), {sign} * sum(in_degree) FROM (
+            SELECT source AS entity_id, 1 AS out_degree, 0 AS in_degree FROM {relation}
+            UNION ALL
+            SELECT target, 0, 1 FROM {relation}
+        )
+        GROUP BY entity_id
+    """, params)
+
+
+def touching_relationships(ids: Sequence[str]) -> Tuple[str, Dict[str, str]]:
+    """Relation (and its parameters) of the relationships with an endpoint in ``ids``.
+
+    One equality branch per endpoint and id, so that the source/target
+    indexes are used (``= ANY`` or ``OR`` scan the table).
+    """
+    params = {f"entity_{index}": entity_id for index, entity_id in enumerate(dict.fromkeys(ids))}
+    branches = [
+        f"SELECT id, source, target, doc_id FROM relationships WHERE {column} = ${name}"
+        for name in params
+        for column in ("source", "target")
+    ]
+    return "(" + " UNION ".join(branches) + ")", params
+
+
+def compaction_due(conn) -> bool:
+    """Whether enough delta rows have piled up to ``compact``."""
+    # fetchall: a partly fetched result keeps the reader's transaction open,
+    # which blocks CHECKPOINT
+    rows = conn.execute(f"""
+        SELECT
+            (SELECT count(*) FROM entity_stats)
+                > greatest({COMPACT_MIN_ROWS}, 2 * coalesce((
+                    SELECT sum(value) FROM graph_stats
+                    WHERE scope = '{SCOPE_GRAPH}' AND key = '{KEY_ENTITIES}'
+                ), 0)),
+            (SELECT count(*) FROM graph_stats) > {COMPACT_MIN_ROWS}
+    """).fetchall()
+    return bool(rows and any(rows[0]))
+
+
+def compact(conn, transactional: bool = False) -> None:
+    """Fold the deltas into one row per counter, dropping counters that are zero.
+
+    Args:
+        transactional: Run in a transaction of its own; pass True when the
+            caller holds none (e.g. an isolated writer command)
+    """
+    if transactional:
+        conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(f"CREATE TABLE entity_stats_compacted ({_ENTITY_STATS_COLUMNS})")
+        conn.execute("""
+            INSERT INTO entity_stats_compacted
+            SELECT entity_id, sum(out_degree), sum(in_degree)
+            FROM entity_stats
+            GROUP BY entity_id
+            HAVING sum(out_degree) <> 0 OR sum(in_degree) <> 0
+            ORDER BY entity_id
+        """)
+        conn.execute("DROP TABLE entity_stats")
+        conn.execute("ALTER TABLE entity_stats_compacted RENAME TO entity_stats")
+        _fold_counters(conn)
+        if transactional:
+            conn.execute("COMMIT")
+    except Exception:
+        if transactional:
+            try:
+                conn.execute("ROLLBACK")
+            except duckdb.Error:
+                pass
+        raise
+
+
+def compact_counters(conn) -> bool:
+    """Fold the ``graph_stats`` deltas once they outgrow ``COMPACT_COUNTER_ROWS`` (writer command body).
+
+    Keeps the rows summed by ``get_graph_stats`` bounded by the number of
+    counters; ``entity_stats`` is left to ``compact``.
+
+    Returns:
+        Whether the counters were folded
+    """
+    rows = conn.execute(f"""
+        SELECT count(*) > greatest({COMPACT_COUNTER_ROWS}, 2 * count(DISTINCT (scope, key)))
+        FROM graph_stats
+    """).fetchall()
+    if not (rows and rows[0][0]):
+        return False
+    _fold_counters(conn)
+    return True
+
+
+def _fold_counters(conn) -> None:
+    """Replace the ``graph_stats`` deltas by one row per non-zero counter."""
+    counters = conn.execute("""
+        SELECT scope, key, sum(value) FROM graph_stats
+        GROUP BY scope, key HAVING sum(value) <> 0
+    """).fetchall()
+    conn.execute("DELETE FROM graph_stats")
+    if counters:
+        conn.executemany("INSERT INTO graph_stats (scope, key, value) VALUES (?, ?, ?)", counters)
+
+
+def get_graph_stats(conn) -> GraphStats:
+    """Current graph totals, summed from the counters."""
+    totals: Dict[str, int] = {}
+    types: Dict[str, int] = {}
+    documents = 0
+    for scope, key, value in conn.execute("""
+        SELECT scope, key, sum(value)::BIGINT FROM graph_stats
+        GROUP BY scope, key HAVING sum(value) <> 0
+    """).fetchall():
+        if scope == SCOPE_GRAPH:
+            totals[key] = value
+        elif scope == SCOPE_TYPE:
+            types[key] = value
+        elif scope == SCOPE_DOCUMENT and value > 0:
+            documents += 1
+    return GraphStats(
+        entities=totals.get(KEY_ENTITIES, 0),
+        relationships=totals.get(KEY_RELATIONSHIPS, 0),
+        documents=documents,
+        entity_types=dict(sorted(types.items())),
+    )
+
+
+def entity_degrees(conn, ids: Optional[Sequence[str]] = None) -> Dict[str, Tuple[int, int]]:
+    """``(out_degree, in_degree)`` per entity with relationships.
+
+    Args:
+        ids: Only these entities (default: all)
+    """
+    where = "WHERE entity_id = ANY(?)" if ids is not None else ""
+    rows = conn.execute(f"""
+        SELECT entity_id, sum(out_degree)::BIGINT, sum(in_degree)::BIGINT FROM entity_stats
+        {where}
+        GROUP BY entity_id
+        HAVING sum(out_degree) <> 0 OR sum(in_degree) <> 0
+    """, [list(ids)] if ids is not None else None).fetchall()
+    return {entity_id: (out_degree, in_degree) for entity_id, out_degree, in_degree in rows}
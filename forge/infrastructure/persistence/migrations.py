@@ -0,0 +1,361 @@
+"""Schema versioning and migrations for the PyScrAI Forge database.
+
+The schema is built by an ordered list of ``Migration`` steps. The version
+of every applied step is recorded in the ``schema_version`` table, so
+opening a file written by an older release applies just the steps it is
+missing. Every step is idempotent (``IF NOT EXISTS``, existence checks
+before ALTERs) because databases created before versioning existed already
+hold some of the schema: they start at version 0 and replay everything.
+
+Steps marked ``online`` only build indexes or backfill columns that nothing
+depends on for correctness yet. The database is opened without waiting for
+them and the writer applies them in the background (see
+``DuckDBPersistenceService.connect``), unless a later pending step lists
+them in ``depends_on``.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+import duckdb
+
+from forge.infrastructure.persistence import embedding_store, entity_aliases, graph_stats, profile_store, search_index
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "schema_version"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change, applied in its own transaction."""
+
+    version: int
+    description: str
+    apply: Callable[[Any], None]
+    # Safe to apply while the database is already in use
+    online: bool = False
+    # Versions of online steps that must be applied before this one
+    depends_on: Tuple[int, ...] = ()
+
+
+# ---------------------------------------------------------------------------
+# Helpers for idempotent steps
+# ---------------------------------------------------------------------------
+
+def column_exists(conn, table: str, column: str) -> bool:
+    row = conn.execute("""
+        SELECT count(*) FROM duckdb_columns()
+        WHERE database_name = current_database() AND table_name = ? AND column_name = ?
+    """, [table, column]).fetchone()
+    return bool(row and row[0])
+
+
+def add_column(conn, table: str, column: str, column_type: str, backfill: Optional[str] = None) -> None:
+    """Add a column if it is missing and fill it for existing rows.
+
+    Args:
+        backfill: SQL expression over the table's columns used for rows where
+            the new column is still null
+    """
+    if not column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    if backfill:
+        conn.execute(f"UPDATE {table} SET {column} = {backfill} WHERE {column} IS NULL")
+
+
+def create_index(conn, name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    conn.execute(f"""
+        CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name}
+        ON {table}({", ".join(columns)})
+    """)
+
+
+# ---------------------------------------------------------------------------
+# Steps
+# ---------------------------------------------------------------------------
+
+def _baseline(conn) -> None:
+    """Tables and indexes of databases written before schema versioning."""
+    # Create sequence for relationship IDs first
+    conn.execute("""
+        CREATE SEQUENCE IF NOT EXISTS rel_seq START 1
+    """)
+
+    # Entities table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entities (
+            id VARCHAR PRIMARY KEY,
+            type VARCHAR NOT NULL,
+            label VARCHAR NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Relationships table
+    # Note: DuckDB doesn't support ON DELETE CASCADE in FOREIGN KEY constraints
+    # The deduplication service manually updates relationships before deleting entities
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS relationships (
+            id INTEGER PRIMARY KEY DEFAULT nextval('rel_seq'),
+            source VARCHAR NOT NULL,
+            target VARCHAR NOT NULL,
+            type VARCHAR NOT NULL,
+            confidence DOUBLE NOT NULL,
+            doc_id VARCHAR,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (source) REFERENCES entities(id),
+            FOREIGN KEY (target) REFERENCES entities(id)
+        )
+    """)
+
+    # Create indexes for performance
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(type)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target)
+    """)
+
+    # UI Artifacts table for storing workspace schemas
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ui_artifacts (
+            id VARCHAR PRIMARY KEY,
+            schema TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ui_artifacts_created ON ui_artifacts(created_at)
+    """)
+
+    # Semantic Profiles table for storing entity profiles
+    # Note: DuckDB doesn't support ON DELETE CASCADE in FOREIGN KEY constraints
+    # The deduplication service should manually delete profiles when entities are deleted/merged
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS semantic_profiles (
+            entity_id VARCHAR PRIMARY KEY,
+            summary TEXT NOT NULL,
+            key_attributes TEXT,
+            related_entities TEXT,
+            significance_score DOUBLE,
+            profile_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (entity_id) REFERENCES entities(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_profiles_significance ON semantic_profiles(significance_score)
+    """)
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_profiles_entity ON semantic_profiles(entity_id)
+    """)
+
+    # Narratives table for storing document narratives
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS narratives (
+            doc_id VARCHAR PRIMARY KEY,
+            narrative TEXT NOT NULL,
+            entity_count INTEGER,
+            relationship_count INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_narratives_created ON narratives(created_at)
+    """)
+
+
+def _collapse_duplicate_relationships(conn) -> None:
+    """Collapse duplicate relationships onto the oldest row.
+
+    Databases written before the natural key existed may hold duplicates. Kept
+    apart from the index step: DuckDB checks a new unique index against rows
+    deleted earlier in the same transaction.
+    """
+    duplicates = conn.execute("""
+        SELECT count(*) FROM (
+            SELECT 1 FROM relationships
+            GROUP BY source, target, type, doc_id
+            HAVING count(*) > 1
+        )
+    """).fetchone()
+    if not duplicates or not duplicates[0]:
+        return
+    removed = conn.execute("""
+        DELETE FROM relationships
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM relationships
+            GROUP BY source, target, type, doc_id
+        )
+    """).fetchone()
+    logger.info(f"Removed {removed[0] if removed else 0} duplicate relationships before indexing")
+
+
+def _relationship_natural_key(conn) -> None:
+    """Unique natural key of relationships used by bulk upserts."""
+    create_index(
+        conn, "idx_relationships_natural_key", "relationships", ("source", "target", "type", "doc_id"), unique=True
+    )
+
+
+def _drop_ui_artifacts(conn) -> None:
+    """UI artifacts moved to their own capped store (see ``artifact_store``)."""
+    conn.execute("DROP INDEX IF EXISTS idx_ui_artifacts_created")
+    conn.execute("DROP TABLE IF EXISTS ui_artifacts")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", _baseline),
+    Migration(2, "collapse duplicate relationships", _collapse_duplicate_relationships),
+    Migration(3, "relationship natural key", _relationship_natural_key),
+    Migration(4, "embeddings sidecar table", embedding_store.create_embeddings_table),
+    Migration(5, "typed semantic profile columns", profile_store.create_typed_profiles_table),
+    Migration(6, "full-text search index tables", search_index.create_search_tables),
+    Migration(7, "full-text search index backfill", search_index.index_all, online=True),
+    Migration(8, "pre-aggregated graph statistics", graph_stats.create_stats_tables),
+    Migration(9, "entity merge lineage", entity_aliases.create_aliases_table),
+    Migration(10, "UI artifacts moved out of the project database", _drop_ui_artifacts),
+]
+
+# Version of a database with every migration applied
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _ensure_version_table(conn) -> None:
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            version INTEGER PRIMARY KEY,
+            description VARCHAR NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(conn) -> int:
+    """Schema version of the database (0 if it predates versioning)."""
+    row = conn.execute("""
+        SELECT count(*) FROM duckdb_tables()
+        WHERE database_name = current_database() AND table_name = ?
+    """, [VERSION_TABLE]).fetchone()
+    if not row or not row[0]:
+        return 0
+    row = conn.execute(f"SELECT max(version) FROM {VERSION_TABLE}").fetchone()
+    return (row[0] or 0) if row else 0
+
+
+def applied_versions(conn) -> Set[int]:
+    """Versions of the steps applied to the database.
+
+    Deferred online steps can leave gaps below ``current_version``.
+    """
+    if not current_version(conn):
+        return set()
+    return {row[0] for row in conn.execute(f"SELECT version FROM {VERSION_TABLE}").fetchall()}
+
+
+def pending_migrations(conn, target: Optional[int] = None) -> List[Migration]:
+    """Migrations not yet applied, up to ``target`` (default: all).
+
+    Raises:
+        RuntimeError: If the database was written by a newer release
+    """
+    version = current_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema v{version} is newer than this release supports (v{SCHEMA_VERSION})"
+        )
+    target = SCHEMA_VERSION if target is None else target
+    applied = applied_versions(conn)
+    return [
+        migration for migration in MIGRATIONS
+        if migration.version not in applied and migration.version <= target
+    ]
+
+
+def apply_migrations(conn, migrations: Sequence[Migration], transactional: bool = True) -> None:
+    """Apply migrations in order, recording each one's version.
+
+    Args:
+        transactional: Run each step in its own transaction; pass False when
+            the caller already holds a transaction
+
+    Raises:
+        RuntimeError: If a step fails (earlier steps stay applied)
+    """
+    if not migrations:
+        return
+    _ensure_version_table(conn)
+    start = current_version(conn)
+    for migration in migrations:
+        try:
+            if transactional:
+                conn.execute("BEGIN TRANSACTION")
+            migration.apply(conn)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {VERSION_TABLE} (version, description) VALUES (?, ?)",
+                [migration.version, migration.description],
+            )
+            if transactional:
+                conn.execute("COMMIT")
+        except Exception as e:
+            if transactional:
+                try:
+                    conn.execute("ROLLBACK")
+                except duckdb.Error:
+                    pass
+            raise RuntimeError(
+                f"Schema migration v{migration.version} ({migration.description}) failed: {e}"
+            ) from e
+    logger.info(
+        f"Migrated database schema from v{start} to v{current_version(conn)} "
+        f"(applied {', '.join(f'v{migration.version}' for migration in migrations)})"
+    )
+
+
+def migrate(
+    conn,
+    target: Optional[int] = None,
+    defer_online: bool = False,
+    transactional: bool = True,
+) -> List[Migration]:
+    """Bring the database schema up to ``target`` (default: the latest version).
+
+    Args:
+        defer_online: Leave pending online migrations unapplied and return them,
+            except those a later pending step depends on
+        transactional: See ``apply_migrations``
+
+    Returns:
+        The deferred online migrations, to be applied later with ``apply_migrations``
+    """
+    pending = pending_migrations(conn, target)
+    deferred: List[Migration] = []
+    if defer_online:
+        # Walk backwards so dependencies of the steps applied now are known
+        required: Set[int] = set()
+        for migration in reversed(pending):
+            if migration.online and migration.version not in required:
+                deferred.insert(0, migration)
+            else:
+                required.update(migration.depends_on)
+        pending = [migration for migration in pending if migration not in deferred]
+    apply_migrations(conn, pending, transactional=transactional)
+    return deferred
@@ -0,0 +1,131 @@
+"""Streaming reads of the PyScrAI Forge database.
+
+Large tables are read page by page with keyset pagination: each page is
+``WHERE key > <last key> ORDER BY key LIMIT n`` on a unique key, so every
+page costs the same regardless of how deep into the table it is, and memory
+stays bounded by the page size.
+
+Readers take a connection or a ``DuckDBConnectionManager``; with a manager
+each page runs on the cursor of the thread that requests it, so a generator
+can be advanced from worker threads (see ``DuckDBConnectionManager.iterate``).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+
+from forge.infrastructure.persistence.columnar import (
+    ENTITY_COLUMNS,
+    RELATIONSHIP_COLUMNS,
+    _in_filter,
+    _projection,
+    fetch_table,
+)
+
+# Rows fetched per page
+READ_BATCH_SIZE = 5000
+
+
+def iter_pages(
+    conn,
+    table: str,
+    key: str,
+    projection: str,
+    clauses: Optional[List[str]] = None,
+    params: Optional[List[Any]] = None,
+    batch_size: int = READ_BATCH_SIZE,
+    joins: str = "",
+    join_params: Optional[List[Any]] = None,
+) -> Iterator[pa.Table]:
+    """Yield Arrow pages of a query, keyset-paginated on a unique column.
+
+    Args:
+        conn: DuckDB connection or connection manager
+        table: Table (with alias, if ``joins`` refers to one) to read
+        key: Unique, orderable column to paginate on; must be part of ``projection``
+            under its unqualified name
+        projection: SELECT list
+        clauses: Extra WHERE conditions
+        params: Parameters of ``clauses``
+        batch_size: Rows per page
+        joins: JOIN clauses appended after ``table``
+        join_params: Parameters of ``joins``
+    """
+    clauses = list(clauses or [])
+    params = list(params or [])
+    key_name = key.rsplit(".", 1)[-1]
+    last = None
+    while True:
+        where = clauses + ([f"{key} > ?"] if last is not None else [])
+        page_params = list(join_params or []) + params + ([last] if last is not None else []) + [batch_size]
+        page = fetch_table(conn.execute(f"""
+            SELECT {projection}
+            FROM {table} {joins}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {key}
+            LIMIT ?
+        """, page_params))
+        if page.num_rows:
+            yield page
+        if page.num_rows < batch_size:
+            return
+        last = page.column(key_name)[-1].as_py()
+
+
+def iter_entity_pages(
+    conn,
+    columns: Optional[Sequence[str]] = None,
+    types: Optional[Sequence[str]] = None,
+    batch_size: int = READ_BATCH_SIZE,
+) -> Iterator[pa.Table]:
+    """Yield entities as Arrow pages in id order (``id`` is always included)."""
+    columns = list(columns or ENTITY_COLUMNS)
+    if "id" not in columns:
+        columns.insert(0, "id")
+    clauses: List[str] = []
+    params: List[Any] = []
+    _in_filter("type", types, clauses, params)
+    yield from iter_pages(
+        conn, "entities", "id", _projection(columns, ENTITY_COLUMNS), clauses, params, batch_size
+    )
+
+
+def iter_relationship_pages(
+    conn,
+    columns: Optional[Sequence[str]] = None,
+    types: Optional[Sequence[str]] = None,
+    min_confidence: Optional[float] = None,
+    doc_id: Optional[str] = None,
+    batch_size: int = READ_BATCH_SIZE,
+) -> Iterator[pa.Table]:
+    """Yield relationships as Arrow pages in id order (``id`` is always included)."""
+    columns = list(columns or RELATIONSHIP_COLUMNS)
+    if "id" not in columns:
+        columns.insert(0, "id")
+    clauses: List[str] = []
+    params: List[Any] = []
+    _in_filter("type", types, clauses, params)
+    if min_confidence is not None:
+        clauses.append("confidence >= ?")
+        params.append(min_confidence)
+    if doc_id is not None:
+        clauses.append("doc_id = ?")
+        params.append(doc_id)
+    yield from iter_pages(
+        conn, "relationships", "id", _projection(columns, RELATIONSHIP_COLUMNS), clauses, params, batch_size
+    )
+
+
+def iter_narratives(conn, batch_size: int = READ_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield stored narratives in document id order."""
+    for page in iter_pages(
+        conn,
+        "narratives",
+        "doc_id",
+        "doc_id, narrative, entity_count, relationship_count, created_at",
+        batch_size=batch_size,
+    ):
+        yield from page.to_pylist()
+
@@ -0,0 +1,239 @@
+"""Semantic profiles of entities in PyScrAI Forge.
+
+The fields of a profile generated by the ``SemanticProfilerService`` (see
+the ``semantic_profiler`` prompt) are stored in typed columns of
+``semantic_profiles``:
+
+    summary             VARCHAR
+    attributes          VARCHAR[]
+    importance          INTEGER   (1-10)
+    key_relationships   VARCHAR[]
+    confidence          DOUBLE    (0-1)
+
+so listings such as "the ten most important PERSON profiles" are sorted and
+filtered in SQL without decoding anything. ``profile_json`` only archives
+keys outside these fields (null when there are none, which is the norm).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from forge.infrastructure.persistence.columnar import fetch_table
+from forge.infrastructure.persistence.pagination import READ_BATCH_SIZE, iter_pages
+
+logger = logging.getLogger(__name__)
+
+# Typed profile fields, in column order
+PROFILE_FIELDS = ("summary", "attributes", "importance", "key_relationships", "confidence")
+# Keys not archived in profile_json: the typed fields and the row key
+_COLUMN_KEYS = PROFILE_FIELDS + ("entity_id",)
+
+_PROFILE_PROJECTION = (
+    "p.entity_id AS entity_id, p.summary AS summary, p.attributes AS attributes, "
+    "p.importance AS importance, p.key_relationships AS key_relationships, "
+    "p.confidence AS confidence, p.profile_json AS profile_json"
+)
+
+
+def create_typed_profiles_table(conn) -> None:
+    """Rebuild ``semantic_profiles`` with typed profile columns.
+
+    Earlier releases kept the whole profile in ``profile_json`` next to
+    ``key_attributes`` / ``significance_score`` columns that were never
+    filled (the profiler emits ``attributes`` and ``importance``). The
+    fields are extracted from the stored JSON; values that do not convert
+    become null. DuckDB cannot drop columns that precede an indexed column,
+    so the table is rebuilt from a staged copy.
+    """
+    if _has_typed_columns(conn):
+        return
+    removed_keys = json.dumps({key: None for key in _COLUMN_KEYS})
+    conn.execute(f"""
+        CREATE TEMP TABLE semantic_profiles_staged AS
+        SELECT
+            entity_id,
+            coalesce(json_extract_string(doc, '$.summary'), summary, '') AS summary,
+            json_extract_string(doc, '$.attributes[*]') AS attributes,
+            TRY_CAST(round(TRY_CAST(json_extract_string(doc, '$.importance') AS DOUBLE)) AS INTEGER) AS importance,
+            json_extract_string(doc, '$.key_relationships[*]') AS key_relationships,
+            TRY_CAST(json_extract_string(doc, '$.confidence') AS DOUBLE) AS confidence,
+            -- Unparseable documents are archived as they are
+            CASE WHEN doc IS NULL THEN profile_json
+                 ELSE nullif(json_merge_patch(doc, '{removed_keys}')::VARCHAR, '{{}}') END AS profile_json,
+            created_at,
+            updated_at
+        FROM (
+            SELECT *, CASE WHEN json_valid(profile_json) THEN profile_json END AS doc
+            FROM semantic_profiles
+        )
+    """)
+    # Also drops idx_profiles_significance / idx_profiles_entity: the primary
+    # key covers entity_id, and top-N sorts do not use ART indexes
+    conn.execute("DROP TABLE semantic_profiles")
+    # Created under its final name: renaming a table does not update the
+    # foreign key bookkeeping of the table it references
+    conn.execute("""
+        CREATE TABLE semantic_profiles (
+            entity_id VARCHAR PRIMARY KEY,
+            summary TEXT NOT NULL,
+            attributes VARCHAR[],
+            importance INTEGER,
+            key_relationships VARCHAR[],
+            confidence DOUBLE,
+            profile_json TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (entity_id) REFERENCES entities(id)
+        )
+    """)
+    conn.execute("INSERT INTO semantic_profiles SELECT * FROM semantic_profiles_staged")
+    conn.execute("DROP TABLE semantic_profiles_staged")
+
+
+def _has_typed_columns(conn) -> bool:
+    row = conn.execute("""
+        SELECT count(*) FROM duckdb_columns()
+        WHERE database_name = current_database() AND table_name = 'semantic_profiles'
+          AND column_name = 'importance'
+    """).fetchone()
+    return bool(row and row[0])
+
+
+def _text_list(value: Any) -> Optional[List[str]]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def profile_row(entity_id: str, profile: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """Parameters of an ``upsert_profile`` row for a profile dictionary."""
+    importance = _number(profile.get("importance"))
+    extra = {key: value for key, value in profile.items() if key not in _COLUMN_KEYS}
+    return (
+        entity_id,
+        str(profile.get("summary") or ""),
+        _text_list(profile.get("attributes")),
+        round(importance) if importance is not None else None,
+        _text_list(profile.get("key_relationships")),
+        _number(profile.get("confidence")),
+        json.dumps(extra, sort_keys=True) if extra else None,
+    )
+
+
+def upsert_profile(conn, entity_id: str, profile: Mapping[str, Any]) -> None:
+    """Insert or replace the profile of an entity (writer command body)."""
+    conn.execute("""
+        INSERT INTO semantic_profiles
+            (entity_id, summary, attributes, importance, key_relationships, confidence, profile_json)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (entity_id) DO UPDATE SET
+            summary = excluded.summary,
+            attributes = excluded.attributes,
+            importance = excluded.importance,
+            key_relationships = excluded.key_relationships,
+            confidence = excluded.confidence,
+            profile_json = excluded.profile_json,
+            updated_at = now()
+    """, profile_row(entity_id, profile))
+
+
+def _profiles(page) -> Iterator[Dict[str, Any]]:
+    """Profile dictionaries of a page selected with ``_PROFILE_PROJECTION``."""
+    columns = {name: page.column(name).to_pylist() for name in ("entity_id",) + PROFILE_FIELDS + ("profile_json",)}
+    for index in range(page.num_rows):
+        profile: Dict[str, Any] = {}
+        extra = columns["profile_json"][index]
+        if extra:
+            try:
+                archived = json.loads(extra)
+            except json.JSONDecodeError:
+                archived = None
+            if isinstance(archived, dict):
+                profile.update(archived)
+            else:
+                logger.debug(f"Ignoring malformed archived profile fields of {columns['entity_id'][index]}")
+        for field in PROFILE_FIELDS:
+            value = columns[field][index]
+            # Absent rather than None, so consumers fall back to their defaults
+            if value is not None:
+                profile[field] = value
+        profile["entity_id"] = columns["entity_id"][index]
+        yield profile
+
+
+def get_profile(conn, entity_id: str) -> Optional[Dict[str, Any]]:
+    """Stored profile of an entity, or None."""
+    page = fetch_table(conn.execute(f"""
+        SELECT {_PROFILE_PROJECTION} FROM semantic_profiles p WHERE p.entity_id = ?
+    """, [entity_id]))
+    return next(_profiles(page), None)
+
+
+def query_profiles(
+    conn,
+    entity_types: Optional[Sequence[str]] = None,
+    min_importance: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Profiles by descending importance (then confidence), filtered in SQL.
+
+    Each profile also carries its entity's ``label`` and ``entity_type``.
+
+    Args:
+        entity_types: Only profiles of entities of these types
+        min_importance: Only profiles rated at least this important
+        limit: Maximum number of profiles
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    if entity_types:
+        clauses.append("list_contains(?, e.type)")
+        params.append(list(entity_types))
+    if min_importance is not None:
+        clauses.append("p.importance >= ?")
+        params.append(min_importance)
+    if limit is not None:
+        params.append(limit)
+    page = fetch_table(conn.execute(f"""
+        SELECT {_PROFILE_PROJECTION}, e.label AS label, e.type AS entity_type
+        FROM semantic_profiles p
+        LEFT JOIN entities e ON e.id = p.entity_id
+        {"WHERE " + " AND ".join(clauses) if clauses else ""}
+        ORDER BY p.importance DESC NULLS LAST, p.confidence DESC NULLS LAST, p.entity_id
+        {"LIMIT ?" if limit is not None else ""}
+    """, params))
+    labels = page.column("label").to_pylist()
+    types = page.column("entity_type").to_pylist()
+    profiles = list(_profiles(page))
+    for profile, label, entity_type in zip(profiles, labels, types):
+        profile["label"] = label
+        profile["entity_type"] = entity_type
+    return profiles
+
+
+def iter_semantic_profiles(conn, batch_size: int = READ_BATCH_SIZE) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    """Yield ``(entity label, profile)`` pairs in entity id order.
+
+    The label is None if the entity no longer exists.
+    """
+    for page in iter_pages(
+        conn,
+        "semantic_profiles p",
+        "p.entity_id",
+        f"{_PROFILE_PROJECTION}, e.label AS label",
+        batch_size=batch_size,
+        joins="LEFT JOIN entities e ON e.id = p.entity_id",
+    ):
+        yield from zip(page.column("label").to_pylist(), _profiles(page))
@@ -0,0 +1,430 @@
+"""Full-text search over the PyScrAI Forge knowledge base.
+
+Entity labels, profile summaries and narratives are indexed in an inverted
+index and ranked with BM25. The index lives in ordinary tables:
+
+    search_documents       indexed version, text hash and length of each document
+    search_postings        (term, document) frequencies, stored sorted by term
+    search_postings_delta  postings written since the last compaction
+    search_tombstones      document versions that were replaced or removed
+    search_stats           changes to the document count and total length per kind
+
+DuckDB's ``fts`` extension is not used: its index is a static snapshot that
+has to be rebuilt after every change, and the extension has to be
+downloaded at runtime. These tables are instead kept current by the writer
+commands that change the indexed rows (``sync_documents``), which only
+re-tokenize texts whose hash changed.
+
+Because ``search_postings`` is stored in term order, the min/max zone maps
+of its row groups let a term lookup read just the row groups holding that
+term; an ART index, whose lookups fetch rows one at a time, is much slower
+for all but the rarest terms. New postings are appended to the small delta
+table instead, and replaced document versions are hidden by tombstones
+rather than deleted (deleting by document would scan every posting).
+Likewise each sync appends its change to the statistics instead of
+updating one row per kind: updated rows leave versions that block
+``CHECKPOINT`` for as long as any reader still holds an older transaction. ``compact``
+merges all of these into a freshly sorted ``search_postings`` (and one
+statistics row per kind) once they grow (see ``compaction_due``).
+
+Text is tokenized in SQL (lowercased, accents stripped, split on anything
+but letters and digits), so documents and queries always agree. There is
+no stemming: "merger" does not match "mergers".
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+KIND_ENTITY = "entity"
+KIND_PROFILE = "profile"
+KIND_NARRATIVE = "narrative"
+
+# Indexed text of each kind: (table, key column, text column)
+SOURCES: Dict[str, Tuple[str, str, str]] = {
+    KIND_ENTITY: ("entities", "id", "label"),
+    KIND_PROFILE: ("semantic_profiles", "entity_id", "summary"),
+    KIND_NARRATIVE: ("narratives", "doc_id", "narrative"),
+}
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Query terms beyond this are ignored
+MAX_QUERY_TERMS = 16
+# Characters of the matched text returned with each hit
+SNIPPET_LENGTH = 200
+# Unsorted postings (or tombstones) tolerated before compacting: this many,
+# or a quarter of the sorted postings if that is more
+COMPACT_MIN_DELTA = 200_000
+
+_POSTINGS_COLUMNS = """
+    term VARCHAR NOT NULL,
+    kind VARCHAR NOT NULL,
+    doc_key VARCHAR NOT NULL,
+    version BIGINT NOT NULL,
+    frequency INTEGER NOT NULL,
+    -- Length of the document, repeated so that ranking needs no join
+    length INTEGER NOT NULL
+"""
+
+
+def _tokens_sql(text_sql: str) -> str:
+    """SQL expression splitting ``text_sql`` into index terms."""
+    return (
+        f"list_filter(regexp_split_to_array(lower(strip_accents(coalesce({text_sql}, ''))), "
+        r"'[^\pL\pN]+'), lambda t: t <> '')"
+    )
+
+
+def create_search_tables(conn) -> None:
+    """Create the (empty) search index tables."""
+    conn.execute("CREATE SEQUENCE IF NOT EXISTS search_version_seq START 1")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_documents (
+            kind VARCHAR NOT NULL,
+            doc_key VARCHAR NOT NULL,
+            version BIGINT NOT NULL,
+            text_hash UBIGINT NOT NULL,
+            length INTEGER NOT NULL,
+            PRIMARY KEY (kind, doc_key)
+        )
+    """)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS search_postings ({_POSTINGS_COLUMNS})")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS search_postings_delta ({_POSTINGS_COLUMNS})")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_tombstones (
+            kind VARCHAR NOT NULL,
+            doc_key VARCHAR NOT NULL,
+            version BIGINT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_stats (
+            kind VARCHAR NOT NULL,
+            documents BIGINT NOT NULL,
+            total_length BIGINT NOT NULL
+        )
+    """)
+
+
+def index_all(conn) -> None:
+    """Index every document not indexed yet and compact (backfill of existing databases)."""
+    for kind in SOURCES:
+        sync_documents(conn, kind)
+    # Recounted from scratch, which also repairs any drift
+    conn.execute("DELETE FROM search_stats")
+    conn.execute("""
+        INSERT INTO search_stats (kind, documents, total_length)
+        SELECT kind, count(*), sum(length) FROM search_documents GROUP BY kind
+    """)
+    compact(conn)
+
+
+def sync_documents(conn, kind: str, keys: Optional[Sequence[str]] = None) -> int:
+    """Bring the index of ``kind`` up to date for the given row keys (writer command body).
+
+    Rows that were added or whose text changed are (re-)indexed; keys that no
+    longer exist in the source table are removed from the index. Without
+    ``keys`` the whole table is reconciled.
+
+    Returns:
+        Number of documents (re-)indexed or removed
+    """
+    table, key_column, text_column = SOURCES[kind]
+    source_filter = indexed_filter = ""
+    if keys is not None:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        # Joined against rather than tested with IN, which is several times slower
+        conn.execute("CREATE OR REPLACE TEMP TABLE search_sync_keys AS SELECT unnest(?) AS doc_key", [keys])
+        source_filter = f"SEMI JOIN search_sync_keys k ON k.doc_key = {key_column}"
+        indexed_filter = "SEMI JOIN search_sync_keys k ON k.doc_key = search_documents.doc_key"
+
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE search_sync AS
+        SELECT
+            coalesce(s.doc_key, d.doc_key) AS doc_key,
+            s.text,
+            d.version AS indexed_version,
+            d.length AS indexed_length
+        FROM (
+            SELECT {key_column} AS doc_key, {text_column} AS text, hash({text_column}) AS text_hash
+            FROM {table} {source_filter}
+        ) s
+        FULL JOIN (
+            SELECT doc_key, version, text_hash, length
+            FROM search_documents {indexed_filter} WHERE kind = ?
+        ) d ON d.doc_key = s.doc_key
+        WHERE s.doc_key IS NULL OR d.doc_key IS NULL OR s.text_hash <> d.text_hash
+    """, [kind])
+    try:
+        row = conn.execute("""
+            SELECT count(*), count(indexed_version), coalesce(sum(indexed_length), 0),
+                   count(*) FILTER (WHERE text IS NULL)
+            FROM search_sync
+        """).fetchone()
+        changed, stale, stale_length, removed = row if row else (0, 0, 0, 0)
+        if not changed:
+            return 0
+        if stale:
+            conn.execute("""
+                INSERT INTO search_tombstones (kind, doc_key, version)
+                SELECT ?, doc_key, indexed_version FROM search_sync WHERE indexed_version IS NOT NULL
+            """, [kind])
+        if removed:
+            conn.execute("""
+                DELETE FROM search_documents
+                WHERE kind = ? AND doc_key IN (SELECT doc_key FROM search_sync WHERE text IS NULL)
+            """, [kind])
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE search_sync_tokens AS
+            SELECT doc_key, text, {_tokens_sql("text")} AS tokens, nextval('search_version_seq') AS version
+            FROM search_sync WHERE text IS NOT NULL
+        """)
+        conn.execute("""
+            INSERT INTO search_documents (kind, doc_key, version, text_hash, length)
+            SELECT ?, doc_key, version, hash(text), len(tokens) FROM search_sync_tokens
+            ON CONFLICT (kind, doc_key) DO UPDATE SET
+                version = excluded.version,
+                text_hash = excluded.text_hash,
+                length = excluded.length
+        """, [kind])
+        conn.execute("""
+            INSERT INTO search_postings_delta (term, kind, doc_key, version, frequency, length)
+            SELECT term, ?, doc_key, version, count(*), any_value(length)
+            FROM (
+                SELECT doc_key, version, unnest(tokens) AS term, len(tokens) AS length
+                FROM search_sync_tokens
+            )
+            GROUP BY term, doc_key, version
+        """, [kind])
+        conn.execute("""
+            INSERT INTO search_stats (kind, documents, total_length)
+            SELECT $kind, count(*) - $stale, coalesce(sum(len(tokens)), 0) - $stale_length
+            FROM search_sync_tokens
+        """, {"kind": kind, "stale": stale, "stale_length": stale_length})
+        conn.execute("DROP TABLE search_sync_tokens")
+        return changed
+    finally:
+        conn.execute("DROP TABLE IF EXISTS search_sync")
+        conn.execute("DROP TABLE IF EXISTS search_sync_keys")
+
+
+def compaction_due(conn) -> bool:
+    """Whether enough unsorted postings or tombstones have piled up to ``compact``."""
+    # fetchall: a partly fetched result keeps the reader's transaction open,
+    # which blocks CHECKPOINT
+    rows = conn.execute(f"""
+        SELECT greatest(
+            (SELECT count(*) FROM search_postings_delta),
+            (SELECT count(*) FROM search_tombstones)
+        ) > greatest({COMPACT_MIN_DELTA}, (SELECT count(*) FROM search_postings) / 4)
+    """).fetchall()
+    return bool(rows and rows[0][0])
+
+
+def compact(conn, transactional: bool = False) -> None:
+    """Rewrite ``search_postings`` in term order, merging the delta and dropping tombstoned versions.
+
+    Args:
+        transactional: Run in a transaction of its own; pass True when the
+            caller holds none (e.g. an isolated writer command)
+    """
+    if transactional:
+        conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(f"CREATE TABLE search_postings_compacted ({_POSTINGS_COLUMNS})")
+        conn.execute("""
+            INSERT INTO search_postings_compacted
+            SELECT p.* FROM (
+                SELECT * FROM search_postings
+                UNION ALL
+                SELECT * FROM search_postings_delta
+            ) p
+            ANTI JOIN search_tombstones t
+                ON t.kind = p.kind AND t.doc_key = p.doc_key AND t.version = p.version
+            ORDER BY p.term, p.kind, p.doc_key
+        """)
+        conn.execute("DROP TABLE search_postings")
+        conn.execute("ALTER TABLE search_postings_compacted RENAME TO search_postings")
+        conn.execute("DELETE FROM search_postings_delta")
+        conn.execute("DELETE FROM search_tombstones")
+        stats = conn.execute("""
+            SELECT kind, sum(documents), sum(total_length) FROM search_stats GROUP BY kind
+        """).fetchall()
+        conn.execute("DELETE FROM search_stats")
+        if stats:
+            conn.executemany("INSERT INTO search_stats (kind, documents, total_length) VALUES (?, ?, ?)", stats)
+        if transactional:
+            conn.execute("COMMIT")
+    except Exception:
+        if transactional:
+            try:
+                conn.execute("ROLLBACK")
+            except duckdb.Error:
+                pass
+        raise
+
+
+def clear_index(conn) -> None:
+    """Remove every indexed document (with ``clear_all_data``)."""
+    conn.execute("DELETE FROM search_postings")
+    conn.execute("DELETE FROM search_postings_delta")
+    conn.execute("DELETE FROM search_tombstones")
+    conn.execute("DELETE FROM search_documents")
+    conn.execute("DELETE FROM search_stats")
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A ranked search result; ``key`` is the entity id (entities, profiles) or doc id (narratives)."""
+
+    kind: str
+    key: str
+    score: float
+    # Entity label, or the doc id of a narrative
+    title: str
+    snippet: str
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    """One page of hits, with the total number of matching documents."""
+
+    hits: List[SearchHit]
+    total: int
+    offset: int
+
+
+def query_terms(conn, query: str) -> List[str]:
+    """Distinct index terms of a search query, in query order."""
+    row = conn.execute(f"SELECT {_tokens_sql('?')}", [query]).fetchone()
+    return list(dict.fromkeys(row[0] if row and row[0] else []))[:MAX_QUERY_TERMS]
+
+
+def search(
+    conn,
+    query: str,
+    kinds: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> SearchPage:
+    """Rank documents matching any term of ``query`` by BM25.
+
+    Args:
+        conn: DuckDB connection or connection manager
+        query: Free text
+        kinds: Restrict to these document kinds (default: all)
+        limit: Hits per page
+        offset: Hits to skip (``offset + limit`` for the next page)
+    """
+    terms = query_terms(conn, query)
+    kinds = list(kinds or SOURCES)
+    if not terms or not kinds:
+        return SearchPage(hits=[], total=0, offset=offset)
+
+    # A plain IN list: the zone maps of search_postings prune row groups for
+    # it, but not for list_contains
+    term_list = ", ".join(f"$term_{index}" for index in range(len(terms)))
+    ranked = conn.execute(f"""
+        WITH matches AS MATERIALIZED (
+            SELECT p.* FROM (
+                SELECT * FROM search_postings WHERE term IN ({term_list})
+                UNION ALL
+                SELECT * FROM search_postings_delta WHERE term IN ({term_list})
+            ) p
+            ANTI JOIN search_tombstones t
+                ON t.kind = p.kind AND t.doc_key = p.doc_key AND t.version = p.version
+            WHERE list_contains($kinds, p.kind)
+        ),
+        -- Inverse document frequency and average length, once per (kind, term)
+        weights AS (
+            SELECT
+                df.kind, df.term,
+                ln(1 + (s.documents - df.documents + 0.5) / (df.documents + 0.5)) AS idf,
+                greatest(s.total_length / greatest(s.documents, 1), 1) AS average_length
+            FROM (
+                SELECT kind, term, count(*) AS documents FROM matches GROUP BY kind, term
+            ) df
+            JOIN (
+                SELECT kind, sum(documents) AS documents, sum(total_length) AS total_length
+                FROM search_stats GROUP BY kind
+            ) s ON s.kind = df.kind
+        ),
+        ranked AS (
+            -- A version identifies one document; kind and key are looked up
+            -- for the page only, since grouping by them is much slower
+            SELECT
+                m.version,
+                sum(w.idf * m.frequency * ($k1 + 1)
+                    / (m.frequency + $k1 * (1 - $b + $b * m.length / w.average_length))) AS score
+            FROM matches m
+            JOIN weights w ON w.kind = m.kind AND w.term = m.term
+            GROUP BY m.version
+        ),
+        page AS (
+            SELECT version, score, count(*) OVER () AS total
+            FROM ranked
+            ORDER BY score DESC, version
+            LIMIT $limit OFFSET $offset
+        )
+        SELECT any_value(m.kind), any_value(m.doc_key), page.score, page.total
+        FROM page
+        JOIN matches m ON m.version = page.version
+        GROUP BY page.version, page.score, page.total
+        ORDER BY page.score DESC, page.version
+    """, {
+        **{f"term_{index}": term for index, term in enumerate(terms)},
+        "kinds": kinds,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "limit": limit,
+        "offset": offset,
+    }).fetchall()
+    texts = _hit_texts(conn, [(kind, key) for kind, key, _, _ in ranked])
+    hits = []
+    for kind, key, score, _ in ranked:
+        title, text = texts.get((kind, key), (None, None))
+        hits.append(SearchHit(
+            kind=kind,
+            key=key,
+            score=score,
+            title=title or key,
+            snippet=(text or "")[:SNIPPET_LENGTH],
+        ))
+    return SearchPage(hits=hits, total=ranked[0][3] if ranked else 0, offset=offset)
+
+
+def _hit_texts(conn, hits: Sequence[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]]:
+    """``(title, text)`` of each ``(kind, key)`` hit.
+
+    Looked up per kind with an IN list of the page's keys, which reads a
+    handful of rows; joining the page against the source tables in the
+    ranking query scans them whole.
+    """
+    texts: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+    for kind in dict.fromkeys(kind for kind, _ in hits):
+        keys = [key for hit_kind, key in hits if hit_kind == kind]
+        params = {f"key_{index}": key for index, key in enumerate(keys)}
+        key_list = ", ".join(f"${name}" for name in params)
+        if kind == KIND_NARRATIVE:
+            query = f"SELECT doc_id, doc_id, narrative FROM narratives WHERE doc_id IN ({key_list})"
+        elif kind == KIND_PROFILE:
+            query = f"""
+                SELECT p.entity_id, e.label, p.summary FROM semantic_profiles p
+                LEFT JOIN entities e ON e.id = p.entity_id
+                WHERE p.entity_id IN ({key_list})
+            """
+        else:
+            query = f"SELECT id, label, label FROM entities WHERE id IN ({key_list})"
+        for key, title, text in conn.execute(query, params).fetchall():
+            texts[(kind, key)] = (title, text)
+    return texts
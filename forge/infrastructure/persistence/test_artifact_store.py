@@ -0,0 +1,33 @@
+"""Tests for the capped UI artifact store."""
+from forge.infrastructure.persistence.artifact_store import UIArtifactStore
+
+
+def _count(store):
+    return store._connection().execute("SELECT count(*) FROM ui_artifacts").fetchone()[0]
+
+
+def test_count_never_exceeds_cap(tmp_path):
+    store = UIArtifactStore(str(tmp_path / "ui_artifacts.duckdb"), max_rows=5, compact_every=200)
+    try:
+        for index in range(12):
+            store.add({"type": "card", "index": index})
+            # Re-adding an artifact only refreshes it
+            store.add({"type": "card", "index": 0})
+            assert _count(store) <= 5
+        assert {artifact["index"] for artifact in store.recent()} == {0, 8, 9, 10, 11}
+    finally:
+        store.close()
+
+
+def test_open_trims_file_over_cap(tmp_path):
+    path = str(tmp_path / "ui_artifacts.duckdb")
+    store = UIArtifactStore(path, max_rows=50)
+    for index in range(20):
+        store.add({"type": "card", "index": index})
+    store.close()
+
+    store = UIArtifactStore(path, max_rows=5)
+    try:
+        assert _count(store) == 5
+    finally:
+        store.close()
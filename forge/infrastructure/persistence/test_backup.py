@@ -0,0 +1,35 @@
+"""Tests for online database snapshots."""
+import duckdb
+import pytest
+
+from forge.infrastructure.persistence.backup import snapshot_database
+
+
+@pytest.mark.parametrize("source_name, target_name", [
+    ("my-case.duckdb", "my-case backup.duckdb"),
+    ("case 1.duckdb", "o'brien's case.duckdb"),
+])
+def test_snapshot_handles_names_needing_quotes(tmp_path, source_name, target_name):
+    conn = duckdb.connect(str(tmp_path / source_name))
+    conn.execute("CREATE TABLE entities (id VARCHAR PRIMARY KEY, label VARCHAR)")
+    conn.execute("""
+        CREATE TABLE relationships (
+            source VARCHAR REFERENCES entities(id),
+            target VARCHAR REFERENCES entities(id)
+        )
+    """)
+    conn.execute("INSERT INTO entities VALUES ('a', 'Alice'), ('b', 'Acme')")
+    conn.execute("INSERT INTO relationships VALUES ('a', 'b')")
+
+    target = tmp_path / target_name
+    progress = list(snapshot_database(conn.cursor(), str(target)))
+    conn.close()
+
+    assert progress[-1].done
+    assert {p.table: p.rows for p in progress if p.table} == {"entities": 2, "relationships": 1}
+    copy = duckdb.connect(str(target), read_only=True)
+    try:
+        assert copy.execute("SELECT count(*) FROM entities").fetchone()[0] == 2
+        assert copy.execute("SELECT count(*) FROM relationships").fetchone()[0] == 1
+    finally:
+        copy.close()
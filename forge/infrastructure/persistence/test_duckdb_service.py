@@ -0,0 +1,71 @@
+"""Tests for DuckDBPersistenceService graph upserts."""
+import asyncio
+import logging
+
+from forge.core.event_bus import EventBus
+from forge.infrastructure.persistence import graph_stats
+from forge.infrastructure.persistence.duckdb_service import DuckDBPersistenceService
+
+
+async def _upsert(persistence, nodes, edges=()):
+    await persistence.writer.execute(lambda conn: persistence._upsert_graph_delta(conn, nodes, list(edges)))
+
+
+async def _retype(persistence):
+    await _upsert(
+        persistence,
+        [
+            {"id": "alice", "type": "PERSON", "label": "Alice"},
+            {"id": "acme", "type": "ORGANIZATION", "label": "Acme"},
+            {"id": "paris", "type": "PERSON", "label": "Paris"},
+        ],
+        [{"source": "alice", "target": "acme", "type": "WORKS_AT", "doc_id": "doc1"}],
+    )
+    await _upsert(persistence, [
+        {"id": "alice", "type": "LOCATION", "label": "Alice"},
+        {"id": "paris", "type": "LOCATION", "label": "Paris"},
+    ])
+    return dict(persistence.conn.execute("SELECT id, type FROM entities").fetchall())
+
+
+def test_retypes_skip_referenced_entities_and_log_them(tmp_path, caplog):
+    persistence = DuckDBPersistenceService(EventBus(), db_path=str(tmp_path / "forge.duckdb"))
+    persistence.connect()
+    try:
+        with caplog.at_level(logging.WARNING):
+            types = asyncio.run(_retype(persistence))
+        stats = persistence.get_graph_stats()
+    finally:
+        persistence.close()
+
+    # The unreferenced entity is retyped; the referenced one keeps its type
+    assert types == {"alice": "PERSON", "acme": "ORGANIZATION", "paris": "LOCATION"}
+    assert "alice (PERSON -> LOCATION)" in caplog.text
+    assert stats.entity_types == {"PERSON": 1, "ORGANIZATION": 1, "LOCATION": 1}
+
+
+async def _grow(persistence, count):
+    for index in range(count):
+        await _upsert(
+            persistence,
+            [{"id": f"person{index}", "type": "PERSON", "label": f"Person {index}"}],
+            [{"source": f"person{index}", "target": "acme", "type": "WORKS_AT", "doc_id": f"doc{index % 3}"}],
+        )
+
+
+def test_counters_stay_folded_as_the_graph_grows(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_stats, "COMPACT_COUNTER_ROWS", 10)
+    persistence = DuckDBPersistenceService(EventBus(), db_path=str(tmp_path / "forge.duckdb"))
+    persistence.connect()
+    try:
+        asyncio.run(_upsert(persistence, [{"id": "acme", "type": "ORGANIZATION", "label": "Acme"}]))
+        asyncio.run(_grow(persistence, 40))
+        rows = persistence.conn.execute("SELECT count(*) FROM graph_stats").fetchone()[0]
+        stats = persistence.get_graph_stats()
+    finally:
+        persistence.close()
+
+    # 7 counters: entities, relationships, two types and three documents
+    assert rows <= 14
+    assert stats.entities == 41 and stats.relationships == 40 and stats.documents == 3
+    assert stats.entity_types == {"ORGANIZATION": 1, "PERSON": 40}
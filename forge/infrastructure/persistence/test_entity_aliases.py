@@ -0,0 +1,56 @@
+"""Tests for entity merge lineage."""
+import duckdb
+
+from forge.core.event_bus import EventBus
+from forge.infrastructure.persistence import entity_aliases, migrations
+from forge.infrastructure.persistence.duckdb_service import DuckDBPersistenceService
+
+
+def _graph(conn):
+    migrations.migrate(conn)
+    conn.execute("""
+        INSERT INTO entities (id, type, label) VALUES
+            ('a', 'PERSON', 'A'), ('b', 'PERSON', 'B'), ('c', 'PERSON', 'C'), ('d', 'ORGANIZATION', 'D')
+    """)
+    conn.execute("""
+        INSERT INTO relationships (source, target, type, confidence, doc_id) VALUES
+            ('b', 'd', 'WORKS_AT', 0.9, 'doc1'), ('c', 'd', 'WORKS_AT', 0.8, 'doc2')
+    """)
+
+
+def test_chained_merges_keep_the_direct_parent():
+    conn = duckdb.connect(":memory:")
+    _graph(conn)
+
+    applied = entity_aliases.merge_entities(conn, [("a", "b"), ("b", "c")])
+
+    assert sorted(applied) == [("a", "b"), ("a", "c")]
+    rows = dict(conn.execute("SELECT alias_id, merged_into FROM entity_aliases").fetchall())
+    assert rows == {"b": "a", "c": "b"}
+    assert entity_aliases.resolve(conn, ["c"]) == {"c": "a"}
+    assert entity_aliases.merge_lineage(conn, "c") == ["b", "a"]
+
+
+def test_interrupted_merge_is_completed_on_open(tmp_path):
+    path = str(tmp_path / "forge.duckdb")
+    conn = duckdb.connect(path)
+    _graph(conn)
+    # Only the first transaction of the batch ran before the process stopped
+    plan = entity_aliases.plan_merges([("a", "b")], {})
+    conn.execute("CREATE TEMP TABLE merge_plan (alias_id VARCHAR, canonical_id VARCHAR, merged_into VARCHAR)")
+    conn.executemany("INSERT INTO merge_plan VALUES (?, ?, ?)", plan)
+    entity_aliases._merge_relationships(conn)
+    conn.close()
+
+    persistence = DuckDBPersistenceService(EventBus(), db_path=path)
+    persistence.connect()
+    try:
+        persistence.writer.flush()
+        ids = {row[0] for row in persistence.conn.execute("SELECT id FROM entities").fetchall()}
+        assert entity_aliases.pending_merges(persistence.conn) == []
+        sources = persistence.conn.execute("SELECT DISTINCT source FROM relationships ORDER BY 1").fetchall()
+    finally:
+        persistence.close()
+
+    assert ids == {"a", "c", "d"}
+    assert sources == [("a",), ("c",)]
@@ -0,0 +1,21 @@
+"""Tests for schema migrations."""
+import duckdb
+
+from forge.infrastructure.persistence import migrations
+
+
+def test_migrating_from_v6_defers_the_search_backfill():
+    conn = duckdb.connect(":memory:")
+    migrations.migrate(conn, target=6)
+    assert migrations.current_version(conn) == 6
+
+    deferred = migrations.migrate(conn, defer_online=True)
+
+    # The later offline steps are applied; only the online backfill is left over
+    assert [migration.version for migration in deferred] == [7]
+    assert migrations.current_version(conn) == migrations.SCHEMA_VERSION
+    assert migrations.pending_migrations(conn) == deferred
+
+    migrations.apply_migrations(conn, deferred)
+    assert migrations.pending_migrations(conn) == []
+    assert migrations.applied_versions(conn) == {migration.version for migration in migrations.MIGRATIONS}
@@ -0,0 +1,22 @@
+"""Tests for keyset-paginated reads."""
+import duckdb
+
+from forge.infrastructure.persistence import migrations, pagination
+
+
+def test_pages_of_rows_with_identical_values_skip_and_repeat_nothing():
+    conn = duckdb.connect(":memory:")
+    migrations.migrate(conn)
+    conn.executemany("INSERT INTO entities (id, type, label) VALUES (?, 'PERSON', ?)", [("a", "A"), ("b", "B")])
+    # Identical relationships apart from their id, in different documents
+    conn.executemany(
+        "INSERT INTO relationships (source, target, type, confidence, doc_id) VALUES ('a', 'b', 'KNOWS', 0.5, ?)",
+        [(f"doc{i}",) for i in range(10)],
+    )
+    expected = [row[0] for row in conn.execute("SELECT id FROM relationships ORDER BY id").fetchall()]
+
+    pages = list(pagination.iter_relationship_pages(conn, columns=["confidence"], min_confidence=0.5, batch_size=3))
+
+    assert [page.num_rows for page in pages] == [3, 3, 3, 1]
+    assert [row_id for page in pages for row_id in page.column("id").to_pylist()] == expected
+    conn.close()
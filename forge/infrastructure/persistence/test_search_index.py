@@ -0,0 +1,76 @@
+"""Tests for the BM25 search index."""
+import duckdb
+import pytest
+
+from forge.infrastructure.persistence import migrations, search_index
+
+
+def _put(conn, entity_id, label):
+    conn.execute("""
+        INSERT INTO entities (id, type, label) VALUES (?, 'ORGANIZATION', ?)
+        ON CONFLICT (id) DO UPDATE SET label = excluded.label
+    """, [entity_id, label])
+    search_index.sync_documents(conn, search_index.KIND_ENTITY, [entity_id])
+
+
+def _delete(conn, entity_id):
+    conn.execute("DELETE FROM entities WHERE id = ?", [entity_id])
+    search_index.sync_documents(conn, search_index.KIND_ENTITY, [entity_id])
+
+
+def _keys(conn, query):
+    return [hit.key for hit in search_index.search(conn, query).hits]
+
+
+def _stats(conn):
+    return conn.execute("""
+        SELECT kind, sum(documents), sum(total_length) FROM search_stats GROUP BY kind
+    """).fetchall()
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect(":memory:")
+    migrations.migrate(conn)
+    _put(conn, "acme", "Acme Acme Corporation")
+    _put(conn, "holdings", "Acme Holdings Group International")
+    _put(conn, "globex", "Globex")
+    yield conn
+    conn.close()
+
+
+def test_ranks_by_term_frequency_and_length(conn):
+    # More occurrences in a shorter label rank first; non-matching documents are left out
+    assert _keys(conn, "acme") == ["acme", "holdings"]
+    assert _keys(conn, "ACMÉ group") == ["holdings", "acme"]
+    assert _keys(conn, "globex") == ["globex"]
+
+
+def test_updated_and_deleted_documents_disappear_before_and_after_compaction(conn):
+    _put(conn, "holdings", "Initech Holdings")
+    _delete(conn, "acme")
+
+    assert _keys(conn, "acme") == []
+    assert _keys(conn, "initech holdings") == ["holdings"]
+
+    search_index.compact(conn)
+
+    assert _keys(conn, "acme") == []
+    assert _keys(conn, "initech holdings") == ["holdings"]
+    assert conn.execute("SELECT count(*) FROM search_postings_delta").fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM search_tombstones").fetchone()[0] == 0
+
+
+def test_stats_match_indexed_documents_after_compaction(conn):
+    _put(conn, "holdings", "Initech")
+    _delete(conn, "globex")
+    _put(conn, "umbrella", "Umbrella Corporation")
+    expected = conn.execute("""
+        SELECT kind, count(*), sum(length) FROM search_documents GROUP BY kind
+    """).fetchall()
+
+    assert _stats(conn) == expected
+    search_index.compact(conn)
+
+    assert _stats(conn) == expected
+    assert conn.execute("SELECT count(*) FROM search_stats").fetchone()[0] == len(expected)
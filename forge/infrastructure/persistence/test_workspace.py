@@ -0,0 +1,85 @@
+"""Tests for the multi-project workspace."""
+import threading
+
+import duckdb
+import pytest
+
+from forge.infrastructure.persistence import migrations
+from forge.infrastructure.persistence.connection_manager import DuckDBConnectionManager
+from forge.infrastructure.persistence.workspace import ProjectWorkspace
+
+
+def _project(path, entities, target=None):
+    conn = duckdb.connect(str(path))
+    try:
+        migrations.migrate(conn, target=target)
+        conn.executemany("INSERT INTO entities (id, type, label) VALUES (?, ?, ?)", entities)
+    finally:
+        conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    home = _project(tmp_path / "home.duckdb", [
+        ("home:acme", "ORGANIZATION", "Acme"),
+        ("home:alice", "PERSON", "Alice"),
+    ])
+    db = DuckDBConnectionManager()
+    db.open(home, initialize=migrations.migrate)
+    yield ProjectWorkspace(db)
+    db.close()
+
+
+def _pending(db, alias):
+    cursor = db.open_cursor()
+    try:
+        cursor.execute(f'USE "{alias}"')
+        return migrations.pending_migrations(cursor)
+    finally:
+        cursor.close()
+
+
+def test_attach_queues_online_migrations_on_the_writer(workspace, tmp_path):
+    path = _project(tmp_path / "old.duckdb", [("old:acme", "ORGANIZATION", "Acme")], target=6)
+    home = workspace.db.writer.submit(
+        lambda conn: conn.execute("SELECT current_database()").fetchall()[0][0]
+    ).result()
+
+    # Hold the writer so the queued migration cannot run yet
+    release = threading.Event()
+    workspace.db.writer.submit(lambda conn: release.wait(5))
+    project = workspace.attach(path)
+    assert [migration.version for migration in _pending(workspace.db, project.alias)] == [7]
+    release.set()
+    workspace.db.writer.flush()
+
+    assert _pending(workspace.db, project.alias) == []
+    # The writer is back on the database it was using
+    assert workspace.db.writer.submit(
+        lambda conn: conn.execute("SELECT current_database()").fetchall()[0][0]
+    ).result() == home
+
+
+def test_cross_project_queries(workspace, tmp_path):
+    beta = workspace.attach(_project(tmp_path / "beta.duckdb", [
+        ("beta:acme", "ORGANIZATION", "ACME"),
+        ("beta:bob", "PERSON", "Bob"),
+    ]))
+    gamma = workspace.attach(_project(tmp_path / "gamma.duckdb", [
+        ("gamma:acme", "ORGANIZATION", "acme"),
+        ("gamma:alice", "PERSON", "Alice"),
+        ("gamma:alice-place", "LOCATION", "Alice"),
+    ]), read_only=True)
+
+    assert [(row["project"], row["id"]) for row in workspace.entity_occurrences("acme")] == [
+        (None, "home:acme"), (beta.alias, "beta:acme"), (gamma.alias, "gamma:acme"),
+    ]
+    assert [row["id"] for row in workspace.entity_occurrences("alice", "PERSON")] == ["home:alice", "gamma:alice"]
+
+    shared = workspace.shared_entities()
+    assert [(row["type"], row["label"].lower(), row["projects"]) for row in shared] == [
+        ("ORGANIZATION", "acme", [None, beta.alias, gamma.alias]),
+        ("PERSON", "alice", [None, gamma.alias]),
+    ]
+    assert len(workspace.shared_entities(min_projects=3)) == 1
@@ -0,0 +1,79 @@
+"""Tests for DuckDBWriter group commit."""
+import duckdb
+import pytest
+
+from forge.infrastructure.persistence.writer import DuckDBWriter
+
+
+def _insert(value):
+    return lambda cursor: cursor.execute("INSERT INTO items VALUES (?)", (value,))
+
+
+def _fail(cursor):
+    cursor.execute("INSERT INTO items VALUES (2)")
+    raise ValueError("command failed")
+
+
+def _values(conn):
+    return [row[0] for row in conn.execute("SELECT value FROM items ORDER BY value").fetchall()]
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE items (value INTEGER)")
+    yield conn
+    conn.close()
+
+
+def test_failing_command_does_not_roll_back_its_batch(conn):
+    # A long delay and a batch size of three keep all commands in one transaction
+    writer = DuckDBWriter(conn, max_batch=3, max_delay=5.0)
+    writer.start()
+    try:
+        futures = [writer.submit(_insert(1)), writer.submit(_fail), writer.submit(_insert(3))]
+        assert futures[0].result(5) is not None
+        with pytest.raises(ValueError, match="command failed"):
+            futures[1].result(5)
+        assert futures[2].result(5) is not None
+    finally:
+        writer.stop()
+
+    assert _values(conn) == [1, 3]
+
+
+def test_isolated_command_runs_outside_the_batch_transaction(conn):
+    def isolated(cursor):
+        # BEGIN fails inside an open transaction
+        cursor.execute("BEGIN TRANSACTION")
+        count = cursor.execute("SELECT count(*) FROM items").fetchall()[0][0]
+        cursor.execute("ROLLBACK")
+        return count
+
+    writer = DuckDBWriter(conn, max_batch=10, max_delay=0.5)
+    writer.start()
+    try:
+        before = writer.submit(_insert(1))
+        count = writer.submit(isolated, isolated=True)
+        after = writer.submit(_insert(2))
+        # The batch is cut at the isolated command, which sees it committed
+        assert count.result(5) == 1
+        before.result(5)
+        after.result(5)
+    finally:
+        writer.stop()
+
+    assert _values(conn) == [1, 2]
+
+
+def test_stop_commits_queued_commands_and_rejects_new_ones(conn):
+    writer = DuckDBWriter(conn, max_batch=4, max_delay=5.0)
+    writer.start()
+    futures = [writer.submit(_insert(value)) for value in range(10)]
+    writer.stop()
+
+    assert all(future.done() and future.exception() is None for future in futures)
+    assert _values(conn) == list(range(10))
+    assert writer.commits >= 3
+    with pytest.raises(RuntimeError):
+        writer.submit(_insert(10))
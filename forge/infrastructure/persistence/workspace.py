@@ -0,0 +1,265 @@
+"""Multi-project workspace for PyScrAI Forge.
+
+A ``ProjectWorkspace`` keeps several project database files attached to
+the one DuckDB instance of the ``DuckDBConnectionManager``, read-write or
+read-only. Exactly one project is active: the writer and every read cursor
+use it as their default database, so services keep their unqualified
+queries and switching projects is a ``USE`` rather than closing and
+reopening the database (the attached files stay warm in the buffer pool).
+
+The project opened by the manager itself is the workspace's home project
+(alias None). Read-write projects are migrated to the current schema when
+attached, except for online migrations, which are queued on the writer so
+that attaching never waits for a backfill; read-only ones must already be
+current.
+
+Cross-project queries read every attached project through qualified
+``"<alias>".entities`` names, e.g. ``entity_occurrences`` finds an entity
+by label in all projects.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import duckdb
+
+from forge.infrastructure.persistence import migrations
+from forge.infrastructure.persistence.connection_manager import DuckDBConnectionManager
+
+logger = logging.getLogger(__name__)
+
+# Database names DuckDB reserves or creates itself
+_RESERVED_ALIASES = {"main", "memory", "system", "temp"}
+
+
+@dataclass(frozen=True)
+class Project:
+    """An attached project database."""
+
+    alias: Optional[str]
+    path: str
+    read_only: bool
+    active: bool
+
+
+class ProjectWorkspace:
+    """Attaches project databases and switches the active one."""
+
+    def __init__(
+        self,
+        db: DuckDBConnectionManager,
+        initialize: Optional[Callable[[duckdb.DuckDBPyConnection], Any]] = None,
+    ):
+        """
+        Args:
+            db: Connection manager whose instance the projects are attached to
+            initialize: Schema setup of read-write projects (default: ``migrations.migrate``,
+                with online migrations applied afterwards on the writer)
+        """
+        self.db = db
+        self._initialize = initialize
+
+    def projects(self) -> List[Project]:
+        """Home project first, then the attached projects by alias."""
+        if not self.db:
+            return []
+        home = Project(None, str(Path(self.db.db_path).resolve()), False, self.db.catalog is None)
+        attached = [
+            Project(alias, str(Path(path).resolve()), read_only, alias == self.db.catalog)
+            for alias, path, read_only in self._attached().values()
+        ]
+        return [home] + sorted(attached, key=lambda project: project.alias)
+
+    def project(self, path: str) -> Optional[Project]:
+        """The attached project of a database file, if any."""
+        resolved = str(Path(path).resolve())
+        return next((project for project in self.projects() if project.path == resolved), None)
+
+    @property
+    def active(self) -> Optional[Project]:
+        return next((project for project in self.projects() if project.active), None)
+
+    def attach(self, path: str, read_only: bool = False, alias: Optional[str] = None) -> Project:
+        """Attach a project database file (no-op if it already is attached).
+
+        Args:
+            path: Project ``.duckdb`` file
+            read_only: Attach without write access
+            alias: Name of the project in cross-project results (default: from the file name)
+
+        Raises:
+            ValueError: If a read-only project needs a schema upgrade
+        """
+        existing = self.project(path)
+        if existing is not None:
+            return existing
+        if read_only and not Path(path).is_file():
+            raise FileNotFoundError(f"Project file not found: {path}")
+        alias = alias or self._free_alias(Path(path).stem)
+
+        def check_schema(conn: duckdb.DuckDBPyConnection) -> None:
+            pending = migrations.pending_migrations(conn)
+            if pending:
+                raise ValueError(
+                    f"Project {path} uses schema v{pending[0].version - 1}; "
+                    f"attach it read-write once to upgrade it to v{migrations.SCHEMA_VERSION}"
+                )
+
+        deferred: List[migrations.Migration] = []
+
+        def migrate(conn: duckdb.DuckDBPyConnection) -> None:
+            deferred.extend(migrations.migrate(conn, defer_online=True))
+
+        initialize = check_schema if read_only else (self._initialize or migrate)
+        self.db.attach(path, alias, read_only=read_only, initialize=initialize)
+        if deferred:
+            self._start_online_migrations(alias, deferred)
+        return Project(alias, str(Path(path).resolve()), read_only, False)
+
+    def detach(self, alias: str) -> None:
+        """Detach a project; the active project cannot be detached."""
+        self.db.detach(alias)
+
+    def switch(self, alias: Optional[str]) -> Project:
+        """Make a project active (None: the home project).
+
+        Raises:
+            KeyError: If no project is attached under ``alias``
+        """
+        if alias is None:
+            self.db.use(None)
+        else:
+            attached = self._attached()
+            if alias not in attached:
+                raise KeyError(f"No project attached as {alias}")
+            self.db.use(alias, attached[alias][1])
+        return self.active
+
+    def entity_occurrences(self, label: str, entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entities with this label (case-insensitive) in every project.
+
+        Returns:
+            Dicts with ``project`` (alias, None for the home project), ``id``,
+            ``type`` and ``label``
+        """
+        catalogs = self._graph_catalogs()
+        if not catalogs:
+            return []
+        type_filter = "AND type = $type" if entity_type else ""
+        union = " UNION ALL ".join(
+            f"SELECT {_literal(alias)} AS project, id, type, label FROM {_qualified(catalog)} "
+            f"WHERE lower(label) = lower($label) {type_filter}"
+            for alias, catalog in catalogs
+        )
+        params: Dict[str, Any] = {"label": label}
+        if entity_type:
+            params["type"] = entity_type
+        rows = self.db.execute(f"SELECT * FROM ({union}) ORDER BY project NULLS FIRST, id", params).fetchall()
+        return [
+            {"project": project, "id": entity_id, "type": kind, "label": text}
+            for project, entity_id, kind, text in rows
+        ]
+
+    def shared_entities(self, min_projects: int = 2, limit: int = 100) -> List[Dict[str, Any]]:
+        """Entities (by type and case-insensitive label) found in several projects.
+
+        Returns:
+            Dicts with ``type``, ``label`` and the ``projects`` they occur in,
+            most widely shared first
+        """
+        catalogs = self._graph_catalogs()
+        if len(catalogs) < max(min_projects, 1):
+            return []
+        union = " UNION ALL ".join(
+            f"SELECT {_literal(alias)} AS project, type, label FROM {_qualified(catalog)}"
+            for alias, catalog in catalogs
+        )
+        rows = self.db.execute(f"""
+            SELECT type, any_value(label), list(DISTINCT project ORDER BY project NULLS FIRST)
+            FROM ({union})
+            GROUP BY type, lower(label)
+            HAVING count(DISTINCT coalesce(project, '')) >= ?
+            ORDER BY count(DISTINCT coalesce(project, '')) DESC, lower(label), type
+            LIMIT ?
+        """, [min_projects, limit]).fetchall()
+        return [{"type": kind, "label": text, "projects": projects} for kind, text, projects in rows]
+
+    def _start_online_migrations(self, alias: str, pending: List[migrations.Migration]) -> None:
+        """Apply deferred online migrations of an attached project on the writer.
+
+        The command switches the writer cursor to the project for the
+        migrations and back to the database it was using.
+        """
+        writer = self.db.writer
+        if writer is None:
+            return
+
+        def apply(conn: duckdb.DuckDBPyConnection) -> None:
+            previous = conn.execute("SELECT current_database()").fetchall()[0][0]
+            conn.execute(f'USE "{alias}"')
+            try:
+                migrations.apply_migrations(conn, pending)
+            finally:
+                conn.execute(f'USE "{previous}"')
+
+        def done(future) -> None:
+            if future.exception() is not None:
+                logger.error(f"Online schema migration of project {alias} failed: {future.exception()}")
+
+        writer.submit(apply, isolated=True).add_done_callback(done)
+
+    def _attached(self) -> Dict[str, tuple]:
+        """``alias -> (alias, path, read_only)`` of the databases attached besides the home one."""
+        if not self.db:
+            return {}
+        return {row[0]: row for row in self._databases() if Path(row[1]).resolve() != self._home_path()}
+
+    def _databases(self) -> List[tuple]:
+        return self.db.execute("""
+            SELECT database_name, path, readonly FROM duckdb_databases()
+            WHERE NOT internal AND path IS NOT NULL
+        """).fetchall()
+
+    def _home_path(self) -> Path:
+        return Path(self.db.db_path).resolve()
+
+    def _graph_catalogs(self) -> List[Tuple[Optional[str], str]]:
+        """``(alias, database name)`` of the projects holding a graph (alias None for the home project)."""
+        rows = self.db.execute("""
+            SELECT DISTINCT table_catalog FROM information_schema.tables
+            WHERE table_schema = 'main' AND table_name = 'entities'
+        """).fetchall()
+        present = {row[0] for row in rows}
+        catalogs: List[Tuple[Optional[str], str]] = []
+        for name, path, _ in self._databases():
+            if name not in present:
+                continue
+            if Path(path).resolve() == self._home_path():
+                catalogs.insert(0, (None, name))
+            else:
+                catalogs.append((name, name))
+        return catalogs
+
+    def _free_alias(self, stem: str) -> str:
+        base = re.sub(r"\W+", "_", stem).strip("_").lower() or "project"
+        if base[0].isdigit():
+            base = f"p_{base}"
+        taken = {row[0] for row in self.db.execute("SELECT database_name FROM duckdb_databases()").fetchall()}
+        taken |= _RESERVED_ALIASES
+        alias, suffix = base, 2
+        while alias in taken:
+            alias, suffix = f"{base}_{suffix}", suffix + 1
+        return alias
+
+
+def _qualified(catalog: str) -> str:
+    return '"{}".main.entities'.format(catalog.replace('"', '""'))
+
+
+def _literal(alias: Optional[str]) -> str:
+    return "NULL::VARCHAR" if alias is None else "'{}'".format(alias.replace("'", "''"))
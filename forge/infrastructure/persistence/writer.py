@@ -0,0 +1,301 @@
+"""Single-writer thread for the PyScrAI Forge DuckDB database.
+
+``DuckDBWriter`` owns a dedicated cursor on a background thread and applies
+write commands taken from a queue. Commands are group-committed: the writer
+collects up to ``max_batch`` commands, or whatever arrives within
+``max_delay`` seconds of the first one, and runs them in one transaction.
+Each caller gets a future that resolves once its command is committed, so
+async handlers can await durability without blocking the event loop.
+
+A command is a callable taking the writer's cursor. It must not begin,
+commit or roll back transactions itself; if any command of a batch fails,
+the batch is rolled back and its commands are re-run one transaction each,
+so only the failing command reports an error.
+
+An optional ``prepare`` command runs once, outside a transaction, before the
+first command is applied (e.g. to turn a lazily opened project into tables);
+until it succeeds, the commands waiting on it fail with its error.
+
+Commands write to the writer's default database, which ``use`` switches
+to another attached database in queue order (see ``workspace``). The
+``prepare`` command belongs to the database the writer was opened on and
+only runs once a command writes there.
+
+``commits`` counts the transactions (and isolated commands) applied so far.
+It changes with every write made through the writer, so readers can use it
+as a cheap version of the database instead of scanning tables.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+# Maximum commands committed in one transaction
+WRITER_MAX_BATCH = 64
+# Seconds to wait for more commands after the first one of a batch
+WRITER_MAX_DELAY = 0.01
+
+WriteCommand = Callable[[duckdb.DuckDBPyConnection], Any]
+
+
+@dataclass
+class _Command:
+    fn: Optional[WriteCommand]
+    future: Future = field(default_factory=Future)
+    # Run outside a transaction (DDL, CHECKPOINT)
+    isolated: bool = False
+    # Needs the prepare command to have run first
+    writes: bool = True
+
+
+# Queue sentinel asking the thread to finish pending work and exit
+_STOP = _Command(fn=None)
+
+
+class DuckDBWriter:
+    """Serializes and group-commits writes on a background thread."""
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        max_batch: int = WRITER_MAX_BATCH,
+        max_delay: float = WRITER_MAX_DELAY,
+        prepare: Optional[WriteCommand] = None,
+    ):
+        """
+        Args:
+            conn: Connection to the database; the writer uses its own cursor of it
+            max_batch: Maximum commands per transaction
+            max_delay: Seconds to wait for more commands before committing a batch
+            prepare: Run once before the first write
+        """
+        self._conn = conn
+        self._max_batch = max(1, max_batch)
+        self._max_delay = max(0.0, max_delay)
+        self._queue: "queue.Queue[_Command]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._cursor: Optional[duckdb.DuckDBPyConnection] = None
+        # Command taken from the queue that could not join the previous batch
+        self._held: Optional[_Command] = None
+        self._prepare = prepare
+        # Default database set by ``use`` (None: the database opened on)
+        self._catalog: Optional[str] = None
+        self._home: Optional[str] = None
+        self._lock = threading.Lock()
+        # Bumped after every commit, before the committed futures resolve
+        self._commits = 0
+
+    @property
+    def commits(self) -> int:
+        """Number of transactions and isolated commands applied so far."""
+        return self._commits
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Open the writer cursor and start the writer thread."""
+        with self._lock:
+            if self.running:
+                return
+            self._cursor = self._conn.cursor()
+            self._home = self._cursor.execute("SELECT current_database()").fetchall()[0][0]
+            self._thread = threading.Thread(target=self._run, name="duckdb-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Commit everything queued so far, then stop the thread and close its cursor."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("DuckDB writer did not stop within the timeout")
+                return
+            self._thread = None
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+    def submit(self, fn: WriteCommand, isolated: bool = False) -> Future:
+        """Queue a write command.
+
+        Args:
+            fn: Callable receiving the writer cursor; its return value becomes the future's result
+            isolated: Run the command alone, outside a transaction (e.g. CHECKPOINT)
+
+        Returns:
+            Future resolved after the command's transaction commits
+        """
+        if not self.running:
+            raise RuntimeError("DuckDB writer is not running")
+        command = _Command(fn=fn, isolated=isolated)
+        self._queue.put(command)
+        return command.future
+
+    def use(self, catalog: Optional[str]) -> Future:
+        """Queue a switch of the default database that later commands write to.
+
+        Args:
+            catalog: Name of an attached database, or None for the database
+                the writer was opened on
+        """
+        if not self.running:
+            raise RuntimeError("DuckDB writer is not running")
+        def switch(cursor: duckdb.DuckDBPyConnection) -> None:
+            cursor.execute(f'USE "{catalog or self._home}"')
+            self._catalog = catalog
+
+        command = _Command(fn=switch, isolated=True, writes=False)
+        self._queue.put(command)
+        return command.future
+
+    async def execute(self, fn: WriteCommand, isolated: bool = False) -> Any:
+        """Queue a write command and await its commit."""
+        return await asyncio.wrap_future(self.submit(fn, isolated=isolated))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every command queued before this call is committed."""
+        if self.running:
+            self.submit(lambda conn: None).result(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch and batch[0] is _STOP:
+                self._fail_pending()
+                return
+            if (
+                self._prepare is not None
+                and self._catalog is None
+                and batch[0].writes
+                and not self._run_prepare(batch)
+            ):
+                continue
+            if len(batch) == 1 and batch[0].isolated:
+                self._run_isolated(batch[0])
+            else:
+                self._run_batch(batch)
+
+    def _next_batch(self) -> List[_Command]:
+        """Collect commands for one transaction.
+
+        Isolated commands and the stop sentinel always form a batch of their
+        own; when one arrives mid-batch it is held for the next round.
+        """
+        first = self._held if self._held is not None else self._queue.get()
+        self._held = None
+        if first is _STOP or first.isolated:
+            return [first]
+
+        batch = [first]
+        deadline = time.monotonic() + self._max_delay
+        while len(batch) < self._max_batch:
+            try:
+                command = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    command = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if command is _STOP or command.isolated:
+                self._held = command
+                break
+            batch.append(command)
+        return batch
+
+    def _run_prepare(self, batch: List[_Command]) -> bool:
+        try:
+            self._prepare(self._cursor)
+        except Exception as e:
+            logger.error(f"DuckDB writer preparation failed: {e}")
+            self._rollback()
+            for command in batch:
+                if command.future.set_running_or_notify_cancel():
+                    command.future.set_exception(e)
+            return False
+        self._prepare = None
+        return True
+
+    def _run_batch(self, batch: List[_Command]) -> None:
+        batch = [command for command in batch if command.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        cursor = self._cursor
+        results = []
+        try:
+            cursor.execute("BEGIN TRANSACTION")
+            for command in batch:
+                results.append(command.fn(cursor))
+            cursor.execute("COMMIT")
+            self._commits += 1
+        except Exception as e:
+            self._rollback()
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # Re-run each command in its own transaction to isolate the failure
+            logger.debug(f"Write batch of {len(batch)} failed ({e}); retrying commands one by one")
+            for command in batch:
+                self._run_single(command)
+            return
+        for command, result in zip(batch, results):
+            command.future.set_result(result)
+
+    def _run_single(self, command: _Command) -> None:
+        cursor = self._cursor
+        try:
+            cursor.execute("BEGIN TRANSACTION")
+            result = command.fn(cursor)
+            cursor.execute("COMMIT")
+            self._commits += 1
+        except Exception as e:
+            self._rollback()
+            command.future.set_exception(e)
+            return
+        command.future.set_result(result)
+
+    def _run_isolated(self, command: _Command) -> None:
+        if not command.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = command.fn(self._cursor)
+        except Exception as e:
+            command.future.set_exception(e)
+            return
+        self._commits += 1
+        command.future.set_result(result)
+
+    def _fail_pending(self) -> None:
+        """Fail commands that were queued after the stop request."""
+        while True:
+            try:
+                command = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if command is not _STOP and command.future.set_running_or_notify_cancel():
+                command.future.set_exception(RuntimeError("DuckDB writer stopped"))
+
+    def _rollback(self) -> None:
+        try:
+            self._cursor.execute("ROLLBACK")
+        except duckdb.Error:
+            # No transaction is active (BEGIN itself failed)
+            pass
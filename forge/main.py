@@ -8,7 +8,7 @@ import logging.handlers
 import os
 import threading
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -32,7 +32,6 @@ from forge.infrastructure.llm.provider_factory import ProviderFactory
 from forge.presentation.renderer import set_event_bus
 from forge.domain.session.session_manager import SessionManager
 from forge.core.service_registry import set_session_manager
-import duckdb
 
 # Load environment variables from .env file in project root
 env_path = Path(__file__).parent.parent / ".env"
@@ -85,6 +84,9 @@ logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 logger.info(f"Logging configured: file={log_file_path}, console=WARNING+")
 
+# Service stop coroutines with the event loop they run on (see shutdown_services)
+_shutdown_hooks: List[Tuple[asyncio.AbstractEventLoop, Callable[[], Awaitable[None]]]] = []
+
 
 async def init_services(controller: AppController) -> None:
     """Initialize all services asynchronously."""
@@ -141,9 +143,9 @@ async def init_services(controller: AppController) -> None:
     await qdrant_service.start()
     logger.info("QdrantService started")
 
-    # Open DuckDB connection for intelligence services
-    db_connection = duckdb.connect(persistence_service.db_path)
-    logger.info(f"Database connection opened: {persistence_service.db_path}")
+    # Intelligence services share the persistence connection manager: per-thread
+    # read cursors of the same database instance, writes through its writer
+    db_connection = persistence_service.db
 
     # Initialize and start DeduplicationService (requires LLM provider)
     if llm_provider:
@@ -184,7 +186,8 @@ async def init_services(controller: AppController) -> None:
         narrative_service = NarrativeSynthesisService(
             controller.bus,
             llm_provider,
-            db_connection
+            db_connection,
+            graph_service=graph_service,
         )
         await narrative_service.start()
         logger.info("NarrativeSynthesisService started")
@@ -199,6 +202,8 @@ async def init_services(controller: AppController) -> None:
             db_connection
         )
         await advanced_graph_service.start()
+        # Owns the analytics worker processes, which must be shut down on exit
+        _shutdown_hooks.append((asyncio.get_running_loop(), advanced_graph_service.stop))
         logger.info("AdvancedGraphAnalysisService started")
     else:
         logger.warning("AdvancedGraphAnalysisService not started: LLM provider unavailable")
@@ -246,6 +251,18 @@ def _run_async_init(controller: AppController) -> None:
         loop.close()
 
 
+def shutdown_services(timeout: float = 10.0) -> None:
+    """Stop services holding worker processes, on the loops they run on."""
+    while _shutdown_hooks:
+        loop, stop = _shutdown_hooks.pop()
+        if loop.is_closed():
+            continue
+        try:
+            asyncio.run_coroutine_threadsafe(stop(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Error stopping service during shutdown: {e}")
+
+
 def main(page: ft.Page) -> None:
     """Main Flet application entry point."""
     logger.info("Initializing PyScrAI Forge...")
@@ -279,34 +296,38 @@ def main(page: ft.Page) -> None:
 
 
 if __name__ == "__main__":
-    # Support web mode for testing via environment variable
-    # When FLET_WEB_MODE=true, run in web mode (accessible via HTTP for Playwright)
-    # Otherwise, run as desktop app (FLET_APP)
-    if os.getenv("FLET_WEB_MODE") == "true":
-        port = int(os.getenv("FLET_PORT", "8550"))
-        logger.info(f"Starting Flet app in WEB mode on port {port} (for testing)")
+    try:
+        # Support web mode for testing via environment variable
+        # When FLET_WEB_MODE=true, run in web mode (accessible via HTTP for Playwright)
+        # Otherwise, run as desktop app (FLET_APP)
+        if os.getenv("FLET_WEB_MODE") == "true":
+            port = int(os.getenv("FLET_PORT", "8550"))
+            logger.info(f"Starting Flet app in WEB mode on port {port} (for testing)")
         
-        # DETERMINE RENDERER: Default to "html" for testing unless overridden
-        # "html" exposes text nodes to DOM, required for Playwright text selectors
-        renderer_env = os.getenv("FLET_WEB_RENDERER", "html").lower()
-        renderer = ft.WebRenderer.AUTO if renderer_env == "auto" else ft.WebRenderer.CANVAS_KIT
-        logger.info(f"Using web renderer: {renderer_env}")
-
-        # Try FLET_APP_WEB first (no browser window), fall back to WEB_BROWSER if needed
-        # In WSL2, we can suppress browser by unsetting DISPLAY if needed
-        view_mode = ft.AppView.FLET_APP_WEB
-        # If DISPLAY is not set or we want to suppress browser, FLET_APP_WEB should work
-        # Otherwise WEB_BROWSER will open a browser window (but Playwright can still connect)
-        if os.getenv("FLET_FORCE_WEB_BROWSER") == "true":
-            view_mode = ft.AppView.WEB_BROWSER
+            # DETERMINE RENDERER: Default to "html" for testing unless overridden
+            # "html" exposes text nodes to DOM, required for Playwright text selectors
+            renderer_env = os.getenv("FLET_WEB_RENDERER", "html").lower()
+            renderer = ft.WebRenderer.AUTO if renderer_env == "auto" else ft.WebRenderer.CANVAS_KIT
+            logger.info(f"Using web renderer: {renderer_env}")
+
+            # Try FLET_APP_WEB first (no browser window), fall back to WEB_BROWSER if needed
+            # In WSL2, we can suppress browser by unsetting DISPLAY if needed
+            view_mode = ft.AppView.FLET_APP_WEB
+            # If DISPLAY is not set or we want to suppress browser, FLET_APP_WEB should work
+            # Otherwise WEB_BROWSER will open a browser window (but Playwright can still connect)
+            if os.getenv("FLET_FORCE_WEB_BROWSER") == "true":
+                view_mode = ft.AppView.WEB_BROWSER
         
-        ft.run(
-            main, 
-            view=view_mode, 
-            port=port, 
-            host="127.0.0.1",
-            web_renderer=renderer  # <--- CRITICAL FIX
-        )
-    else:
-        logger.info("Starting Flet app in DESKTOP mode")
-        ft.run(main, view=ft.AppView.FLET_APP)
+            ft.run(
+                main, 
+                view=view_mode, 
+                port=port, 
+                host="127.0.0.1",
+                web_renderer=renderer  # <--- CRITICAL FIX
+            )
+        else:
+            logger.info("Starting Flet app in DESKTOP mode")
+            ft.run(main, view=ft.AppView.FLET_APP)
+    finally:
+        # Flet returns once the app exits; stop the analytics worker processes
+        shutdown_services()
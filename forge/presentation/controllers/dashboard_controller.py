@@ -19,6 +19,7 @@ import flet as ft
 
 from forge.core import events
 from forge.core.service_registry import get_session_manager
+from forge.domain.graph.snapshot import GraphSnapshot, get_graph_snapshot
 
 # Optional Tkinter for file dialogs
 try:
@@ -206,7 +207,7 @@ class DashboardController:
             root = tk.Tk(); root.withdraw(); root.attributes('-topmost', True)
             path = filedialog.asksaveasfilename(
                 title="Save Project", defaultextension=".duckdb",
-                filetypes=[("DuckDB", "*.duckdb")], initialfile="project.duckdb"
+                filetypes=[("DuckDB", "*.duckdb"), ("Project Bundle", "*.forge")], initialfile="project.duckdb"
             )
             root.destroy()
             
@@ -220,7 +221,7 @@ class DashboardController:
             
             root = tk.Tk(); root.withdraw(); root.attributes('-topmost', True)
             path = filedialog.askopenfilename(
-                title="Open Project", filetypes=[("DuckDB", "*.duckdb")]
+                title="Open Project", filetypes=[("DuckDB", "*.duckdb"), ("Project Bundle", "manifest.json")]
             )
             root.destroy()
             
@@ -332,7 +333,7 @@ class DashboardController:
             root = tk.Tk(); root.withdraw(); root.attributes('-topmost', True)
             path = filedialog.asksaveasfilename(
                 title="Save Project", defaultextension=".duckdb",
-                filetypes=[("DuckDB", "*.duckdb")], initialfile="project.duckdb"
+                filetypes=[("DuckDB", "*.duckdb"), ("Project Bundle", "*.forge")], initialfile="project.duckdb"
             )
             root.destroy()
             
@@ -346,7 +347,7 @@ class DashboardController:
             
             root = tk.Tk(); root.withdraw(); root.attributes('-topmost', True)
             path = filedialog.askopenfilename(
-                title="Open Project", filetypes=[("DuckDB", "*.duckdb")]
+                title="Open Project", filetypes=[("DuckDB", "*.duckdb"), ("Project Bundle", "manifest.json")]
             )
             root.destroy()
             
@@ -715,17 +716,17 @@ class DashboardController:
     def _build_graph_panel(self) -> ft.Control:
         # Simplified Graph View integrated into dashboard
         
-        # Load Stats (Safe loading)
-        entities, relationships = [], []
+        # Load Stats (Safe loading) from the pre-aggregated graph statistics;
+        # the graph itself is only loaded when it is opened
+        stats = None
         sm = get_session_manager()
         if sm and sm.persistence:
             try:
-                entities = sm.persistence.get_all_entities()
-                relationships = sm.persistence.get_all_relationships()
+                stats = sm.persistence.get_graph_stats()
             except Exception: pass
             
-        e_count = len(entities)
-        r_count = len(relationships)
+        e_count = stats.entities if stats else 0
+        r_count = stats.relationships if stats else 0
         has_data = e_count > 0
 
         async def on_view_graph(e):
@@ -734,7 +735,7 @@ class DashboardController:
                 return
             try:
                 # Generate and open
-                html_path = self._generate_graph_html(entities, relationships)
+                html_path = self._generate_graph_html(get_graph_snapshot(sm.persistence.db))
                 if not html_path:
                     await self.app_controller.push_agui_log("Failed to generate graph", "error")
                     return
@@ -832,29 +833,16 @@ class DashboardController:
         dropdown.on_change = on_layout_change  # type: ignore[assignment]
         return dropdown
     
-    def _generate_graph_html(self, entities, relationships) -> Optional[Path]:
+    def _generate_graph_html(self, snapshot: Optional[GraphSnapshot]) -> Optional[Path]:
         try:
             import plotly.graph_objects as go
             import networkx as nx
         except ImportError:
             return None
 
-        # Build NetworkX Graph for Layout
-        G = nx.DiGraph()
-        valid_ids = set()
-        
-        for e in entities:
-            eid = e.get("id")
-            if eid: 
-                valid_ids.add(eid)
-                G.add_node(eid, **e)
-                
-        for r in relationships:
-            src, tgt = r.get("source"), r.get("target")
-            if src in valid_ids and tgt in valid_ids:
-                G.add_edge(src, tgt, **r)
-
-        if not G.nodes: return None
+        # Materialize a NetworkX Graph for Layout from the snapshot
+        if not snapshot or not snapshot.num_nodes: return None
+        G = snapshot.to_networkx(with_attributes=True)
 
         # Calculate Layout
         if self._current_layout == "circular":
@@ -11,12 +11,14 @@ import threading
 import webbrowser
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from collections import defaultdict
 
 import flet as ft
+import numpy as np
 
 from forge.core.service_registry import get_session_manager
+from forge.domain.graph.snapshot import GraphSnapshot, get_graph_snapshot
 
 if TYPE_CHECKING:
     from forge.core.app_controller import AppController
@@ -59,17 +61,17 @@ class GraphController:
     def build_view(self) -> ft.Control:
         """Build the graph view UI with controls and graph container."""
         
-        # Load graph data
-        entities, relationships = self._load_graph_data()
+        # Load graph snapshot (shared, built once per graph version)
+        snapshot = self._load_graph_snapshot()
         
         # Apply filters
-        filtered_entities, filtered_relationships = self._apply_filters(entities, relationships)
+        filtered = self._apply_filters(snapshot) if snapshot else None
         
         # Calculate stats
-        entity_count = len(filtered_entities)
-        relationship_count = len(filtered_relationships)
-        entity_types = set(e.get("type", "UNKNOWN") for e in filtered_entities)
-        relationship_types = set(r.get("type", "UNKNOWN") for r in filtered_relationships)
+        entity_count = filtered.num_nodes if filtered else 0
+        relationship_count = filtered.num_edges if filtered else 0
+        entity_types = set(filtered.node_type_vocab) if filtered else set()
+        relationship_types = set(filtered.edge_type_vocab) if filtered else set()
         
         # Generate graph HTML if we have data
         graph_available = entity_count > 0 and relationship_count > 0
@@ -81,7 +83,7 @@ class GraphController:
                 return
             
             try:
-                html_path = self._generate_and_save_graph(filtered_entities, filtered_relationships)
+                html_path = self._generate_and_save_graph(filtered)
                 if html_path and html_path.exists():
                     # Serve via HTTP server (more reliable than file:// URLs)
                     url = await self._serve_html_file(html_path)
@@ -256,37 +258,35 @@ class GraphController:
             ),
         )
     
-    def _load_graph_data(self) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Load entities and relationships from database.
+    def _load_graph_snapshot(self) -> Optional[GraphSnapshot]:
+        """Load the CSR graph snapshot for the current graph version.
         
         Returns:
-            Tuple of (entities, relationships) lists
+            GraphSnapshot, or None if persistence is unavailable
         """
         session_manager = get_session_manager()
         if not session_manager or not session_manager.persistence:
             logger.warning("Session manager or persistence service not available")
-            return [], []
+            return None
         
         try:
-            entities = session_manager.persistence.get_all_entities()
-            relationships = session_manager.persistence.get_all_relationships()
-            return entities, relationships
+            return get_graph_snapshot(session_manager.persistence.db)
         except Exception as e:
             logger.error(f"Error loading graph data: {e}")
-            return [], []
+            return None
     
     def _apply_layout(
         self,
-        entities: List[Dict[str, Any]],
-        relationships: List[Dict[str, Any]],
-        layout_name: str
+        snapshot: GraphSnapshot,
+        layout_name: str,
+        graph: Any = None,
     ) -> Dict[str, Dict[str, float]]:
         """Apply layout algorithm to calculate node positions.
         
         Args:
-            entities: List of entity dictionaries
-            relationships: List of relationship dictionaries
+            snapshot: Graph snapshot to lay out
             layout_name: Name of layout algorithm
+            graph: NetworkX graph already materialized from the snapshot (optional)
             
         Returns:
             Dictionary mapping entity IDs to position dicts with 'x' and 'y' keys
@@ -297,38 +297,10 @@ class GraphController:
             logger.error("NetworkX not installed. Cannot compute layout.")
             return {}
         
-        if not entities or not relationships:
+        if not snapshot or not snapshot.num_nodes or not snapshot.num_edges:
             return {}
         
-        # Build NetworkX graph
-        G = nx.DiGraph()
-        
-        # Add nodes
-        entity_ids = set()
-        for entity in entities:
-            entity_id = entity.get("id")
-            if entity_id:
-                entity_ids.add(entity_id)
-                G.add_node(
-                    entity_id,
-                    type=entity.get("type", "UNKNOWN"),
-                    label=entity.get("label", ""),
-                )
-        
-        # Add edges (only between existing nodes)
-        for rel in relationships:
-            source = rel.get("source")
-            target = rel.get("target")
-            if source in entity_ids and target in entity_ids:
-                G.add_edge(
-                    source,
-                    target,
-                    type=rel.get("type", "UNKNOWN"),
-                    confidence=rel.get("confidence", 0.0),
-                )
-        
-        if G.number_of_nodes() == 0:
-            return {}
+        G = graph if graph is not None else snapshot.to_networkx()
         
         # Apply layout algorithm
         try:
@@ -353,41 +325,21 @@ class GraphController:
         
         return positions
     
-    def _apply_filters(
-        self,
-        entities: List[Dict[str, Any]],
-        relationships: List[Dict[str, Any]]
-    ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Filter nodes/edges by type, confidence, etc.
+    def _apply_filters(self, snapshot: GraphSnapshot) -> GraphSnapshot:
+        """Filter edges by confidence, etc.
         
         Args:
-            entities: List of entity dictionaries
-            relationships: List of relationship dictionaries
+            snapshot: Graph snapshot
             
         Returns:
-            Tuple of (filtered_entities, filtered_relationships)
+            Filtered snapshot (the same object when no filter applies)
         """
-        # For MVP, return all entities and relationships
+        # For MVP, only the confidence threshold is applied
         # In a full implementation, apply filters based on self._filters
-        filtered_entities = entities
-        filtered_relationships = relationships
-        
-        # Apply confidence threshold if set
-        if self._filters.get("confidence_threshold", 0.0) > 0.0:
-            threshold = self._filters["confidence_threshold"]
-            filtered_relationships = [
-                r for r in filtered_relationships
-                if r.get("confidence", 0.0) >= threshold
-            ]
-        
-        # Filter relationships to only include those between existing entities
-        entity_ids = {e.get("id") for e in filtered_entities}
-        filtered_relationships = [
-            r for r in filtered_relationships
-            if r.get("source") in entity_ids and r.get("target") in entity_ids
-        ]
-        
-        return filtered_entities, filtered_relationships
+        threshold = self._filters.get("confidence_threshold", 0.0)
+        if threshold > 0.0:
+            return snapshot.filter_edges(threshold)
+        return snapshot
     
     def _open_url_in_browser(self, url: str) -> bool:
         """Open a URL in the default browser, using wslview if available (for WSL2)."""
@@ -507,68 +459,55 @@ class GraphController:
             self._http_server_thread.join(timeout=1.0)
         self._http_server_thread = None
     
-    def _generate_and_save_graph(
-        self,
-        entities: List[Dict[str, Any]],
-        relationships: List[Dict[str, Any]]
-    ) -> Optional[Path]:
+    def _generate_and_save_graph(self, snapshot: Optional[GraphSnapshot]) -> Optional[Path]:
         """Generate Plotly graph HTML and save to file.
         
         Args:
-            entities: List of entity dictionaries
-            relationships: List of relationship dictionaries
+            snapshot: Graph snapshot to render
             
         Returns:
             Path to saved HTML file, or None if generation failed
         """
         try:
             import plotly.graph_objects as go
-            import networkx as nx
         except ImportError as e:
             logger.error(f"Required libraries not available: {e}")
             return None
         
-        if not entities or not relationships:
+        if not snapshot or not snapshot.num_nodes or not snapshot.num_edges:
             logger.warning("Cannot generate graph: no entities or relationships")
             return None
         
-        # Compute layout
-        positions = self._apply_layout(entities, relationships, self._current_layout)
+        # Compute layout on a graph materialized once from the snapshot
+        try:
+            G = snapshot.to_networkx()
+        except ImportError as e:
+            logger.error(f"Required libraries not available: {e}")
+            return None
+        positions = self._apply_layout(snapshot, self._current_layout, graph=G)
         if not positions:
             logger.warning("Failed to compute graph layout")
             return None
         
-        # Build NetworkX graph for edge computation
-        G = nx.DiGraph()
-        entity_map = {e.get("id"): e for e in entities}
-        for entity in entities:
-            entity_id = entity.get("id")
-            if entity_id and entity_id in positions:
-                G.add_node(entity_id)
-        
-        for rel in relationships:
-            source = rel.get("source")
-            target = rel.get("target")
-            if source in positions and target in positions:
-                G.add_edge(source, target)
-        
-        # Prepare edge traces
+        # Prepare edge traces straight from the CSR arrays (one segment per
+        # distinct source/target pair, labelled by its first relationship)
+        node_ids = snapshot.node_ids
+        sources = snapshot.sources()
+        pair_keys = sources.astype(np.int64) * snapshot.num_nodes + snapshot.targets
+        _, first_edges = np.unique(pair_keys, return_index=True)
+        
         edge_x = []
         edge_y = []
         edge_info = []
+        edge_types = snapshot.edge_types()
         
-        for edge in G.edges():
-            source, target = edge
-            if source in positions and target in positions:
-                x0, y0 = positions[source]["x"], positions[source]["y"]
-                x1, y1 = positions[target]["x"], positions[target]["y"]
-                edge_x.extend([x0, x1, None])
-                edge_y.extend([y0, y1, None])
-                
-                # Find relationship info
-                rel_info = next((r for r in relationships if r.get("source") == source and r.get("target") == target), None)
-                if rel_info:
-                    edge_info.append(f"{rel_info.get('type', 'RELATED')} (conf: {rel_info.get('confidence', 0.0):.2f})")
+        for i in first_edges.tolist():
+            source, target = node_ids[sources[i]], node_ids[snapshot.targets[i]]
+            x0, y0 = positions[source]["x"], positions[source]["y"]
+            x1, y1 = positions[target]["x"], positions[target]["y"]
+            edge_x.extend([x0, x1, None])
+            edge_y.extend([y0, y1, None])
+            edge_info.append(f"{edge_types[i]} (conf: {snapshot.confidence[i]:.2f})")
         
         edge_trace = go.Scatter(
             x=edge_x,
@@ -591,15 +530,17 @@ class GraphController:
         max_degree = max(node_degrees.values()) if node_degrees else 1
         min_size, max_size = 10, 30
         
-        for entity in entities:
-            entity_id = entity.get("id")
+        node_types = snapshot.node_types()
+        node_labels = []
+        for index, entity_id in enumerate(node_ids):
             if entity_id in positions:
                 node_x.append(positions[entity_id]["x"])
                 node_y.append(positions[entity_id]["y"])
                 
-                label = entity.get("label", entity_id)
-                entity_type = entity.get("type", "UNKNOWN")
+                label = snapshot.node_labels[index]
+                entity_type = node_types[index]
                 degree = node_degrees.get(entity_id, 0)
+                node_labels.append(label)
                 
                 node_text.append(f"{label}<br>Type: {entity_type}<br>Connections: {degree}")
                 
@@ -618,7 +559,7 @@ class GraphController:
             x=node_x,
             y=node_y,
             mode="markers+text",
-            text=[entity.get("label", "") for entity in entities if entity.get("id") in positions],
+            text=node_labels,
             textposition="top center",
             textfont=dict(size=10, color="white"),
             hovertext=node_text,
@@ -59,7 +59,11 @@ class ProjectController:
             projects_dir.mkdir(parents=True, exist_ok=True)
             file_path = filedialog.askopenfilename(
                 title="Open Project",
-                filetypes=[("DuckDB Database", "*.duckdb"), ("All Files", "*.*")],
+                filetypes=[
+                    ("DuckDB Database", "*.duckdb"),
+                    ("Project Bundle", "manifest.json"),
+                    ("All Files", "*.*"),
+                ],
                 initialdir=str(projects_dir),
             )
             
@@ -91,7 +95,11 @@ class ProjectController:
             file_path = filedialog.asksaveasfilename(
                 title="Save Project",
                 defaultextension=".duckdb",
-                filetypes=[("DuckDB Database", "*.duckdb"), ("All Files", "*.*")],
+                filetypes=[
+                    ("DuckDB Database", "*.duckdb"),
+                    ("Project Bundle", "*.forge"),
+                    ("All Files", "*.*"),
+                ],
                 initialdir=str(projects_dir),
                 initialfile="project.duckdb",
             )
@@ -22,8 +22,11 @@ setup(
         
         # --- DATABASE & ANALYTICS ---
         "duckdb>=0.10.0",
+        "pyarrow>=14.0.0",        # Arrow staging for bulk DuckDB writes
         "pydantic>=2.0.0",
         "networkx>=3.6",          # Graph analytics & algorithms
+        "numpy>=1.26.0",          # Edge arrays for off-loop analytics
+        "scipy>=1.11.0",          # Sparse adjacency (link prediction, PageRank)
         "plotly>=5.18.0",
 
         # --- DOCUMENT & LOGIC ---